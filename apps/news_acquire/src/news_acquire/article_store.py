@@ -0,0 +1,162 @@
+"""Rolling, hour-partitioned article history for stage 01 windows.
+
+RSS only returns the latest items per feed, so the multi-hour digest windows
+cannot be rebuilt from the current fetch alone.  Stage 01 appends every valid
+article to an hourly partition keyed by its Published hour and reads the
+windows back as a range of partitions:
+
+    <root>/YYYY/MM/DD/HH.csv
+
+Partitions are small CSVs with a fixed column set, sorted by
+(Published, Title, Source) and unique on ``index_id``; reads restore the
+column types (strings, UTC ``Published``).  ``topics`` is the JSON list of
+every feed topic the article was fetched under (partitions written before
+the column existed read back as their ``Topic`` alone).  Writes replace a
+partition atomically, so re-running an hour is idempotent.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+import pandas as pd
+
+
+ARTICLE_COLUMNS = ["index_id", "uid", "Topic", "Title", "Link", "Published", "Source", "topics"]
+_TEXT_COLUMNS = {c: str for c in ARTICLE_COLUMNS if c != "Published"}
+_SORT_KEYS = ["Published", "Title", "Source"]
+
+
+def _hour(ts: datetime | pd.Timestamp) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize(timezone.utc) if ts.tzinfo is None else ts.tz_convert(timezone.utc)
+    return ts.floor("h")
+
+
+def _single_topics(topic: pd.Series) -> List[str]:
+    return [json.dumps([t], ensure_ascii=False) for t in topic]
+
+
+def _union_topics(values: Iterable[str]) -> str:
+    """JSON union of topic lists: the first list's leading topic, then the rest sorted (as collapse_topics)."""
+    lists = [json.loads(v) for v in values if v]
+    if not lists or not lists[0]:
+        return json.dumps(sorted({t for topics in lists for t in topics}), ensure_ascii=False)
+    first = lists[0][0]
+    return json.dumps([first] + sorted({t for topics in lists for t in topics} - {first}), ensure_ascii=False)
+
+
+def _empty() -> pd.DataFrame:
+    df = pd.DataFrame({c: pd.Series(dtype=str) for c in ARTICLE_COLUMNS})
+    df["Published"] = pd.Series(dtype="datetime64[ns, UTC]")
+    return df
+
+
+class ArticleStore:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def partition_path(self, hour: datetime | pd.Timestamp) -> Path:
+        h = _hour(hour)
+        return self.root / f"{h:%Y}" / f"{h:%m}" / f"{h:%d}" / f"{h:%H}.csv"
+
+    def _hours(self, start: datetime, end: datetime) -> Iterator[pd.Timestamp]:
+        hour, stop = _hour(start), pd.Timestamp(end)
+        while hour < stop:
+            yield hour
+            hour += timedelta(hours=1)
+
+    def _read_partitions(self, paths: List[Path]) -> pd.DataFrame:
+        # One parse per run of partitions sharing a header (usually the whole range):
+        # their bodies are concatenated under that header
+        runs: List[List[str]] = []
+        for path in paths:
+            header, _, body = path.read_text(encoding="utf-8").partition("\n")
+            if not runs or runs[-1][0] != header + "\n":
+                runs.append([header + "\n"])
+            runs[-1].append(body)
+        if not runs:
+            return _empty()
+        frames = []
+        for chunks in runs:
+            df = pd.read_csv(io.StringIO("".join(chunks)), dtype=_TEXT_COLUMNS, keep_default_na=False)
+            if "topics" not in df.columns:
+                df["topics"] = _single_topics(df["Topic"])
+            frames.append(df)
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        df["Published"] = pd.to_datetime(df["Published"], utc=True, format="ISO8601")
+        return df[ARTICLE_COLUMNS]
+
+    def _write_partition(self, path: Path, df: pd.DataFrame) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=path.parent, suffix=".tmp", encoding="utf-8", newline="") as tmp:
+            df.to_csv(tmp, index=False)
+            temp_name = tmp.name
+        os.replace(temp_name, path)
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Merge articles into their hour partitions; returns rows newly stored.
+
+        Rows already present (same ``index_id`` in the same hour) are kept as
+        first stored, with any topic they are now seen under added to
+        ``topics``.  ``df`` without a ``topics`` column counts its ``Topic``.
+        """
+        if df.empty:
+            return 0
+        if "topics" not in df.columns:
+            df = df.assign(topics=_single_topics(df["Topic"]))
+        rows = df[ARTICLE_COLUMNS]
+        hours = rows["Published"].dt.floor("h")
+        existing = self.read_range(hours.min(), hours.max() + timedelta(hours=1))
+        existing_hours = existing["Published"].dt.floor("h")
+
+        # Stored rows seen again: widen their topics
+        incoming = rows.groupby("index_id", sort=False)["topics"].agg(list)
+        changed = []
+        for i in existing.index[existing["index_id"].isin(incoming.index)]:
+            topics = _union_topics([existing.at[i, "topics"], *incoming[existing.at[i, "index_id"]]])
+            if topics != existing.at[i, "topics"]:
+                existing.at[i, "topics"] = topics
+                changed.append(i)
+
+        new = rows[~rows["index_id"].isin(set(existing["index_id"]))]
+        if new["index_id"].duplicated().any():
+            new = new.assign(topics=new["index_id"].map(new.groupby("index_id", sort=False)["topics"].agg(_union_topics)))
+        new = new.drop_duplicates(subset=["index_id"], keep="first")
+        new_hours = hours.loc[new.index]
+        # Only partitions that gain rows or topics are rewritten
+        for hour in sorted(set(new_hours) | set(existing_hours.loc[changed])):
+            merged = pd.concat([existing[existing_hours == hour], new[new_hours == hour]], ignore_index=True)
+            self._write_partition(self.partition_path(hour), merged.sort_values(_SORT_KEYS, kind="mergesort"))
+        return len(new)
+
+    def read_range(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """Stored articles with ``start <= Published < end``, sorted by Published."""
+        paths = [p for p in (self.partition_path(h) for h in self._hours(start, end)) if p.exists()]
+        df = self._read_partitions(paths)
+        if df.empty:
+            return df
+        published = df["Published"]
+        df = df[(published >= pd.Timestamp(start)) & (published < pd.Timestamp(end))]
+        return df.sort_values(_SORT_KEYS, kind="mergesort").reset_index(drop=True)
+
+    def prune(self, before: datetime) -> int:
+        """Delete whole days older than ``before``'s day; returns partitions removed."""
+        cutoff = _hour(before).normalize()
+        removed = 0
+        for day_dir in sorted(self.root.glob("[0-9]*/[0-9]*/[0-9]*")):
+            try:
+                day = datetime.strptime("/".join(day_dir.parts[-3:]), "%Y/%m/%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if day < cutoff:
+                removed += len(list(day_dir.glob("*.csv")))
+                shutil.rmtree(day_dir, ignore_errors=True)
+        return removed
@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Iterator, Sequence
 
+from .master_ref_log import fold_segments
 from .run_bundle import sha256_file, utc_now_iso
 
 
@@ -138,7 +139,26 @@ def plan_compaction(paths: Sequence[Path]) -> CompactionPlan:
     return CompactionPlan(accepted, latest, tuple(rejected), generation)
 
 
+def _log_segments(bundle: ValidBundle, delta: Path) -> list[Path]:
+    """The master_ref the hour built on (log base and pending deltas, or a full CSV), then its delta."""
+    inputs = bundle.path / "inputs"
+    log = inputs / "master_ref"
+    if log.is_dir():
+        pending = sorted(p for p in (log / "deltas").glob("*.csv") if p.stem != bundle.digest_at)
+        return [log / "base.csv", *pending, delta]
+    return [inputs / "master_ref.csv", delta]
+
+
 def _master_rows(bundle: ValidBundle) -> Iterator[dict[str, str]]:
+    # Log bundles: the hour's delta folded onto the log state it was built on, so
+    # rows that only exist in the base survive.  Legacy bundles: the full snapshot.
+    # compact_master then folds these across accepted bundles.
+    delta = bundle.path / "candidates" / "master_ref_delta.csv"
+    if delta.exists():
+        for row in fold_segments(_log_segments(bundle, delta)).to_dict("records"):
+            if str(row["index_id"]).strip():
+                yield {column: str(row.get(column) or "") for column in MASTER_COLUMNS}
+        return
     path = bundle.path / "candidates" / "master_ref.csv"
     if not path.exists() or path.stat().st_size == 0:
         return
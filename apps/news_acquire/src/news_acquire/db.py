@@ -1,24 +1,55 @@
 # backend/db.py
 import os, json, psycopg
-from typing import Iterable
+from typing import Dict, Iterable, Tuple
 
 def get_conn():
     dsn = os.getenv("PG_DSN", "dbname=newsdb")
     return psycopg.connect(dsn)
 
-def upsert_master_ref(rows: Iterable[dict]):
-    sql = """
-    insert into master_ref (index_id, source, link, first_seen, last_seen, topics, meta)
-    values (%(index_id)s, %(source)s, %(link)s, %(first_seen)s, %(last_seen)s, %(topics)s, %(meta)s::jsonb)
+def _fold_master_ref_rows(rows: Iterable[dict]) -> Dict[str, dict]:
+    # Same result as upserting the rows one by one: the first row per index_id
+    # inserts, later ones move last_seen, union topics and merge meta.
+    batch: Dict[str, dict] = {}
+    for r in rows:
+        prev = batch.get(r["index_id"])
+        if prev is None:
+            batch[r["index_id"]] = {**r, "topics": list(dict.fromkeys(r["topics"])), "meta": dict(r["meta"])}
+            continue
+        prev["last_seen"] = r["last_seen"]
+        prev["topics"] = list(dict.fromkeys(prev["topics"] + list(r["topics"])))
+        prev["meta"].update(r["meta"])
+    return batch
+
+def upsert_master_ref(rows: Iterable[dict]) -> int:
+    """Bulk upsert: COPY the rows into a temp staging table, then one set-based merge.
+
+    Rows repeating an index_id are folded first (a single ON CONFLICT statement
+    cannot touch a row twice).  Returns the number of distinct index_ids written.
+    """
+    batch = _fold_master_ref_rows(rows)
+    if not batch:
+        return 0
+    merge = """
+    insert into master_ref as m (index_id, source, link, first_seen, last_seen, topics, meta)
+    select index_id, source, link, first_seen, last_seen, topics, meta from master_ref_stage
     on conflict (index_id) do update set
       last_seen = excluded.last_seen,
-      topics    = (select array(select distinct unnest(master_ref.topics || excluded.topics))),
-      meta      = master_ref.meta || excluded.meta;
+      topics    = array(select distinct unnest(m.topics || excluded.topics)),
+      meta      = m.meta || excluded.meta;
     """
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.executemany(sql, rows)
+            cur.execute("create temp table master_ref_stage (like master_ref including defaults) on commit drop")
+            with cur.copy(
+                "copy master_ref_stage (index_id, source, link, first_seen, last_seen, topics, meta) from stdin"
+            ) as copy:
+                for r in batch.values():
+                    copy.write_row(
+                        (r["index_id"], r["source"], r["link"], r["first_seen"], r["last_seen"], r["topics"], json.dumps(r["meta"]))
+                    )
+            cur.execute(merge)
         conn.commit()
+    return len(batch)
 
 def push_work(stage: str, work_key: str, payload: dict):
     sql = """
@@ -29,6 +60,30 @@ def push_work(stage: str, work_key: str, payload: dict):
     with get_conn() as c, c.cursor() as cur:
         cur.execute(sql, (stage, work_key, json.dumps(payload)))
 
+def push_work_many(stage: str, items: Iterable[Tuple[str, dict]]) -> Tuple[int, int]:
+    """Enqueue many work items in one statement, one connection and one transaction.
+
+    Returns (inserted, skipped); skipped covers keys already queued/running and
+    keys repeated within ``items`` (first payload wins).
+    """
+    batch: dict = {}
+    total = 0
+    for work_key, payload in items:
+        total += 1
+        batch.setdefault(work_key, json.dumps(payload))
+    if not batch:
+        return 0, 0
+    sql = """
+    insert into work_items(stage, work_key, state, payload)
+    select %s::work_stage, k, 'queued', p::jsonb
+    from unnest(%s::text[], %s::text[]) as t(k, p)
+    on conflict (stage, work_key) where work_items.state in ('queued','running') do nothing;
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(sql, (stage, list(batch.keys()), list(batch.values())))
+        inserted = max(cur.rowcount, 0)
+    return inserted, total - inserted
+
 def pop_work(stage: str, limit: int = 10):
     sql = """
     update work_items wi set state='running', attempts=wi.attempts+1, updated_at=now()
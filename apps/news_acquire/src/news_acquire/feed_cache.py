@@ -0,0 +1,76 @@
+"""Persistent conditional-GET cache for sensing feeds.
+
+One small JSON document per feed URL keeps the HTTP validators (ETag and
+Last-Modified) and the normalized entries of the last full response.  A 304
+from the origin lets stage 01 reuse those entries without downloading or
+parsing the body again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+SCHEMA_VERSION = "sensing_feed_cache.v1"
+
+
+@dataclass(frozen=True)
+class CachedFeed:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    entries: list[dict] = field(default_factory=list)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FeedCache:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path_for(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]}.json"
+
+    def load(self, url: str) -> CachedFeed | None:
+        path = self.path_for(url)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if payload.get("schema_version") != SCHEMA_VERSION or payload.get("url") != url:
+            return None
+        entries = payload.get("entries")
+        return CachedFeed(
+            url=url,
+            etag=payload.get("etag") or None,
+            last_modified=payload.get("last_modified") or None,
+            entries=entries if isinstance(entries, list) else [],
+        )
+
+    def store(self, url: str, etag: str | None, last_modified: str | None, entries: list[dict]) -> None:
+        """Atomically replace the cached response; concurrent writers are last-wins."""
+        if not etag and not last_modified:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "schema_version": SCHEMA_VERSION,
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "entries": entries,
+        }
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=self.root, suffix=".tmp", encoding="utf-8") as tmp:
+            json.dump(payload, tmp, ensure_ascii=False)
+            temp_name = tmp.name
+        os.replace(temp_name, self.path_for(url))
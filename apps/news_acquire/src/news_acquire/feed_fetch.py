@@ -0,0 +1,159 @@
+"""Bounded-concurrency RSS acquisition for stage 01.
+
+Feeds are fetched in parallel over one pooled HTTP session, so connections to a
+host (all Google News queries share one) are reused across feeds.  Each feed has
+a total deadline and yields an outcome record whether it succeeds or not.
+With a :class:`FeedCache`, requests are conditional and a 304 reuses the
+entries stored from the last full response.  Results are always returned in
+feed configuration order so callers stay deterministic regardless of
+completion order.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+from .feed_cache import FeedCache
+
+
+USER_AGENT = "media-monitor-news-acquire/0.1 (+https://media-monitor.local)"
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 20.0
+_CHUNK_BYTES = 64 * 1024
+
+
+class FeedTimeout(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class FeedOutcome:
+    """Per-feed acquisition evidence, written alongside the stage 01 slices."""
+
+    topic: str
+    url: str
+    status: str  # ok | http_error | timeout | error
+    http_status: int | None
+    entries: int
+    bytes: int
+    elapsed_ms: int
+    error: str = ""
+    cache: str = "off"  # off | hit | miss
+
+    def public_record(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class FeedResult:
+    topic: str
+    entries: list[dict] = field(default_factory=list)
+    outcome: FeedOutcome | None = None
+
+
+def entry_record(entry: Any) -> dict:
+    """Reduce a feedparser entry to the plain fields stage 01 consumes (and the cache stores)."""
+    source = getattr(entry, "source", None)
+    return {
+        "title": getattr(entry, "title", "") or "",
+        "link": getattr(entry, "link", "") or "",
+        "published": getattr(entry, "published", "") or getattr(entry, "updated", "") or "",
+        "source": getattr(source, "title", None) or "",
+    }
+
+
+def build_session(max_workers: int) -> requests.Session:
+    """Session whose per-host pool can hold one keep-alive connection per worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, max_workers))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _read_with_deadline(response: requests.Response, deadline: float) -> bytes:
+    chunks: list[bytes] = []
+    for chunk in response.iter_content(_CHUNK_BYTES):
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise FeedTimeout("feed body exceeded deadline")
+    return b"".join(chunks)
+
+
+def fetch_one(
+    session: requests.Session, topic: str, url: str, timeout: float, cache: FeedCache | None = None
+) -> FeedResult:
+    """Fetch and parse one feed; never raises for network or HTTP failures."""
+    started = time.monotonic()
+    deadline = started + timeout
+    http_status: int | None = None
+    size = 0
+    cached = cache.load(url) if cache is not None else None
+    cache_state = "off" if cache is None else "miss"
+
+    def _outcome(status: str, entries: int = 0, error: str = "") -> FeedOutcome:
+        return FeedOutcome(
+            topic=topic,
+            url=url,
+            status=status,
+            http_status=http_status,
+            entries=entries,
+            bytes=size,
+            elapsed_ms=int((time.monotonic() - started) * 1000),
+            error=error,
+            cache=cache_state,
+        )
+
+    headers = cached.conditional_headers() if cached is not None else {}
+    try:
+        with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+            http_status = response.status_code
+            if response.status_code == 304 and cached is not None:
+                cache_state = "hit"
+                return FeedResult(topic, list(cached.entries), _outcome("ok", entries=len(cached.entries)))
+            if response.status_code >= 400:
+                return FeedResult(topic, [], _outcome("http_error", error=f"HTTP {response.status_code}"))
+            body = _read_with_deadline(response, deadline)
+            response_headers = dict(response.headers)
+    except (FeedTimeout, requests.Timeout) as exc:
+        return FeedResult(topic, [], _outcome("timeout", error=str(exc)))
+    except requests.RequestException as exc:
+        return FeedResult(topic, [], _outcome("error", error=f"{type(exc).__name__}: {exc}"))
+
+    size = len(body)
+    parsed = feedparser.parse(body, response_headers=response_headers)
+    entries = [entry_record(e) for e in (getattr(parsed, "entries", None) or [])]
+    if cache is not None:
+        cache.store(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), entries)
+    return FeedResult(topic, entries, _outcome("ok", entries=len(entries)))
+
+
+def fetch_feeds(
+    feeds: dict[str, str],
+    *,
+    max_workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    session: Any = None,
+    cache: FeedCache | None = None,
+) -> list[FeedResult]:
+    """Fetch all feeds concurrently; results follow ``feeds`` insertion order."""
+    if not feeds:
+        return []
+    workers = max(1, min(int(max_workers), len(feeds)))
+    owned = session is None
+    session = session or build_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed") as pool:
+            futures = [pool.submit(fetch_one, session, topic, url, timeout, cache) for topic, url in feeds.items()]
+            return [future.result() for future in futures]
+    finally:
+        if owned:
+            session.close()
@@ -0,0 +1,122 @@
+"""Offline near-duplicate clustering of headlines (character n-gram MinHash).
+
+Titles are normalized (case, accents, punctuation), cut into character
+4-grams and summarized by a MinHash signature.  Signatures are bucketed with
+banded LSH; candidate pairs whose estimated Jaccard similarity reaches the
+threshold are joined, and the connected components are the clusters.
+
+Everything is numpy on fixed seeds, so labels are reproducible run to run and
+do not depend on ``PYTHONHASHSEED``.  Cluster labels are numbered in order of
+first appearance, and the first row of a cluster is its representative.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+SHINGLE = 4
+NUM_PERM = 64
+BANDS = 16
+SEED = 17
+_PRIME = np.uint64((1 << 61) - 1)
+_BASE = np.uint64(1_000_003)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def normalize_titles(titles: Iterable[str]) -> List[str]:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    s = pd.Series(list(titles), dtype=object).fillna("").astype(str)
+    s = s.str.lower().str.normalize("NFKD").str.replace("[\u0300-\u036f]", "", regex=True)
+    s = s.str.replace(r"[^\w]+", " ", regex=True).str.replace("_", " ").str.split().str.join(" ")
+    return s.tolist()
+
+
+def _permutations(num_perm: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = NUM_PERM, k: int = SHINGLE, seed: int = SEED) -> np.ndarray:
+    """(len(texts), num_perm) uint64 MinHash signatures of character k-gram sets.
+
+    Texts shorter than ``k`` are padded so that every text has one shingle.
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros((0, num_perm), dtype=np.uint64)
+    padded = [t.ljust(k) for t in texts]
+    lengths = np.fromiter((len(t) for t in padded), dtype=np.int64, count=n)
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # Polynomial hash of every k-gram, then keep the ones inside a single text
+    total = len(codes) - k + 1
+    h = np.zeros(total, dtype=np.uint64)
+    for i in range(k):
+        h = h * _BASE + codes[i : i + total]
+    h &= _MASK32
+    owner = np.repeat(np.arange(n), lengths)[:total]
+    valid = (np.arange(total) - starts[owner]) <= (lengths[owner] - k)
+    h, owner = h[valid], owner[valid]
+    segments = np.concatenate(([0], np.flatnonzero(np.diff(owner)) + 1))
+
+    a, b = _permutations(num_perm, seed)
+    sig = np.empty((n, num_perm), dtype=np.uint64)
+    for j in range(num_perm):
+        # a*h + b wraps in uint64 before the mod, which is what mixes the order (as datasketch does)
+        sig[:, j] = np.minimum.reduceat(((a[j] * h + b[j]) % _PRIME) & _MASK32, segments)
+    return sig
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_labels(titles: Sequence[str], threshold: float = 0.5, num_perm: int = NUM_PERM, bands: int = BANDS) -> np.ndarray:
+    """Cluster label per title (0, 1, ... in order of first appearance).
+
+    Within each LSH bucket only consecutive members and the bucket's first
+    member are compared, which keeps candidate pairs linear in the number of
+    titles.  Empty titles stay singletons.
+    """
+    # Identical normalized titles share a label up front; MinHash runs once per distinct title
+    raw_codes, raw = pd.factorize(pd.Series(list(titles), dtype=object).fillna(""))
+    norm_codes, uniques = pd.factorize(pd.Series(normalize_titles(raw), dtype=object))
+    codes = norm_codes[raw_codes]
+    n = len(uniques)
+    parent = list(range(n))
+    live = np.flatnonzero(np.fromiter((bool(t) for t in uniques), dtype=bool, count=n))
+    if len(live) > 1:
+        sig = minhash_signatures([uniques[i] for i in live], num_perm=num_perm)
+        rows = num_perm // bands
+        pairs = []
+        for band in range(bands):
+            key = np.ascontiguousarray(sig[:, band * rows : (band + 1) * rows]).view(np.dtype((np.void, 8 * rows))).ravel()
+            _, bucket = np.unique(key, return_inverse=True)
+            order = np.argsort(bucket, kind="stable")
+            same = bucket[order[1:]] == bucket[order[:-1]]
+            first = order[np.searchsorted(bucket[order], bucket[order])]
+            pairs.append(np.stack([order[:-1][same], order[1:][same]], axis=1))
+            pairs.append(np.stack([first[1:][same], order[1:][same]], axis=1))
+        cand = np.unique(np.concatenate(pairs), axis=0)
+        cand = cand[cand[:, 0] != cand[:, 1]]
+        similar = (sig[cand[:, 0]] == sig[cand[:, 1]]).mean(axis=1) >= threshold
+        for i, j in live[cand[similar]].tolist():
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+    roots = np.fromiter((_find(parent, i) for i in range(n)), dtype=np.int64, count=n)
+    # Empty titles never join anything, not even each other
+    empty = np.fromiter((not t for t in uniques), dtype=bool, count=n)
+    row_roots = np.where(empty[codes], n + np.arange(len(codes)), roots[codes])
+    # factorize keeps first-appearance order, so roots do too
+    return pd.factorize(row_roots)[0]
@@ -2,7 +2,7 @@
 import hashlib, base64, unicodedata
 
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 def digest_id_hour(digest_at: Optional[str] = None) -> Tuple[str, datetime]:
@@ -37,3 +37,35 @@ def stable_index_id(title: str, source: str, url: str="") -> str:
     h = hashlib.sha1(key.encode("utf-8")).digest()
     return base64.b32encode(h)[:10].decode("ascii")
 
+
+
+def stable_index_ids(
+    titles: Iterable[str],
+    sources: Iterable[str],
+    urls: Iterable[str],
+    memo: Optional[Dict[Tuple[str, str, str], str]] = None,
+) -> List[str]:
+    """Batch form of ``stable_index_id`` over aligned columns.
+
+    Each distinct title/source is normalized once and each distinct
+    (title, source, url) triple is hashed once.  Pass the same ``memo`` dict
+    across calls to share hashes for the lifetime of a fetch.
+    """
+    memo = {} if memo is None else memo
+    norm_cache: Dict[str, str] = {}
+    out: List[str] = []
+    for title, source, url in zip(titles, sources, urls):
+        triple = (title, source, url)
+        hit = memo.get(triple)
+        if hit is None:
+            nt = norm_cache.get(title)
+            if nt is None:
+                nt = norm_cache[title] = _norm(title)
+            ns = norm_cache.get(source)
+            if ns is None:
+                ns = norm_cache[source] = _norm(source)
+            key = f"{nt}|{ns}|{url.strip().lower()}"
+            hit = base64.b32encode(hashlib.sha1(key.encode("utf-8")).digest())[:10].decode("ascii")
+            memo[triple] = hit
+        out.append(hit)
+    return out
@@ -0,0 +1,219 @@
+"""Append-only master_ref log: a base snapshot plus per-hour delta segments.
+
+Stage 02 writes one small segment per digest hour instead of rewriting the
+whole table:
+
+    <root>/base.csv                 folded snapshot (MASTER_COLUMNS)
+    <root>/base.json                row count, sha256 and folded segments
+    <root>/deltas/<digest_id>.csv   one hour's stats, same columns
+
+Segments are immutable once written (re-running an hour replaces its segment
+atomically), so run bundles can hard-link them instead of copying.  ``read``
+folds base and deltas on demand with the master_ref rules: the last non-empty
+source/link wins, first_seen/last_seen widen, topics/meta come from the base.
+``compact`` writes that fold as the new base and drops the folded segments;
+stage 02 calls it once the pending segments reach a fixed fraction of the
+base (``pending_ratio``), so the full rewrite is amortized over at least that
+many new rows and an hour costs O(hour rows) on average at any table size.
+``fold_segments`` applies the same fold to segments outside a log (the
+compactor uses it on the log state a run bundle recorded).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+
+MASTER_COLUMNS = ["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"]
+
+_CANONICAL_SEEN = r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?\+00:00$"
+
+
+def format_seen(values: pd.Series) -> List[str | None]:
+    """Timestamp text as pandas writes it to CSV; comparable as a string.
+
+    Strings already in that form (everything the log writes) pass through
+    without a datetime round trip.
+    """
+    out = pd.Series(None, index=values.index, dtype=object)
+    if values.dtype == object:
+        canonical = values.astype(str).str.match(_CANONICAL_SEEN)
+        out[canonical] = values[canonical]
+    else:
+        canonical = pd.Series(False, index=values.index)
+    ts = pd.to_datetime(values[~canonical], errors="coerce", utc=True)
+    out[~canonical] = [None if pd.isna(t) else t.isoformat(sep=" ") for t in ts]
+    return out.tolist()
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", delete=False, dir=path.parent, suffix=".tmp", encoding="utf-8", newline="") as tmp:
+        tmp.write(text)
+        temp_name = tmp.name
+    os.replace(temp_name, path)
+
+
+def _read_segment(path: Path) -> pd.DataFrame:
+    if path.stat().st_size == 0:
+        return pd.DataFrame(columns=MASTER_COLUMNS, dtype=str)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    for col in MASTER_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    return df[MASTER_COLUMNS]
+
+
+def _seen_extreme(df: pd.DataFrame, col: str, keep: str) -> pd.Series:
+    # Canonical timestamp text orders like the timestamp; a sort avoids groupby's object-dtype min/max fallback
+    seen = df[["index_id", col]].dropna().sort_values(["index_id", col], kind="mergesort")
+    return seen.drop_duplicates(subset=["index_id"], keep=keep).set_index("index_id")[col]
+
+
+def fold(df: pd.DataFrame) -> pd.DataFrame:
+    """Collapse segment rows (in log order) to one master_ref row per index_id."""
+    df = df[df["index_id"].str.strip() != ""]
+    df = df.where(df != "")
+    g = df.groupby("index_id", sort=True)
+    out = pd.DataFrame(
+        {
+            "source": g["source"].last(),
+            "link": g["link"].last(),
+            "first_seen": _seen_extreme(df, "first_seen", "first"),
+            "last_seen": _seen_extreme(df, "last_seen", "last"),
+            "topics": g["topics"].first(),
+            "meta": g["meta"].first(),
+        }
+    ).reset_index()
+    out["topics"] = out["topics"].fillna("[]")
+    out["meta"] = out["meta"].fillna("{}")
+    return out[MASTER_COLUMNS].fillna("")
+
+
+def fold_segments(paths: Sequence[Path]) -> pd.DataFrame:
+    """Fold full master_ref CSVs and delta segments, given in log order (missing paths are skipped)."""
+    frames = [_read_segment(p) for p in paths if p.is_file()]
+    if not frames:
+        return pd.DataFrame(columns=MASTER_COLUMNS, dtype=str)
+    df = pd.concat(frames, ignore_index=True)
+    df["first_seen"] = format_seen(df["first_seen"])
+    df["last_seen"] = format_seen(df["last_seen"])
+    return fold(df.fillna(""))
+
+
+def _to_csv(df: pd.DataFrame) -> str:
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, lineterminator="\n")
+    return buf.getvalue()
+
+
+class MasterRefLog:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.base_path = self.root / "base.csv"
+        self.base_meta_path = self.root / "base.json"
+        self.deltas_dir = self.root / "deltas"
+
+    def delta_paths(self) -> List[Path]:
+        # digest ids (YYYYMMDDTHH) sort chronologically
+        return sorted(self.deltas_dir.glob("*.csv")) if self.deltas_dir.exists() else []
+
+    def is_empty(self) -> bool:
+        return not self.base_path.exists() and not self.delta_paths()
+
+    def _write_base(self, df: pd.DataFrame, folded: List[str]) -> None:
+        text = _to_csv(df)
+        _atomic_write(self.base_path, text)
+        meta = {
+            "rows": len(df),
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "folded": folded,
+        }
+        _atomic_write(self.base_meta_path, json.dumps(meta, sort_keys=True, indent=2) + "\n")
+
+    def pending_ratio(self) -> float:
+        """Bytes of pending delta segments per byte of base (file sizes only, nothing is read)."""
+        pending = sum(p.stat().st_size for p in self.delta_paths())
+        if not pending:
+            return 0.0
+        base = self.base_path.stat().st_size if self.base_path.exists() else 0
+        return pending / base if base else float("inf")
+
+    def seed(self, csv_path: Path) -> bool:
+        """Start an empty log from an existing full master_ref.csv."""
+        if not self.is_empty() or not csv_path.exists():
+            return False
+        self._write_base(fold_segments([csv_path]), folded=[])
+        return True
+
+    def replace_base(self, csv_path: Path, folded_through: str | None = None) -> None:
+        """Reset the base to ``csv_path`` (e.g. a promoted generation).
+
+        Deltas up to digest id ``folded_through`` are already in it and are
+        dropped; later ones stay pending on top of the new base.  Without
+        ``folded_through`` every pending delta is dropped.
+        """
+        for path in self.delta_paths():
+            if folded_through is None or path.stem <= folded_through:
+                path.unlink()
+        self._write_base(fold_segments([csv_path]), folded=[])
+
+    def append_delta(self, digest_id: str, hour_stats: pd.DataFrame) -> Path:
+        """Write one hour's per-index_id stats as its own segment."""
+        delta = pd.DataFrame(
+            {
+                "index_id": hour_stats["index_id"].astype(str),
+                "source": hour_stats["source"].fillna(""),
+                "link": hour_stats["link"].fillna(""),
+                "first_seen": format_seen(hour_stats["first_seen"]),
+                "last_seen": format_seen(hour_stats["last_seen"]),
+                "topics": "[]",
+                "meta": "{}",
+            }
+        )
+        path = self.deltas_dir / f"{digest_id}.csv"
+        _atomic_write(path, _to_csv(delta.sort_values("index_id", kind="mergesort")))
+        return path
+
+    def _read(self) -> tuple[pd.DataFrame, List[Path]]:
+        deltas = self.delta_paths()
+        segments = ([self.base_path] if self.base_path.exists() else []) + deltas
+        if not segments:
+            return pd.DataFrame(columns=MASTER_COLUMNS, dtype=str), deltas
+        return fold(pd.concat([_read_segment(p) for p in segments], ignore_index=True)), deltas
+
+    def read(self) -> pd.DataFrame:
+        """Current master_ref (base folded with every delta), as strings sorted by index_id."""
+        return self._read()[0]
+
+    def compact(self) -> int:
+        """Fold all current deltas into the base; returns the number of segments folded."""
+        df, deltas = self._read()
+        if not deltas:
+            return 0
+        self._write_base(df, folded=[p.stem for p in deltas])
+        for path in deltas:
+            path.unlink()
+        return len(deltas)
+
+    def state(self) -> Dict:
+        """Content identity of the log without reading the base (used as bundle input state)."""
+        base = None
+        if self.base_meta_path.exists():
+            base = json.loads(self.base_meta_path.read_text(encoding="utf-8"))["sha256"]
+        deltas = {p.stem: hashlib.sha256(p.read_bytes()).hexdigest() for p in self.delta_paths()}
+        return {"base_sha256": base, "deltas": deltas}
+
+    def export_csv(self, csv_path: Path) -> int:
+        """Write the folded log as a full master_ref.csv."""
+        df = self.read()
+        _atomic_write(csv_path, _to_csv(df))
+        return len(df)
@@ -0,0 +1,84 @@
+"""Packed markdown mirror for stage 03 groups.
+
+The loose mirror writes one ``headlines_<window>_<digest>_<topic>_<group>.md``
+per group.  The packed mirror (``MD_MIRROR_PACK=1``) writes two files per
+digest instead:
+
+    <md_dir>/packed/<digest_id>.md          group contents, concatenated
+    <md_dir>/packed/<digest_id>.index.json  digest_group_id -> byte offset/length
+
+``read_group_markdown`` resolves a ``digest_group_id`` through the index with
+one seek, and falls back to the loose file when the digest was not packed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+
+PACK_SCHEMA = "md_pack.v1"
+
+
+def pack_paths(md_dir: Path, digest_id: str) -> Tuple[Path, Path]:
+    root = md_dir / "packed"
+    return root / f"{digest_id}.md", root / f"{digest_id}.index.json"
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=path.parent, suffix=".tmp") as tmp:
+        tmp.write(data)
+        temp_name = tmp.name
+    os.replace(temp_name, path)
+
+
+def write_pack(md_dir: Path, digest_id: str, groups: Iterable[Tuple[str, str, str]]) -> Path:
+    """Write ``(digest_group_id, loose_filename, content)`` groups as one pack; returns the data file.
+
+    The data file is replaced before the index, so a reader never sees an
+    index pointing past the data it describes.
+    """
+    data_path, index_path = pack_paths(md_dir, digest_id)
+    chunks = []
+    index: Dict[str, dict] = {}
+    offset = 0
+    for group_id, filename, content in groups:
+        blob = content.encode("utf-8")
+        index[group_id] = {"file": filename, "offset": offset, "length": len(blob)}
+        chunks.append(blob)
+        offset += len(blob)
+    _atomic_write_bytes(data_path, b"".join(chunks))
+    payload = {"schema": PACK_SCHEMA, "digest_id": digest_id, "groups": index}
+    _atomic_write_bytes(index_path, (json.dumps(payload, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+    return data_path
+
+
+def load_pack_index(md_dir: Path, digest_id: str) -> Dict[str, dict] | None:
+    index_path = pack_paths(md_dir, digest_id)[1]
+    if not index_path.exists():
+        return None
+    return json.loads(index_path.read_text(encoding="utf-8"))["groups"]
+
+
+def loose_filename(digest_group_id: str) -> str:
+    digest_id, window_type, topic_slug, group_no = digest_group_id.split("::")
+    return f"headlines_{window_type}_{digest_id}_{topic_slug}_{group_no}.md"
+
+
+def read_group_markdown(md_dir: Path, digest_group_id: str) -> str | None:
+    """Markdown of one group from its digest's pack (or loose mirror file); None when absent."""
+    digest_id = digest_group_id.split("::", 1)[0]
+    index = load_pack_index(md_dir, digest_id)
+    if index is None:
+        loose = md_dir / loose_filename(digest_group_id)
+        return loose.read_text(encoding="utf-8") if loose.exists() else None
+    entry = index.get(digest_group_id)
+    if entry is None:
+        return None
+    with pack_paths(md_dir, digest_id)[0].open("rb") as fh:
+        fh.seek(entry["offset"])
+        return fh.read(entry["length"]).decode("utf-8")
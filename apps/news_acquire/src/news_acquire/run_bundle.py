@@ -19,6 +19,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Sequence
 
+from .master_ref_log import MasterRefLog
+
 
 DIGEST_RE = re.compile(r"^\d{8}T\d{2}$")
 
@@ -140,6 +142,20 @@ def _copy_if_exists(source: Path, destination: Path) -> None:
         shutil.copy2(source, destination)
 
 
+def _link_tree_contents(source: Path, destination: Path) -> None:
+    # Hard links where possible: log segments are replaced, never modified in place
+    if not source.exists():
+        return
+    for path in sorted(source.rglob("*")):
+        if path.is_file():
+            target = destination / path.relative_to(source)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, target)
+            except OSError:
+                shutil.copy2(path, target)
+
+
 def _jsonl_count(path: Path) -> int:
     if not path.exists():
         return 0
@@ -175,6 +191,11 @@ def finalize_bundle(
         _copy_if_exists(
             work_root / "input_snapshot" / "master_ref.csv", staging / "inputs" / "master_ref.csv"
         )
+        _copy_if_exists(
+            work_root / "input_snapshot" / "master_ref_state.json", staging / "inputs" / "master_ref_state.json"
+        )
+        # The log state the hour built on; the compactor folds the hour's delta onto it
+        _link_tree_contents(work_root / "input_snapshot" / "master_ref", staging / "inputs" / "master_ref")
         _copy_tree_contents(work_root / "data" / "rss_slices", staging / "stage_outputs" / "rss_slices")
         _copy_tree_contents(work_root / "data" / "digest_map", staging / "stage_outputs" / "digest_map")
         _copy_tree_contents(work_root / "data" / "digest_jsonls", staging / "stage_outputs" / "digest_jsonls")
@@ -182,7 +203,13 @@ def finalize_bundle(
         _copy_tree_contents(work_root / "data" / "quarantine", staging / "evidence" / "quarantine")
         _copy_tree_contents(work_root / "storage" / "buses", staging / "contracts" / "buses")
         _copy_tree_contents(work_root / "storage" / "runs", staging / "evidence" / "export_runs")
-        _copy_if_exists(work_root / "data" / "master_ref.csv", staging / "candidates" / "master_ref.csv")
+        # Log mode carries only the hour's segment (the compactor folds it onto inputs/);
+        # the full CSV is a candidate only from the full-table path
+        delta = work_root / "data" / "master_ref" / "deltas" / f"{digest_at}.csv"
+        if delta.is_file():
+            _copy_if_exists(delta, staging / "candidates" / "master_ref_delta.csv")
+        else:
+            _copy_if_exists(work_root / "data" / "master_ref.csv", staging / "candidates" / "master_ref.csv")
         _copy_if_exists(
             work_root / "storage" / "indexes" / "news_recent_refs_latest.jsonl",
             staging / "candidates" / "news_recent_refs.jsonl",
@@ -243,7 +270,7 @@ def finalize_bundle(
             "source_commit": source_commit,
             "image_digest": image_digest,
             "feed_config_sha256": checksums.get("inputs/sensing_feeds.v1.yaml"),
-            "input_state_digest": checksums.get("inputs/master_ref.csv"),
+            "input_state_digest": checksums.get("inputs/master_ref.csv") or checksums.get("inputs/master_ref_state.json"),
             "started_at": started_at,
             "completed_at": utc_now_iso(),
             "status": status,
@@ -295,8 +322,17 @@ def execute_bundle(
     if work_root.exists():
         raise FileExistsError(f"run workspace already exists: {work_root}")
     work_root.mkdir(parents=True)
+    local_log = MasterRefLog(repo_root / "data" / "master_ref")
     local_master = repo_root / "data" / "master_ref.csv"
-    if local_master.exists():
+    if not local_log.is_empty():
+        # Delta log: the bundle records the log state and only carries this hour's segment
+        _link_tree_contents(local_log.root, work_root / "data" / "master_ref")
+        _link_tree_contents(local_log.root, work_root / "input_snapshot" / "master_ref")
+        (work_root / "input_snapshot").mkdir(parents=True, exist_ok=True)
+        (work_root / "input_snapshot" / "master_ref_state.json").write_text(
+            json.dumps(local_log.state(), sort_keys=True, indent=2) + "\n", encoding="utf-8"
+        )
+    elif local_master.exists():
         (work_root / "data").mkdir(parents=True, exist_ok=True)
         (work_root / "input_snapshot").mkdir(parents=True, exist_ok=True)
         shutil.copy2(local_master, work_root / "data" / "master_ref.csv")
@@ -1,9 +1,13 @@
 # legacy/01_digests.py
 # Pull & slice (no heavy work). Deterministic on DIGEST_AT.
 # - Reads Google News/RSS feeds from a validated, versioned configuration
+#   (concurrently, with per-feed deadlines and outcome records)
 # - Normalizes items, computes stable index_id
-# - Slices into digest windows anchored at DIGEST_AT
-# - Writes CSVs under data/rss_slices/rss_dumps/<digest_file>.csv
+# - Keeps one row per index_id across topic feeds, with every topic in `topics`
+# - Appends valid items to a rolling hour-partitioned article store
+# - Slices into digest windows anchored at DIGEST_AT (fetch + stored history)
+# - Optionally collapses near-duplicate headlines per window (NEAR_DUP_COLLAPSE)
+# - Writes CSVs under data/rss_slices/rss_dumps/<digest_file>.csv (typed Parquet with ARTIFACT_FORMAT)
 # - Optional JSONL mirror: data/slices/jsonl/<digest_id_hour>.jsonl
 # - Independently controls acquisition, artifact writes, enqueue, and DB bookkeeping
 
@@ -11,19 +15,26 @@ from __future__ import annotations
 
 import os
 import sys
+import json
 import hashlib
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd
-import feedparser
 
 # Acquisition-local backend helpers. Keep this stage independent of the removed legacy `backend` package.
 from . import ids, db
 from . import io as bio
+from .article_store import ArticleStore
+from .feed_cache import FeedCache
 from .feed_config import load_feed_config
+from .feed_fetch import DEFAULT_TIMEOUT_SECONDS, DEFAULT_WORKERS, FeedOutcome, fetch_feeds
+from .headline_clusters import cluster_labels
 from .runtime import SensingControls
+from .tables import SLICE_SCHEMA, artifact_formats, write_table
 
 
 # ======================= CONFIG =======================
@@ -33,6 +44,10 @@ SLICE_DIR = DATA_DIR / "rss_slices"
 RSS_DUMPS_DIR = SLICE_DIR / "rss_dumps"
 JSONL_DIR = DATA_DIR / "slices" / "jsonl"
 QUAR_DIR = DATA_DIR / "quarantine"
+FEED_CACHE_DIR = Path(os.getenv("FEED_CACHE_DIR", DATA_DIR / "feed_cache"))
+ARTICLE_STORE_DIR = Path(os.getenv("ARTICLE_STORE_DIR", DATA_DIR / "articles"))
+# Longest window (fortnight) reaches 45 days back from the anchor
+ARTICLE_STORE_RETENTION_HOURS = 46 * 24
 
 # ======================= ENV/UTILS =======================
 
@@ -55,9 +70,47 @@ def compute_uid(title: str, source: str) -> str:
     raw = f"{title}::{source}"
     return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:10]
 
-def stable_index_id_from_row(title: str, source: str, url: str) -> str:
-    # Prefer URL + title + source hashing rule from backend.ids
-    return ids.stable_index_id(title or "", source or "", url or "")
+def assign_index_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Hash (Title, Source, Link) once per fetch; windows then reuse the column."""
+    if df.empty:
+        df["index_id"] = pd.Series(dtype=str)
+        return df
+    cols = [[str(v or "") for v in df[c].tolist()] for c in ("Title", "Source", "Link")]
+    df["index_id"] = ids.stable_index_ids(*cols)
+    return df
+
+def collapse_topics(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per index_id across topic feeds (the first, in ``df`` order).
+
+    ``topics`` is a JSON list of every feed topic that returned the article:
+    the kept row's Topic first, then the others sorted.
+    """
+    if df.empty:
+        df["topics"] = pd.Series(dtype=str)
+        return df
+    topics = pd.Series([json.dumps([t], ensure_ascii=False) for t in df["Topic"]], index=df.index)
+    shared = df["index_id"].duplicated(keep=False)
+    if shared.any():
+        merged = df.loc[shared].groupby("index_id", sort=False)["Topic"].agg(
+            lambda s: json.dumps([s.iat[0]] + sorted(set(s) - {s.iat[0]}), ensure_ascii=False)
+        )
+        topics[shared] = df.loc[shared, "index_id"].map(merged)
+    df["topics"] = topics
+    return df[~df["index_id"].duplicated()].reset_index(drop=True)
+
+def collapse_near_duplicates(gdf: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """Keep the first row of each near-duplicate title cluster within a Topic.
+
+    ``gdf`` is in (Published, Title, Source) order, so the kept (canonical) row
+    is the earliest one; ``aliases`` holds the folded rows' index_ids as JSON.
+    """
+    labels = pd.Series(cluster_labels(gdf["Title"].tolist(), threshold=threshold), index=gdf.index)
+    key = labels.astype(str) + "\x1f" + gdf["Topic"].astype(str)
+    first = ~key.duplicated()
+    aliases = gdf.loc[~first, "index_id"].groupby(key[~first], sort=False).agg(list)
+    out = gdf[first].copy()
+    out["aliases"] = [json.dumps(aliases.get(k, [])) for k in key[first]]
+    return out.reset_index(drop=True)
 
 def clean_title(title: str) -> str:
     # Google News often appends " - Source" to the headline
@@ -98,19 +151,32 @@ def compute_slices(anchor: datetime) -> List[Tuple[str, datetime, datetime]]:
 
 # ======================= CORE =======================
 
-def fetch_rss_now(feeds: Dict[str, str], limit: int | None) -> pd.DataFrame:
+FETCH_COLUMNS = ["uid", "Topic", "Title", "Link", "Published", "Source"]
+
+def fetch_rss_now(
+    feeds: Dict[str, str],
+    limit: int | None,
+    *,
+    max_workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    outcomes: List[FeedOutcome] | None = None,
+    cache: FeedCache | None = None,
+) -> pd.DataFrame:
     rows: List[dict] = []
-    for topic, url in feeds.items():
-        feed = feedparser.parse(url)
-        entries = feed.entries if limit is None else feed.entries[: int(limit)]
+    # Network is concurrent; row assembly below stays in feed-config order.
+    results = fetch_feeds(feeds, max_workers=max_workers, timeout=timeout, cache=cache)
+    for result in results:
+        if outcomes is not None and result.outcome is not None:
+            outcomes.append(result.outcome)
+        topic = result.topic
+        entries = result.entries if limit is None else result.entries[: int(limit)]
         for e in entries:
-            title = clean_title(getattr(e, "title", "") or "")
-            link = getattr(e, "link", "") or ""
-            # published string; pandas will normalize to UTC later
-            published = getattr(e, "published", "") or getattr(e, "updated", "") or ""
+            title = clean_title(e.get("title") or "")
+            link = e.get("link") or ""
+            # published string (falls back to updated); pandas will normalize to UTC later
+            published = e.get("published") or ""
             # Google News may embed 'source'
-            src_title = getattr(getattr(e, "source", None), "title", None)
-            source = (src_title or "").strip() or "N/A"
+            source = (e.get("source") or "").strip() or "N/A"
 
             uid = compute_uid(title, source)
 
@@ -125,7 +191,8 @@ def fetch_rss_now(feeds: Dict[str, str], limit: int | None) -> pd.DataFrame:
                 }
             )
 
-    df = pd.DataFrame(rows)
+    # No rows (every feed failed or was empty) still yields the fetch columns
+    df = pd.DataFrame(rows, columns=FETCH_COLUMNS)
     if df.empty:
         return df
 
@@ -134,8 +201,8 @@ def fetch_rss_now(feeds: Dict[str, str], limit: int | None) -> pd.DataFrame:
     df = df.dropna(subset=["Published"]).copy()
     # Sort for stable assignment
     df = df.sort_values(["Published", "Title", "Source"]).reset_index(drop=True)
-    # Dedup within this fetch by (Title, Source, Link)
-    df = df.drop_duplicates(subset=["Title", "Source", "Link"], keep="first")
+    # Dedup within each topic feed by (Title, Source, Link); hits across topics are merged by collapse_topics
+    df = df.drop_duplicates(subset=["Title", "Source", "Link", "Topic"], keep="first")
     return df
 
 def validate_row_v01(r: pd.Series) -> Tuple[bool, str | None]:
@@ -149,18 +216,56 @@ def validate_row_v01(r: pd.Series) -> Tuple[bool, str | None]:
         return False, "bad_published"
     return True, None
 
+def _blank(col: pd.Series) -> pd.Series:
+    # Column-wise `not str(v or "").strip()`, as in validate_row_v01
+    return col.where(col.astype(bool), "").astype(str).str.strip() == ""
+
+def validation_reasons(df: pd.DataFrame) -> np.ndarray:
+    """V01 failure reason per row (None when valid), computed column-wise.
+
+    Checks run in validate_row_v01's order; the first failing check names the
+    row.  Windows index into the result by position.
+    """
+    reasons = pd.Series([None] * len(df), index=df.index, dtype=object)
+    checks = [
+        ("missing_title", _blank(df["Title"])),
+        ("missing_source", _blank(df["Source"])),
+        ("missing_link", _blank(df["Link"])),
+        ("bad_published", df["Published"].isna()),
+    ]
+    for reason, failed in reversed(checks):
+        reasons[failed] = reason
+    return reasons.to_numpy()
+
+def v01_quarantine_records(
+    df_slice: pd.DataFrame,
+    positions: np.ndarray,
+    reasons: np.ndarray,
+    label: str,
+    digest_file: str,
+    digest_id: str,
+) -> List[dict]:
+    """Quarantine records for the rows of one window at ``positions``."""
+    bad = df_slice.iloc[positions].copy()
+    bad.insert(0, "article_id", positions + 1)
+    bad["Published"] = [ts.isoformat() if pd.notna(ts) else None for ts in bad["Published"]]
+    bad["window_type"] = label
+    bad["digest_file"] = digest_file
+    return [
+        {"reason": reason, "row": row, "digest_id": digest_id, "window_type": label}
+        for reason, row in zip(reasons[positions], bad.to_dict("records"))
+    ]
+
+def window_bounds(published: pd.Series, start: datetime, end: datetime) -> Tuple[int, int]:
+    """Row positions [lo, hi) of the window [start, end) in a Published-sorted frame."""
+    lo = int(published.searchsorted(pd.Timestamp(start), side="left"))
+    hi = int(published.searchsorted(pd.Timestamp(end), side="left"))
+    return lo, hi
+
 def write_jsonl_mirror_atomic(path: Path, records: List[dict]) -> None:
     # replace-on-write to avoid duplication across reruns
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.parent.mkdir(parents=True, exist_ok=True)
-    if tmp.exists():
-        tmp.unlink()
-    with tmp.open("wb") as f:
-        for rec in records:
-            bio.append_jsonl(path=tmp, obj=rec)
-    if path.exists():
-        path.unlink()
-    tmp.rename(path)
+    with bio.JsonlWriter(path) as out:
+        out.write_many(records)
 
 
 def _serializable_row(r):
@@ -184,6 +289,15 @@ def run() -> int:
     sample = _env_float("SAMPLE", None)
     null_sink = _env_bool("NULL_SINK", False)
     run_id = os.getenv("RUN_ID")
+    fetch_workers = int(_env_float("FEED_FETCH_WORKERS", DEFAULT_WORKERS) or DEFAULT_WORKERS)
+    fetch_timeout = _env_float("FEED_FETCH_TIMEOUT", DEFAULT_TIMEOUT_SECONDS) or DEFAULT_TIMEOUT_SECONDS
+    # The conditional-GET cache is persistent local state, so it follows WRITE_ARTIFACTS.
+    use_cache = _env_bool("FEED_CACHE", True) and controls.write_artifacts and not null_sink
+    # Same for the rolling article history the windows are assembled from.
+    use_store = _env_bool("ARTICLE_STORE", True) and controls.write_artifacts and not null_sink
+    retention_hours = _env_float("ARTICLE_STORE_RETENTION_HOURS", ARTICLE_STORE_RETENTION_HOURS) or ARTICLE_STORE_RETENTION_HOURS
+    near_dup = _env_bool("NEAR_DUP_COLLAPSE", False)
+    near_dup_threshold = _env_float("NEAR_DUP_THRESHOLD", 0.7) or 0.7
 
     # Anchor hour (deterministic)
     if digest_at_env:
@@ -204,11 +318,19 @@ def run() -> int:
         db.start_run(run_id, stage_name, {"digest_id": digest_id})
 
     # Acquisition and downstream side effects are deliberately independent.
+    feed_outcomes: List[FeedOutcome] = []
     try:
         df_news = (
-            fetch_rss_now(feeds, limit=None if limit is None else int(limit))
+            fetch_rss_now(
+                feeds,
+                limit=None if limit is None else int(limit),
+                max_workers=fetch_workers,
+                timeout=fetch_timeout,
+                outcomes=feed_outcomes,
+                cache=FeedCache(FEED_CACHE_DIR) if use_cache else None,
+            )
             if controls.acquire_network
-            else pd.DataFrame(columns=["uid", "Topic", "Title", "Link", "Published", "Source"])
+            else pd.DataFrame(columns=FETCH_COLUMNS)
         )
     except Exception as exc:
         if controls.db_run_bookkeeping:
@@ -229,70 +351,98 @@ def run() -> int:
     if not df_news.empty:
         df_news["Published"] = pd.to_datetime(df_news["Published"], errors="coerce", utc=True)
         df_news = df_news.dropna(subset=["Published"]).copy()
+    # Stable index_id (Title, Source, Link), hashed once for every window
+    df_news = assign_index_ids(df_news)
+    # Sort once; every window below is then a binary-searched range of rows
+    if not df_news.empty:
+        df_news = df_news.sort_values(["Published", "Title", "Source"]).reset_index(drop=True)
+    # The same article from several topic feeds becomes one row (earliest kept) carrying all topics
+    fetched_rows = len(df_news)
+    df_news = collapse_topics(df_news)
+    cross_topic_collapsed = fetched_rows - len(df_news)
+    reasons = validation_reasons(df_news)
 
     # ----- slice plan -----
     slices = compute_slices(anchor_dt)
 
+    # ----- rolling history -----
+    # Store this fetch's valid rows, then add stored rows the fetch no longer returns
+    fresh_ids = set(df_news["index_id"])
+    history_added = history_rows = 0
+    if use_store and slices:
+        store = ArticleStore(ARTICLE_STORE_DIR)
+        history_added = store.append(df_news[pd.isna(reasons)])
+        history = store.read_range(min(s for _, s, _ in slices), max(e for _, _, e in slices))
+        history = history[~history["index_id"].isin(fresh_ids)]
+        history_rows = len(history)
+        if history_rows:
+            combined = pd.concat([df_news, history[list(df_news.columns)]], ignore_index=True)
+            order = combined.sort_values(["Published", "Title", "Source"]).index
+            reasons = np.concatenate([reasons, np.full(history_rows, None, dtype=object)])[order.to_numpy()]
+            df_news = combined.loc[order].reset_index(drop=True)
+        store.prune(anchor_dt - timedelta(hours=retention_hours))
+
     total_ok = 0
     total_bad = 0
+    reason_counts: Counter = Counter()
+    quarantine_records: List[dict] = []
     mirror_records: List[dict] = []
+    scrape_items: List[tuple] = []
+    enqueued = enqueue_skipped = 0
+    near_dup_stats: Dict[str, dict] = {}
 
     # Where to write
     out_dir = RSS_DUMPS_DIR if not null_sink else (DATA_DIR / "_tmp" / "null" / "rss_dumps")
+    formats = artifact_formats()
     if controls.write_artifacts:
         out_dir.mkdir(parents=True, exist_ok=True)
     mirror_path = (JSONL_DIR / f"{digest_id}.jsonl") if not null_sink else (DATA_DIR / "_tmp" / "null" / "slices" / "jsonl" / f"{digest_id}.jsonl")
+    outcomes_path = (SLICE_DIR if not null_sink else (DATA_DIR / "_tmp" / "null")) / "feed_outcomes" / f"{digest_id}.jsonl"
+    near_dup_path = (SLICE_DIR if not null_sink else (DATA_DIR / "_tmp" / "null")) / "near_dup" / f"{digest_id}.jsonl"
+    slice_schema = {**SLICE_SCHEMA, "aliases": "str"} if near_dup else SLICE_SCHEMA
+
+    # Per-feed acquisition evidence (replace-on-write, like the mirror)
+    if controls.write_artifacts and feed_outcomes:
+        write_jsonl_mirror_atomic(outcomes_path, [o.public_record() for o in feed_outcomes])
+    feeds_ok = sum(1 for o in feed_outcomes if o.status == "ok")
+    feeds_cached = sum(1 for o in feed_outcomes if o.cache == "hit")
 
     # ----- per-slice processing -----
     for (label, start, end) in slices:
-        # filter by window [start, end)
-        if df_news.empty:
-            df_slice = df_news.copy()
-        else:
-            df_slice = df_news[(df_news["Published"] >= start) & (df_news["Published"] < end)].copy()
-
-        if df_slice.empty:
+        # window [start, end) as a contiguous range of the sorted fetch
+        lo, hi = window_bounds(df_news["Published"], start, end)
+        if lo >= hi:
             continue
 
-        # Assign within-slice fields
-        df_slice = df_slice.sort_values(["Published", "Title", "Source"]).reset_index(drop=True)
-        df_slice.insert(0, "article_id", df_slice.index + 1)
-        df_slice["window_type"] = label
         digest_file = f"{label}_{digest_id}00"
-        df_slice["digest_file"] = digest_file
-
-        # Compute stable index_id (Title, Source, Link)
-        df_slice["index_id"] = df_slice.apply(
-            lambda r: stable_index_id_from_row(str(r.get("Title") or ""), str(r.get("Source") or ""), str(r.get("Link") or "")),
-            axis=1,
-        )
-
-        # Validate rows, quarantine failures
-        good_rows: List[dict] = []
-        for _, r in df_slice.iterrows():
-            ok, reason = validate_row_v01(r)
-            if not ok:
-                total_bad += 1
-
-                r = _serializable_row(r)
-                if controls.write_artifacts:
-                    bio.append_jsonl(quarantine_path("V01", run_id), {
-                    "reason": reason,
-                    "row": r,
-                    "digest_id": digest_id,
-                    "window_type": label
-                    })
-                continue
-            good_rows.append(r.to_dict())
-
-        if not good_rows:
+        df_slice = df_news.iloc[lo:hi]
+        slice_reasons = reasons[lo:hi]
+
+        # Quarantine rows that failed validation (reasons computed once per fetch)
+        good_mask = pd.isna(slice_reasons)
+        bad_pos = np.flatnonzero(~good_mask)
+        if len(bad_pos):
+            total_bad += len(bad_pos)
+            reason_counts.update(slice_reasons[bad_pos])
+            quarantine_records.extend(
+                v01_quarantine_records(df_slice, bad_pos, slice_reasons, label, digest_file, digest_id)
+            )
+        if not good_mask.any():
             continue
 
+        gdf = df_slice[good_mask].reset_index(drop=True)
+        gdf.insert(0, "article_id", gdf.index + 1)
+        gdf["window_type"] = label
+        gdf["digest_file"] = digest_file
+
         # Collapse duplicates within slice by index_id (keep earliest Published)
-        gdf = pd.DataFrame(good_rows)
         gdf = gdf.sort_values(["index_id", "Published"]).drop_duplicates(subset=["index_id"], keep="first")
         # Re-number article_id after dedup to maintain 1..N
         gdf = gdf.sort_values(["Published", "Title", "Source"]).reset_index(drop=True)
+        if near_dup:
+            rows_in = len(gdf)
+            gdf = collapse_near_duplicates(gdf, near_dup_threshold)
+            near_dup_stats[label] = {"rows_in": rows_in, "rows_out": len(gdf), "collapsed": rows_in - len(gdf)}
         gdf["article_id"] = gdf.index + 1
 
         # Column order for CSV contract
@@ -307,17 +457,16 @@ def run() -> int:
             "uid",
             "index_id",
             "Topic",
-        ]
+            "topics",
+        ] + (["aliases"] if near_dup else [])
         for c in cols:
             if c not in gdf.columns:
                 gdf[c] = "" if c not in ("Published", "article_id") else (pd.NaT if c == "Published" else 0)
         gdf = gdf[cols]
 
-        # Write slice CSV (overwrite)
-        out_path = out_dir / f"{digest_file}.csv"
+        # Write slice table (overwrite): CSV and/or typed Parquet per ARTIFACT_FORMAT
         if controls.write_artifacts:
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            gdf.to_csv(out_path, index=False)
+            write_table(gdf, out_dir / digest_file, slice_schema, formats)
         total_ok += len(gdf)
 
         # Mirror JSONL (per-row)
@@ -333,44 +482,85 @@ def run() -> int:
                 "seed_url": r["Link"],
                 "published": pd.to_datetime(r["Published"]).isoformat() if pd.notna(r["Published"]) else None,
                 "topic": r.get("Topic", ""),
+                "topics": json.loads(r["topics"]),
             }
+            if near_dup:
+                rec["aliases"] = json.loads(r["aliases"])
             mirror_records.append(rec)
 
-            # Enqueue scrape jobs (side effect)
-            if controls.enqueue_scrape:
-                try:
-                    db.push_work(
-                        "scrape",
-                        r["index_id"],
-                        {
-                            "index_id": r["index_id"],
-                            "digest_id_hour": digest_id,
-                            "source": r["Source"],
-                            "title": r["Title"],
-                            "url": r["Link"],
-                        },
-                    )
-                except Exception as e:
-                    # Don't break the whole slice on queue errors; send to quarantine
-                    r = _serializable_row(r)
-                    if controls.write_artifacts:
-                        bio.append_jsonl(quarantine_path("V01", run_id), {
-                        "reason": f"enqueue_error:{type(e).__name__}",
-                        "error": str(e), 
-                        "row": r,
-                        "digest_id": digest_id,
-                        })
+            # Scrape jobs (fresh rows only) are collected here and enqueued once per digest below
+            if controls.enqueue_scrape and r["index_id"] in fresh_ids:
+                scrape_items.append((r["index_id"], {
+                    "index_id": r["index_id"],
+                    "digest_id_hour": digest_id,
+                    "source": r["Source"],
+                    "title": r["Title"],
+                    "url": r["Link"],
+                }, r))
+
+    # Enqueue scrape jobs (side effect): one connection, one transaction
+    if scrape_items:
+        try:
+            enqueued, enqueue_skipped = db.push_work_many("scrape", [(key, payload) for key, payload, _ in scrape_items])
+        except Exception as e:
+            # Don't break the whole digest on queue errors; send its rows to quarantine
+            reason = f"enqueue_error:{type(e).__name__}"
+            reason_counts[reason] += len(scrape_items)
+            quarantine_records.extend({
+                "reason": reason,
+                "error": str(e),
+                "row": _serializable_row(r),
+                "digest_id": digest_id,
+            } for _, _, r in scrape_items)
+
+    # Quarantine is written as one block per run (append: retries of a run_id accumulate)
+    if controls.write_artifacts and quarantine_records:
+        with bio.JsonlWriter(quarantine_path("V01", run_id), append=True) as quarantine:
+            quarantine.write_many(quarantine_records)
+
+    # Near-duplicate collapse evidence per window (replace-on-write)
+    near_dup_collapsed = sum(v["collapsed"] for v in near_dup_stats.values())
+    if controls.write_artifacts and near_dup_stats:
+        write_jsonl_mirror_atomic(near_dup_path, [
+            {"digest_id": digest_id, "window_type": label, "threshold": near_dup_threshold, **stats}
+            for label, stats in near_dup_stats.items()
+        ])
 
     # Write/replace the JSONL mirror once (atomic)
     if controls.write_artifacts and mirror_records:
         write_jsonl_mirror_atomic(mirror_path, mirror_records)
 
     if controls.db_run_bookkeeping:
-        db.finish_run(run_id, stage=stage_name, ok=total_ok, fail=total_bad, meta={"digest_id": digest_id, "slices": len(slices)})
+        db.finish_run(
+            run_id,
+            stage=stage_name,
+            ok=total_ok,
+            fail=total_bad,
+            meta={
+                "digest_id": digest_id,
+                "slices": len(slices),
+                "feeds": len(feed_outcomes),
+                "feeds_ok": feeds_ok,
+                "feeds_cache_hit": feeds_cached,
+                "scrape_enqueued": enqueued,
+                "scrape_enqueue_skipped": enqueue_skipped,
+                "feed_fetch_ms_max": max((o.elapsed_ms for o in feed_outcomes), default=0),
+                "history_rows": history_rows,
+                "history_added": history_added,
+                "cross_topic_collapsed": cross_topic_collapsed,
+                "near_dup_collapsed": near_dup_collapsed,
+                "quarantine_reasons": dict(sorted(reason_counts.items())),
+            },
+        )
 
     # Console summary
     print(
         f"[{stage_name}] digest_id={digest_id} ok={total_ok} bad={total_bad} slices={len(slices)} "
+        f"feeds_ok={feeds_ok}/{len(feed_outcomes)} feeds_cache_hit={feeds_cached} "
+        f"scrape_enqueued={enqueued} scrape_enqueue_skipped={enqueue_skipped} "
+        f"history_rows={history_rows} history_added={history_added} near_dup_collapsed={near_dup_collapsed} "
+        f"cross_topic_collapsed={cross_topic_collapsed} "
+        f"bad_reasons={','.join(f'{k}:{v}' for k, v in sorted(reason_counts.items())) or '-'} "
         f"acquire_network={controls.acquire_network} write_artifacts={controls.write_artifacts} "
         f"enqueue_scrape={controls.enqueue_scrape} db_run_bookkeeping={controls.db_run_bookkeeping} "
         f"null_sink={null_sink}"
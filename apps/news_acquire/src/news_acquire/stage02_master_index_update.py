@@ -4,19 +4,24 @@ from __future__ import annotations
 
 import os
 import sys
+import json
 from pathlib import Path
 from typing import List, Tuple, Dict
 
+import numpy as np
 import pandas as pd
 from pandas.errors import EmptyDataError
 
 from . import ids, db
 from . import io as bio
+from .master_ref_log import MasterRefLog
 from .runtime import SensingControls
+from .tables import DIGEST_MAP_SCHEMA, artifact_formats, read_table, table_paths, write_table
 
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
 RSS_DUMPS_DIR = DATA_DIR / "rss_slices" / "rss_dumps"
 MASTER_REF_CSV = DATA_DIR / "master_ref.csv"
+MASTER_REF_LOG_DIR = DATA_DIR / "master_ref"
 DIGEST_MAP_DIR = DATA_DIR / "digest_map"
 QUAR_DIR = DATA_DIR / "quarantine"
 
@@ -40,30 +45,57 @@ def quarantine_path(stage: str, run_id: str) -> Path:
 REQUIRED_COLS = ["digest_file", "window_type", "article_id", "Title", "Source", "Link", "Published", "index_id"]
 
 
-def validate_input_df(df: pd.DataFrame, run_id: str, write_artifacts: bool = True) -> Tuple[pd.DataFrame, int]:
-    """Ensure required columns and sane values; quarantine bad rows."""
+def _blank(col: pd.Series) -> pd.Series:
+    return col.astype(str).str.strip() == ""
+
+
+def v02_reasons(df: pd.DataFrame) -> pd.Series:
+    """First failing V02 check per row (None when valid), computed column-wise."""
+    checks = [
+        ("bad_published", df["Published"].isna()),
+        ("missing_title", _blank(df["Title"])),
+        ("missing_source", _blank(df["Source"])),
+        ("missing_link", _blank(df["Link"])),
+        ("missing_digest_file", _blank(df["digest_file"])),
+        ("missing_article_id", _blank(df["article_id"])),
+    ]
+    reasons = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for reason, failed in reversed(checks):
+        reasons[failed] = reason
+    return reasons
+
+
+def validate_input_df(
+    df: pd.DataFrame,
+    run_id: str,
+    write_artifacts: bool = True,
+    breakdown: Dict[str, int] | None = None,
+) -> Tuple[pd.DataFrame, int]:
+    """Ensure required columns and sane values; quarantine bad rows.
+
+    Bad rows keep ``reason: bad_row`` and name the failed check in ``detail``;
+    per-check counts are added to ``breakdown`` when given.
+    """
     missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
         raise ValueError(f"02_master_index_update: missing required columns: {missing}")
 
     df["Published"] = pd.to_datetime(df["Published"], errors="coerce", utc=True)
 
-    bad_mask = (
-        df["Published"].isna()
-        | (df["Title"].astype(str).str.strip() == "")
-        | (df["Source"].astype(str).str.strip() == "")
-        | (df["Link"].astype(str).str.strip() == "")
-        | (df["digest_file"].astype(str).str.strip() == "")
-        | (df["article_id"].astype(str).str.strip() == "")
-    )
+    reasons = v02_reasons(df)
+    bad_mask = reasons.notna()
 
     bad = df[bad_mask]
-    if write_artifacts:
-        for _, r in bad.iterrows():
-            bio.append_jsonl(
-                quarantine_path("V02", run_id),
-                {"reason": "bad_row", "row": _serializable_row(r)},
-            )
+    if breakdown is not None:
+        for reason, count in reasons[bad_mask].value_counts().items():
+            breakdown[reason] = breakdown.get(reason, 0) + int(count)
+    if write_artifacts and not bad.empty:
+        records = [
+            {"reason": "bad_row", "detail": detail, "row": row}
+            for detail, row in zip(reasons[bad_mask], _serializable_rows(bad))
+        ]
+        with bio.JsonlWriter(quarantine_path("V02", run_id), append=True) as quarantine:
+            quarantine.write_many(records)
 
     good = df[~bad_mask].copy()
     good["article_id"] = good["article_id"].astype(str)
@@ -71,19 +103,61 @@ def validate_input_df(df: pd.DataFrame, run_id: str, write_artifacts: bool = Tru
     return good, len(bad)
 
 
-def _serializable_row(r: pd.Series) -> Dict:
-    row = r.to_dict()
-    for k, v in row.items():
-        if hasattr(v, 'isoformat'):
-            row[k] = v.isoformat()
-        elif pd.isna(v):
-            row[k] = None
-    return row
+def _serializable_rows(df: pd.DataFrame) -> List[Dict]:
+    """JSON-ready row dicts: timestamps as ISO strings, other missing values as None."""
+    out = df.astype(object).where(df.notna(), None)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            # NaT is kept as the string "NaT" (quarantine schema predates this helper)
+            out[col] = [v.isoformat() for v in df[col]]
+    return out.to_dict("records")
 
 
 def load_hour_slice_files(digest_id: str) -> List[Path]:
-    pattern = f"*_{digest_id}00.csv"
-    return sorted(RSS_DUMPS_DIR.glob(pattern))
+    # One file per slice: the typed Parquet table when stage 01 wrote one, else the CSV
+    return table_paths(RSS_DUMPS_DIR, f"*_{digest_id}00")
+
+
+def _json_cell(value, kind: type):
+    """A topics/meta CSV cell as a list/dict; blanks and malformed values become empty."""
+    if isinstance(value, kind):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return kind()
+        return parsed if isinstance(parsed, kind) else kind()
+    return kind()
+
+
+def _json_text(values: pd.Series, kind: type) -> pd.Series:
+    """topics/meta cells as canonical JSON text.
+
+    Nearly every cell is the empty literal ("[]"/"{}") and passes through;
+    only the others are parsed and re-serialized.
+    """
+    empty = json.dumps(kind())
+    out = values.astype(object).where(values.notna(), empty)
+    todo = out != empty
+    if todo.any():
+        out[todo] = [json.dumps(_json_cell(v, kind), ensure_ascii=False, sort_keys=True) for v in out[todo]]
+    return out
+
+
+def _seen_text(values: pd.Series) -> pd.Series:
+    """UTC timestamps as to_csv writes them ("YYYY-MM-DD HH:MM:SS+00:00").
+
+    to_csv formats tz-aware values one at a time; whole-second columns are
+    formatted in one numpy call instead.  Anything else is returned unchanged.
+    """
+    if not isinstance(values.dtype, pd.DatetimeTZDtype) or str(values.dt.tz) != "UTC":
+        return values
+    if ((values.dt.microsecond != 0) | (values.dt.nanosecond != 0)).any():
+        return values
+    text = np.datetime_as_string(values.dt.tz_localize(None).to_numpy("datetime64[s]"), unit="s")
+    text = np.char.add(np.char.replace(text, "T", " "), "+00:00")
+    return pd.Series(text, index=values.index, dtype=object).where(values.notna(), None)
 
 
 def load_master_ref_csv() -> pd.DataFrame:
@@ -95,6 +169,10 @@ def load_master_ref_csv() -> pd.DataFrame:
         for col in ("first_seen", "last_seen"):
             if col in df.columns:
                 df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+        # Kept as JSON text: the merge only carries them over
+        for col, kind in (("topics", list), ("meta", dict)):
+            if col in df.columns:
+                df[col] = _json_text(df[col], kind)
         return df
     return pd.DataFrame(columns=["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"])
 
@@ -107,22 +185,73 @@ def write_master_ref_csv(df: pd.DataFrame, null_sink: bool) -> None:
         if c not in df.columns:
             df[c] = None
     df = df[cols].drop_duplicates(subset=["index_id"], keep="last").sort_values("index_id")
-    df["topics"] = df["topics"].apply(lambda v: v if isinstance(v, list) else [])
-    df["meta"] = df["meta"].apply(lambda v: v if isinstance(v, dict) else {})
+    # JSON, not the Python repr to_csv would give, so load_master_ref_csv reads them back
+    df["topics"] = _json_text(df["topics"], list)
+    df["meta"] = _json_text(df["meta"], dict)
+    for col in ("first_seen", "last_seen"):
+        df[col] = _seen_text(df[col])
     df.to_csv(out, index=False)
 
 
 def write_digest_map_csv(df_map: pd.DataFrame, digest_id: str, null_sink: bool) -> Path:
     out_dir = (DATA_DIR / "_tmp" / "null" / "digest_map") if null_sink else DIGEST_MAP_DIR
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out = out_dir / f"{digest_id}.csv"
-    cols = ["digest_file", "article_id", "index_id", "Title", "Source", "Link", "Published", "window_type"]
+    cols = ["digest_file", "article_id", "index_id", "Title", "Source", "Link", "Published", "window_type", "topics"]
     for c in cols:
         if c not in df_map.columns:
-            df_map[c] = None
+            df_map[c] = "[]" if c == "topics" else None
     df_map = df_map[cols].drop_duplicates(subset=["digest_file", "article_id"], keep="last").sort_values(["digest_file", "article_id"])
-    df_map.to_csv(out, index=False)
-    return out
+    return write_table(df_map, out_dir / digest_id, DIGEST_MAP_SCHEMA, artifact_formats())
+
+
+def _suffixed(merged: pd.DataFrame, name: str) -> pd.Series:
+    if name in merged.columns:
+        return merged[name]
+    return pd.Series(None, index=merged.index, dtype=object)
+
+
+def merge_master_ref(master_prev: pd.DataFrame, hour_stats: pd.DataFrame) -> pd.DataFrame:
+    """Full-table merge of one hour into master_ref (MASTER_REF_LOG=0).
+
+    Column-wise: non-empty new source/link win over previous values,
+    first_seen/last_seen widen, topics/meta carry over from the previous table
+    (JSON text as load_master_ref_csv returns it; new rows start empty).
+    """
+    if not master_prev.empty:
+        merged = pd.merge(
+            master_prev,
+            hour_stats,
+            on="index_id",
+            how="outer",
+            suffixes=("_prev", "_new"),
+        )
+
+        # ensure suffix columns exist before time computations
+        for col in ("first_seen_prev", "first_seen_new", "last_seen_prev", "last_seen_new"):
+            if col not in merged.columns:
+                merged[col] = pd.NaT
+
+        for col in ("source", "link"):
+            prev, new = _suffixed(merged, f"{col}_prev"), _suffixed(merged, f"{col}_new")
+            merged[col] = new.where(new.notna() & (new != ""), prev)
+
+        merged["first_seen"] = merged[["first_seen_prev", "first_seen_new"]].min(axis=1)
+        merged["last_seen"] = merged[["last_seen_prev", "last_seen_new"]].max(axis=1)
+
+        # topics/meta only exist on the previous side (so usually unsuffixed);
+        # rows without them get the []/{} default from write_master_ref_csv
+        for col in ("topics", "meta"):
+            if f"{col}_prev" in merged.columns:
+                merged[col] = merged[f"{col}_prev"]
+            elif col not in merged.columns:
+                merged[col] = None
+
+        master_final = merged[["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"]].copy()
+    else:
+        master_final = hour_stats.copy()
+        master_final["topics"] = "[]"
+        master_final["meta"] = "{}"
+    return master_final
+
 
 # -------------------- core --------------------
 
@@ -130,7 +259,13 @@ def run() -> int:
     digest_at_env = os.getenv("DIGEST_AT")
     controls = SensingControls.from_env()
     null_sink = _env_bool("NULL_SINK", False)
+    use_log = _env_bool("MASTER_REF_LOG", True)
+    # With the log, data/master_ref.csv is refreshed when the base is folded (and on
+    # promotion), not every hour; MASTER_REF_CSV_EXPORT=1 refreshes it every hour
+    export_csv = _env_bool("MASTER_REF_CSV_EXPORT", False)
+    compact_ratio = float(os.getenv("MASTER_REF_COMPACT_RATIO", "0.25"))
     run_id = os.getenv("RUN_ID")
+    master_ref_out = (DATA_DIR / "_tmp" / "null" / "master_ref.csv") if null_sink else MASTER_REF_CSV
 
     if digest_at_env:
         digest_id, _ = ids.digest_id_hour(digest_at_env)
@@ -153,12 +288,15 @@ def run() -> int:
         return 0
 
     dfs: List[pd.DataFrame] = []
+    read_errors: List[Dict] = []
     for p in files:
         try:
-            dfs.append(pd.read_csv(p))
+            dfs.append(read_table(p))
         except Exception as e:
-            if controls.write_artifacts:
-                bio.append_jsonl(quarantine_path("V02", run_id), {"reason": "read_error", "file": str(p), "error": str(e)})
+            read_errors.append({"reason": "read_error", "file": str(p), "error": str(e)})
+    if controls.write_artifacts and read_errors:
+        with bio.JsonlWriter(quarantine_path("V02", run_id), append=True) as quarantine:
+            quarantine.write_many(read_errors)
 
     if not dfs:
         if controls.db_run_bookkeeping:
@@ -167,8 +305,9 @@ def run() -> int:
         return 1
 
     raw = pd.concat(dfs, ignore_index=True)
+    bad_reasons: Dict[str, int] = {"read_error": len(read_errors)} if read_errors else {}
     try:
-        good, n_bad = validate_input_df(raw, run_id, controls.write_artifacts)
+        good, n_bad = validate_input_df(raw, run_id, controls.write_artifacts, breakdown=bad_reasons)
     except Exception as exc:
         if controls.db_run_bookkeeping:
             db.finish_run(
@@ -185,8 +324,11 @@ def run() -> int:
         print(f"[{stage_name}] digest_id={digest_id} all rows invalid")
         return 1
 
+    # Slices from before stage 01 carried `topics` have only their Topic
+    if "topics" not in good.columns:
+        good["topics"] = [json.dumps([t], ensure_ascii=False) if isinstance(t, str) and t else "[]" for t in good.get("Topic", [None] * len(good))]
     digest_map = (
-        good[["digest_file", "article_id", "index_id", "Title", "Source", "Link", "Published", "window_type"]]
+        good[["digest_file", "article_id", "index_id", "Title", "Source", "Link", "Published", "window_type", "topics"]]
         .copy()
     )
     digest_map = digest_map.sort_values(["digest_file", "article_id", "Published"]).drop_duplicates(
@@ -203,55 +345,28 @@ def run() -> int:
         last_seen=("Published", "max"),
     ).reset_index()
 
-    master_prev = load_master_ref_csv()
-    if not master_prev.empty:
-        merged = pd.merge(
-            master_prev,
-            hour_stats,
-            on="index_id",
-            how="outer",
-            suffixes=("_prev", "_new"),
-        )
-        # ensure suffix columns exist before time computations
-        for col in ("first_seen_prev", "first_seen_new", "last_seen_prev", "last_seen_new"):
-            if col not in merged.columns:
-                merged[col] = pd.NaT
-
-        def _coalesce(src_prev, src_new):
-            return src_new if pd.notna(src_new) and src_new != "" else src_prev
-
-        merged["source"] = merged.apply(lambda r: _coalesce(r.get("source_prev"), r.get("source_new")), axis=1)
-        merged["link"] = merged.apply(lambda r: _coalesce(r.get("link_prev"), r.get("link_new")), axis=1)
-
-        # Ensure time columns exist before computing mins/maxs
-        for col in ("first_seen_prev", "first_seen_new", "last_seen_prev", "last_seen_new"):
-            if col not in merged.columns:
-                merged[col] = pd.NaT
-
-        merged["first_seen"] = merged[["first_seen_prev", "first_seen_new"]].min(axis=1)
-        merged["last_seen"] = merged[["last_seen_prev", "last_seen_new"]].max(axis=1)
-
-        if "topics_prev" in merged.columns:
-            merged["topics"] = merged["topics_prev"]
-        else:
-            merged["topics"] = [[] for _ in range(len(merged))]
-        if "meta_prev" in merged.columns:
-            merged["meta"] = merged["meta_prev"]
-        else:
-            merged["meta"] = [{} for _ in range(len(merged))]
-
-        master_final = merged[["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"]].copy()
-    else:
-        master_final = hour_stats.copy()
-        master_final["topics"] = [[] for _ in range(len(master_final))]
-        master_final["meta"] = [{} for _ in range(len(master_final))]
-
+    log_deltas = 0
     if controls.write_artifacts:
-        write_master_ref_csv(master_final, null_sink)
+        if use_log:
+            # Append-only: this hour's segment; the base is refolded only once the pending
+            # segments reach compact_ratio of its size, so that O(N) rewrite is amortized
+            log = MasterRefLog((DATA_DIR / "_tmp" / "null" / "master_ref") if null_sink else MASTER_REF_LOG_DIR)
+            log.seed(MASTER_REF_CSV)
+            compacted = log.compact() if log.pending_ratio() >= compact_ratio else 0
+            log.append_delta(digest_id, hour_stats)
+            log_deltas = len(log.delta_paths())
+            if export_csv or compacted or not master_ref_out.exists():
+                log.export_csv(master_ref_out)
+        else:
+            write_master_ref_csv(merge_master_ref(load_master_ref_csv(), hour_stats), null_sink)
 
     ok_rows = len(hour_stats)
     if controls.db_run_bookkeeping:
         try:
+            # Every topic an article was seen under this hour; the DB merge unions them over time
+            topics = good.groupby("index_id")["topics"].agg(
+                lambda s: sorted({t for v in s.dropna() for t in json.loads(v or "[]")})
+            )
             payload = []
             for _, r in hour_stats.iterrows():
                 payload.append(
@@ -261,7 +376,7 @@ def run() -> int:
                         "link": str(r.get("link") or ""),
                         "first_seen": pd.to_datetime(r["first_seen"]).to_pydatetime(),
                         "last_seen": pd.to_datetime(r["last_seen"]).to_pydatetime(),
-                        "topics": [],
+                        "topics": topics.get(r["index_id"], []),
                         "meta": {"last_digest_id": digest_id},
                     }
                 )
@@ -283,12 +398,19 @@ def run() -> int:
             stage="02_master_index_update",
             ok=ok_rows,
             fail=n_bad,
-            meta={"digest_id": digest_id, "digest_map": str(map_path), "files": len(files)},
+            meta={
+                "digest_id": digest_id,
+                "digest_map": str(map_path),
+                "files": len(files),
+                "master_ref_deltas": log_deltas,
+                "quarantine_reasons": dict(sorted(bad_reasons.items())),
+            },
         )
 
     print(
         f"[02_master_index_update] digest_id={digest_id} ok={ok_rows} bad={n_bad} "
-        f"files={len(files)} write_artifacts={controls.write_artifacts} "
+        f"files={len(files)} master_ref_deltas={log_deltas} bad_reasons={','.join(f'{k}:{v}' for k, v in sorted(bad_reasons.items())) or '-'} "
+        f"write_artifacts={controls.write_artifacts} "
         f"db_run_bookkeeping={controls.db_run_bookkeeping} null_sink={_env_bool('NULL_SINK', False)}"
     )
     return 0
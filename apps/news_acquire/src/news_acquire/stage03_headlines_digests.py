@@ -2,18 +2,24 @@
 # Build group-level digest text (markdown) + JSONL for PromptFlow (legacy schema).
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
 import sys
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
+import numpy as np
 import pandas as pd
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from . import ids, db
-from . import io as bio  # for append_jsonl and JSON helpers
+from . import io as bio  # JSONL writers and helpers
+from .headline_clusters import cluster_labels
+from .md_pack import write_pack
 from .runtime import SensingControls
+from .tables import read_table, table_path
 
 # ---------- Paths ----------
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
@@ -21,6 +27,7 @@ DIGEST_MAP_DIR = DATA_DIR / "digest_map"                 # input from stage 02
 OUT_JSONL_DIR = DATA_DIR / "digest_jsonls"               # PF input (legacy)
 OUT_MD_DIR = DATA_DIR / "output_digests"                 # optional mirrors (human)
 QUAR_DIR = DATA_DIR / "quarantine"
+PF_REUSE_DIR = DATA_DIR / "pf_reuse"                     # content hash -> prior PF output (stage 04)
 
 REQUIRED_MAP_COLS = [
     "digest_file", "window_type", "article_id",
@@ -51,15 +58,8 @@ def quarantine_path(stage: str, run_id: str) -> Path:
     return QUAR_DIR / f"{stage}_{run_id}.jsonl"
 
 def atomic_overwrite_jsonl(path: Path, records: Iterable[dict]) -> None:
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.parent.mkdir(parents=True, exist_ok=True)
-    if tmp.exists():
-        tmp.unlink()
-    for rec in records:
-        bio.append_jsonl(tmp, rec)
-    if path.exists():
-        path.unlink()
-    tmp.rename(path)
+    with bio.JsonlWriter(path) as out:
+        out.write_many(records)
 
 # ---------- Contract for PF legacy input ----------
 class PFGroupInputV1(BaseModel):
@@ -69,6 +69,11 @@ class PFGroupInputV1(BaseModel):
     topic: str
     group_number: str        # "01", "02", ...
     content: str             # markdown block with the group’s headlines
+    content_sha256: str = "" # hash of the headline lines (header excluded)
+    clusters: List[dict] = []  # HEADLINE_PRECLUSTER: near-duplicate headline clusters
+    pf_reuse: bool = False   # a prior PF output of the current flow exists for content_sha256
+
+_GROUPS_ADAPTER = TypeAdapter(List[PFGroupInputV1])
 
 # ---------- Helpers ----------
 def _safe_topic(topic: str | None) -> str:
@@ -95,33 +100,99 @@ def _split_topic_group(df_topic: pd.DataFrame, min_rows: int, max_rows: int) ->
         parts.pop()
     return parts
 
-def _render_markdown(window_type: str, topic: str, group_no: str, rows: pd.DataFrame) -> str:
-    lines = [f"# {topic} — {window_type} (Grupo {group_no})", ""]
-    for _, r in rows.iterrows():
-        aid = r.get("article_id")
-        title = str(r.get("Title") or "").strip()
-        src = str(r.get("Source") or "").strip()
-        # url = str(r.get("Link") or "").strip()
-        pub = r.get("Published")
-        pub_s = ""
-        if pd.notna(pub):
-            try:
-                pub_s = pd.to_datetime(pub, utc=True).strftime("%Y-%m-%d %H:%M UTC")
-            except Exception:
-                pub_s = str(pub)
-        line = f"- **ID {aid}** — {title} — _{src}_"
-        if pub_s:
-            line += f" — _{pub_s}_"
-        # if url:
-        #     line += f"\n  <{url}>"
+def _estimate_tokens(lines: pd.Series) -> np.ndarray:
+    # Local heuristic, no tokenizer download: ~4 characters per token, plus the newline
+    return (lines.str.len().to_numpy() + 3) // 4 + 1
+
+def _pack_topic_group(df_topic: pd.DataFrame, token_budget: int) -> List[pd.DataFrame]:
+    """Split a topic into the fewest contiguous groups whose ``md_tokens`` fit the budget.
+
+    Rows keep their order; cuts are placed at even shares of the topic's tokens
+    so groups come out similarly full.  A single row over budget is its own group.
+    """
+    tokens = df_topic["md_tokens"].to_numpy()
+    n, total = len(tokens), int(tokens.sum())
+    # Greedy in-order fill gives the fewest groups ...
+    bounds, used = [0], 0
+    for i, t in enumerate(tokens):
+        if used and used + t > token_budget:
+            bounds.append(i)
+            used = 0
+        used += t
+    bounds.append(n)
+    # ... then the same count with cuts at even token shares, when those still fit
+    k = len(bounds) - 1
+    cuts = np.searchsorted(np.cumsum(tokens), total * np.arange(1, k) / k, side="right")
+    even = np.concatenate(([0], cuts, [n]))
+    if (np.diff(even) > 0).all():
+        sizes = np.add.reduceat(tokens, even[:-1])
+        if ((sizes <= token_budget) | (np.diff(even) == 1)).all():
+            bounds = even.tolist()
+    return [df_topic.iloc[a:b].reset_index(drop=True) for a, b in zip(bounds[:-1], bounds[1:])]
+
+def _text(col: pd.Series) -> pd.Series:
+    # str(v or "").strip() per value
+    return col.where(col.astype(bool), "").astype(str).str.strip()
+
+def _minute_labels(published: pd.Series) -> pd.Series:
+    # strftime once per distinct minute instead of once per row; NaT -> ""
+    codes, minutes = pd.factorize(pd.to_datetime(published, utc=True).dt.floor("min"))
+    labels = np.append(np.asarray(minutes.strftime("%Y-%m-%d %H:%M UTC"), dtype=object), "")
+    return pd.Series(labels[codes], index=published.index)
+
+def _render_lines(rows: pd.DataFrame) -> pd.Series:
+    """One markdown bullet per row, formatted column-wise."""
+    pub = _minute_labels(rows["Published"])
+    lines = "- **ID " + rows["article_id"].astype(str) + "** — " + _text(rows["Title"]) + " — _" + _text(rows["Source"]) + "_"
+    # url lines (<Link>) stay disabled
+    return lines.where(pub == "", lines + " — _" + pub + "_")
+
+def _cluster_lines(chunk: pd.DataFrame) -> Tuple[List[str], List[dict]]:
+    """Fold near-duplicate rows of a group into their cluster's first (representative) line."""
+    ids_, lines_ = chunk["article_id"].tolist(), chunk["md_line"].tolist()
+    members: dict = {}
+    for pos, label in enumerate(chunk["cluster"].tolist()):
+        members.setdefault(label, []).append(pos)
+    lines, clusters = [], []
+    for n, positions in enumerate(members.values(), start=1):
+        line = lines_[positions[0]]
+        if len(positions) > 1:
+            line += " — _también: " + ", ".join(f"ID {ids_[p]}" for p in positions[1:]) + "_"
         lines.append(line)
-    lines.append("")  # final newline
-    return "\n".join(lines)
+        clusters.append({"cluster_id": f"c{n:02d}", "representative_id": ids_[positions[0]], "article_ids": [ids_[p] for p in positions]})
+    return lines, clusters
+
+def _content_sha256(lines: pd.Series) -> str:
+    # The header only labels window/group, so the same headlines hash alike across windows
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+def _recorded_flow_sha() -> str:
+    # Stage 04 records the fingerprint of the flow it last ran; entries of any other flow are re-run
+    try:
+        record = json.loads((PF_REUSE_DIR / "flow.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return ""
+    if not isinstance(record, dict):
+        return ""
+    return record.get("flow_sha256") or ""
+
+def _pf_reusable(content_sha: str, flow_sha: str) -> bool:
+    # Only entries stage 04 would accept: an output of another flow version is re-run
+    try:
+        entry = json.loads((PF_REUSE_DIR / f"{content_sha}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return isinstance(entry, dict) and entry.get("flow_sha256") == flow_sha
+
+def _render_markdown(window_type: str, topic: str, group_no: str, lines: Iterable[str]) -> str:
+    return "\n".join([f"# {topic} — {window_type} (Grupo {group_no})", "", *lines, ""])
+
+def _md_filename(digest_id: str, window_type: str, topic: str, group_no: str) -> str:
+    return f"headlines_{window_type}_{digest_id}_{_topic_slug(topic)}_{group_no}.md"
 
 def _write_md_mirror(dir_: Path, digest_id: str, window_type: str, topic: str, group_no: str, content: str) -> Path:
     dir_.mkdir(parents=True, exist_ok=True)
-    fname = f"headlines_{window_type}_{digest_id}_{_topic_slug(topic)}_{group_no}.md"
-    p = dir_ / fname
+    p = dir_ / _md_filename(digest_id, window_type, topic, group_no)
     p.write_text(content, encoding="utf-8")
     return p
 
@@ -134,6 +205,7 @@ def run() -> int:
     run_id = os.getenv("RUN_ID")
     limit = _env_float("LIMIT", None)       # caps rows before grouping
     sample = _env_float("SAMPLE", None)     # 0<sample<1 downsample before grouping
+    pack_md = _env_bool("MD_MIRROR_PACK", False)
 
     # Derive hour (deterministic)
     if digest_at_env:
@@ -149,7 +221,7 @@ def run() -> int:
         db.start_run(run_id, stage=stage_name, meta={"digest_id": digest_id})
 
     # Load digest_map for the hour
-    map_csv = DIGEST_MAP_DIR / f"{digest_id}.csv"
+    map_csv = table_path(DIGEST_MAP_DIR / digest_id)
     if not map_csv.exists():
         if controls.db_run_bookkeeping:
             db.finish_run(run_id, stage=stage_name, ok=0, fail=0, meta={"note": "no digest_map", "digest_id": digest_id})
@@ -157,7 +229,7 @@ def run() -> int:
         return 0
 
     try:
-        df = pd.read_csv(map_csv)
+        df = read_table(map_csv)
     except Exception as e:
         if controls.write_artifacts:
             bio.append_jsonl(quarantine_path("V03", run_id), {"reason": "read_error", "file": str(map_csv), "error": str(e)})
@@ -196,6 +268,11 @@ def run() -> int:
     bad = 0
     min_rows = int(os.getenv("GROUP_MIN_ROWS", "5"))
     max_rows = int(os.getenv("GROUP_MAX_ROWS", "25"))
+    # When set, groups are packed by estimated headline tokens instead of row counts
+    token_budget = int(os.getenv("GROUP_TOKEN_BUDGET", "0"))
+    # Offline near-duplicate clustering so the prompt carries pre-clustered headlines
+    precluster = _env_bool("HEADLINE_PRECLUSTER", False)
+    precluster_threshold = float(os.getenv("PRECLUSTER_THRESHOLD", "0.5"))
 
     # Determine output dirs
     jsonl_dir = (DATA_DIR / "_tmp" / "null" / "digest_jsonls") if null_sink else OUT_JSONL_DIR
@@ -204,45 +281,81 @@ def run() -> int:
         jsonl_dir.mkdir(parents=True, exist_ok=True); md_dir.mkdir(parents=True, exist_ok=True)
     out_jsonl = jsonl_dir / f"{digest_id}.jsonl"
 
+    # Bullet lines for every row at once; groups only join their slice of them
+    df["md_line"] = _render_lines(df)
+    df["md_tokens"] = _estimate_tokens(df["md_line"])
+    group_cols = ["window_type", "Topic", "md_line", "md_tokens"]
+    if precluster:
+        df["cluster"] = cluster_labels(df["Title"].tolist(), threshold=precluster_threshold)
+        group_cols += ["article_id", "cluster"]
+    groups = df[group_cols]
+    flow_sha = _recorded_flow_sha()
+
     # Group by window_type then Topic for human sense
-    idx_counter = 0
-    for window_type, df_w in df.groupby("window_type", sort=False):
+    candidates: List[dict] = []
+    for window_type, df_w in groups.groupby("window_type", sort=False):
         for topic, df_t in df_w.groupby("Topic", sort=False):
-            chunks = _split_topic_group(df_t, min_rows=min_rows, max_rows=max_rows)
+            if token_budget > 0:
+                chunks = _pack_topic_group(df_t, token_budget)
+            else:
+                chunks = _split_topic_group(df_t, min_rows=min_rows, max_rows=max_rows)
             for i, chunk in enumerate(chunks, start=1):
                 group_no = f"{i:02d}"
-                content = _render_markdown(window_type, _safe_topic(topic), group_no, chunk)
-                digest_group_id = f"{digest_id}::{window_type}::{_topic_slug(topic)}::{group_no}"
+                lines, clusters = _cluster_lines(chunk) if precluster else (chunk["md_line"], None)
+                content_sha = _content_sha256(lines)
                 rec = {
-                    "id_digest": f"{digest_id}_{idx_counter:03d}",
-                    "digest_group_id": digest_group_id,
+                    "id_digest": f"{digest_id}_{len(candidates):03d}",
+                    "digest_group_id": f"{digest_id}::{window_type}::{_topic_slug(topic)}::{group_no}",
                     "window_type": window_type,
                     "topic": _safe_topic(topic),
                     "group_number": group_no,
-                    "content": content,
+                    "content": _render_markdown(window_type, _safe_topic(topic), group_no, lines),
+                    "content_sha256": content_sha,
+                    "pf_reuse": bool(flow_sha) and _pf_reusable(content_sha, flow_sha),
                 }
-                # Validate with Pydantic
-                try:
-                    PFGroupInputV1(**rec)
-                except ValidationError as ve:
-                    bad += 1
-                    if controls.write_artifacts:
-                        bio.append_jsonl(quarantine_path("V03", run_id), {"reason": "validation_error", "error": str(ve), "record": rec})
-                    continue
-
-                # Optional MD mirror (kept for legacy ergonomics)
-                if controls.write_artifacts:
-                    _write_md_mirror(md_dir, digest_id, window_type, _safe_topic(topic), group_no, content)
-                    md_written += 1
+                if clusters is not None:
+                    rec["clusters"] = clusters
+                candidates.append(rec)
 
-                out_records.append(rec)
-                idx_counter += 1
+    # Validate all groups in one call; on failure redo it per group so that
+    # invalid groups are quarantined and id_digest stays dense over the valid ones
+    try:
+        _GROUPS_ADAPTER.validate_python(candidates)
+        out_records = candidates
+    except ValidationError:
+        for rec in candidates:
+            rec = {**rec, "id_digest": f"{digest_id}_{len(out_records):03d}"}
+            try:
+                PFGroupInputV1(**rec)
+            except ValidationError as ve:
+                bad += 1
+                if controls.write_artifacts:
+                    bio.append_jsonl(quarantine_path("V03", run_id), {"reason": "validation_error", "error": str(ve), "record": rec})
+                continue
+            out_records.append(rec)
+
+    # Optional MD mirror (kept for legacy ergonomics): loose files, or one pack + index per digest
+    if controls.write_artifacts and pack_md and out_records:
+        write_pack(
+            md_dir,
+            digest_id,
+            (
+                (rec["digest_group_id"], _md_filename(digest_id, rec["window_type"], rec["topic"], rec["group_number"]), rec["content"])
+                for rec in out_records
+            ),
+        )
+        md_written = len(out_records)
+    elif controls.write_artifacts:
+        for rec in out_records:
+            _write_md_mirror(md_dir, digest_id, rec["window_type"], rec["topic"], rec["group_number"], rec["content"])
+            md_written += 1
 
     # Write JSONL atomically (idempotent)
     if controls.write_artifacts and out_records:
         atomic_overwrite_jsonl(out_jsonl, out_records)
 
     ok = len(out_records)
+    reusable = sum(1 for rec in out_records if rec["pf_reuse"])
     if controls.db_run_bookkeeping:
         db.finish_run(
             run_id,
@@ -253,13 +366,17 @@ def run() -> int:
                 "digest_id": digest_id,
                 "out_jsonl": str(out_jsonl),
                 "md_files": md_written,
+                "md_packed": pack_md,
                 "groups": ok,
+                "pf_reusable": reusable,
                 "min_rows": min_rows,
                 "max_rows": max_rows,
+                "token_budget": token_budget,
+                "precluster": precluster,
             },
         )
 
-    print(f"[{stage_name}] digest_id={digest_id} groups={ok} bad={bad} -> {out_jsonl}")
+    print(f"[{stage_name}] digest_id={digest_id} groups={ok} reusable={reusable} bad={bad} -> {out_jsonl}")
     return 0
 
 
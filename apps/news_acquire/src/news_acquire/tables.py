@@ -0,0 +1,129 @@
+"""Typed storage for the per-hour sensing tables (rss_dumps slices, digest_map).
+
+CSV stays the compatibility format.  With ``ARTIFACT_FORMAT=parquet`` (or
+``both``) the same tables are also written as Parquet with an explicit schema,
+so downstream stages read typed columns (UTC ``Published`` included) instead
+of re-inferring dtypes and re-parsing timestamps on every hop.  Readers pick
+the Parquet file when one exists next to the CSV name and fall back to CSV.
+
+Parquet needs ``pyarrow``; without it the writers stay on CSV.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+# Column kinds: "str" (nullable text), "int" (int64) or "ts" (UTC timestamp)
+SLICE_SCHEMA: Dict[str, str] = {
+    "digest_file": "str",
+    "window_type": "str",
+    "article_id": "int",
+    "Title": "str",
+    "Source": "str",
+    "Link": "str",
+    "Published": "ts",
+    "uid": "str",
+    "index_id": "str",
+    "Topic": "str",
+    "topics": "str",
+}
+
+DIGEST_MAP_SCHEMA: Dict[str, str] = {
+    "digest_file": "str",
+    "article_id": "int",
+    "index_id": "str",
+    "Title": "str",
+    "Source": "str",
+    "Link": "str",
+    "Published": "ts",
+    "window_type": "str",
+    "topics": "str",
+}
+
+
+def artifact_formats() -> Tuple[str, ...]:
+    value = os.getenv("ARTIFACT_FORMAT", "csv").strip().lower()
+    formats = {"csv": ("csv",), "parquet": ("parquet",), "both": ("csv", "parquet")}.get(value, ("csv",))
+    if "parquet" in formats and pa is None:
+        print("[tables] WARN ARTIFACT_FORMAT=parquet needs pyarrow; writing CSV", flush=True)
+        return ("csv",)
+    return formats
+
+
+def _arrow_schema(schema: Dict[str, str]):
+    kinds = {"str": pa.string(), "int": pa.int64(), "ts": pa.timestamp("ns", tz="UTC")}
+    return pa.schema([(name, kinds[kind]) for name, kind in schema.items()])
+
+
+def _typed(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    for name, kind in schema.items():
+        col = df[name]
+        if kind == "ts":
+            out[name] = pd.to_datetime(col, errors="coerce", utc=True)
+        elif kind == "int":
+            out[name] = pd.to_numeric(col).astype("int64")
+        else:
+            # Empty text is null, as it reads back from the CSV form
+            out[name] = col.where(col.notna() & (col.astype(str) != ""), None).map(lambda v: v if v is None else str(v))
+    return out
+
+
+def write_table(df: pd.DataFrame, stem: Path, schema: Dict[str, str], formats: Tuple[str, ...]) -> Path:
+    """Write ``df`` as ``<stem>.csv`` and/or ``<stem>.parquet``; returns the first path written."""
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for fmt in formats:
+        path = stem.with_suffix(f".{fmt}")
+        if fmt == "parquet":
+            table = pa.Table.from_pandas(_typed(df, schema), schema=_arrow_schema(schema), preserve_index=False)
+            pq.write_table(table, path)
+        else:
+            df.to_csv(path, index=False)
+        written.append(path)
+    return written[0]
+
+
+def read_table(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def table_path(stem: Path) -> Path:
+    """The readable file for ``stem``: Parquet when present (and readable), else CSV."""
+    parquet = stem.with_suffix(".parquet")
+    if pq is not None and parquet.exists():
+        return parquet
+    return stem.with_suffix(".csv")
+
+
+def table_paths(directory: Path, pattern: str) -> List[Path]:
+    """One readable file per table stem matching ``pattern`` (without suffix), sorted by stem."""
+    stems = {p.with_suffix("") for ext in ("csv", "parquet") for p in directory.glob(f"{pattern}.{ext}")}
+    return [table_path(stem) for stem in sorted(stems)]
+
+
+def read_table_rows(path: Path) -> List[Dict[str, str]]:
+    """Rows as ``csv.DictReader`` would return them from the CSV form of the table."""
+    if path.suffix != ".parquet":
+        with path.open("r", encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+    buf = io.StringIO()
+    pd.read_parquet(path).to_csv(buf, index=False)
+    buf.seek(0)
+    return list(csv.DictReader(buf))
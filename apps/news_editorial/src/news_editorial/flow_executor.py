@@ -0,0 +1,164 @@
+"""In-process runner for the PromptFlow DAG in ``flow/``.
+
+Stage 04 used to shell out to ``pf run create`` and then look for the newest
+``output.jsonl`` under ``~/.promptflow/.runs``.  ``FlowExecutor`` reads the same
+``flow.dag.yaml`` and runs its nodes directly: ``prompt`` nodes render their
+jinja2 template, ``python`` nodes call the ``@tool`` function of their source
+file, and ``${inputs.x}`` / ``${node.output}`` references are resolved per
+line.  Lines run on a thread pool (each one waits on LLM calls) and are
+yielded as they finish.
+
+Only what our flow uses is supported: prompt and python nodes, literal and
+reference inputs, reference outputs.  Anything else is rejected when the flow
+is loaded; ``PF_EXECUTOR=cli`` still runs such flows through PromptFlow.
+A node's ``connection:`` is not resolved: there is no PromptFlow connection
+store here, so tools read their credentials from the environment
+(``OPENAI_API_KEY``, ``AZURE_OPENAI_API_BASE``, ... for ``flow/llm_wrapper.py``).
+A tool module may define ``flow_stats() -> dict`` (counters such as LLM cache
+hits); ``FlowExecutor.stats()`` merges them for the run record.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import yaml
+
+try:
+    import jinja2
+except ImportError:  # pragma: no cover - optional dependency
+    jinja2 = None
+
+
+_REF_RE = re.compile(r"^\$\{(\w+)\.(\w+)\}$")
+_TOOL_RE = re.compile(r"^@tool\b[^\n]*\n\s*def\s+(\w+)", re.M)
+
+
+def _reference(value: Any) -> Tuple[str, str] | None:
+    """``("inputs", "x")`` / ``("node", "output")`` for a ``${a.b}`` string, else None."""
+    if isinstance(value, str):
+        m = _REF_RE.match(value.strip())
+        if m:
+            return m.group(1), m.group(2)
+    return None
+
+
+def _load_tool(path: Path, function: str | None) -> Tuple[Any, Callable[..., Any]]:
+    """(module, tool function) of a flow python file (the ``@tool``-decorated one unless named)."""
+    source = path.read_text(encoding="utf-8")
+    if function is None:
+        m = _TOOL_RE.search(source)
+        if m is None:
+            raise ValueError(f"no @tool function in {path}")
+        function = m.group(1)
+    # Tools import their siblings the way PromptFlow runs them, from the flow root
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(f"_flow_tool_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, getattr(module, function)
+
+
+class FlowExecutor:
+    """One loaded flow; templates and tool modules are prepared once and shared by all lines."""
+
+    def __init__(self, flow_dir: Path):
+        self.flow_dir = Path(flow_dir)
+        dag = yaml.safe_load((self.flow_dir / "flow.dag.yaml").read_text(encoding="utf-8")) or {}
+        self.inputs: Dict[str, dict] = dag.get("inputs") or {}
+        self.outputs: Dict[str, Tuple[str, str]] = {}
+        for name, spec in (dag.get("outputs") or {}).items():
+            ref = _reference((spec or {}).get("reference"))
+            if ref is None:
+                raise ValueError(f"flow output {name!r} is not a ${{...}} reference")
+            self.outputs[name] = ref
+        self.nodes = self._ordered(dag.get("nodes") or [])
+        tools: Dict[Tuple[Path, str | None], Callable[..., Any]] = {}
+        self._modules: Dict[Path, Any] = {}
+        self._run_node: Dict[str, Callable[[dict], Any]] = {}
+        for node in self.nodes:
+            source = node.get("source") or {}
+            path = self.flow_dir / source.get("path", "")
+            if node.get("type") == "prompt":
+                if jinja2 is None:
+                    raise RuntimeError("prompt nodes need jinja2 (pip install jinja2)")
+                # Same rendering options as PromptFlow's prompt tool
+                template = jinja2.Template(path.read_text(encoding="utf-8"), trim_blocks=True, keep_trailing_newline=True)
+                self._run_node[node["name"]] = lambda kw, t=template: t.render(**kw)
+            elif node.get("type") == "python":
+                key = (path.resolve(), source.get("function"))
+                if key not in tools:
+                    self._modules[key[0]], tools[key] = _load_tool(path, source.get("function"))
+                self._run_node[node["name"]] = lambda kw, f=tools[key]: f(**kw)
+            else:
+                raise ValueError(f"node {node.get('name')!r}: type {node.get('type')!r} is not supported in-process")
+
+    def _ordered(self, nodes: List[dict]) -> List[dict]:
+        """Nodes in dependency order (file order where it does not matter)."""
+        pending = list(nodes)
+        names = {n["name"] for n in nodes}
+        done: set[str] = set()
+        ordered: List[dict] = []
+        while pending:
+            for node in pending:
+                deps = {ref[0] for ref in map(_reference, (node.get("inputs") or {}).values()) if ref}
+                if (deps & names) <= done:
+                    break
+            else:
+                raise ValueError(f"flow has a cycle among nodes {[n['name'] for n in pending]}")
+            pending.remove(node)
+            done.add(node["name"])
+            ordered.append(node)
+        return ordered
+
+    def _value(self, value: Any, line_inputs: dict, results: dict) -> Any:
+        ref = _reference(value)
+        if ref is None:
+            # Literal relative paths are relative to the flow, as under `pf run` (which chdirs there)
+            if isinstance(value, str) and value.startswith(("./", "../")):
+                return str(self.flow_dir / value)
+            return value
+        scope, key = ref
+        if scope == "inputs":
+            return line_inputs[key]
+        return results[scope]
+
+    def run_line(self, row: dict) -> dict:
+        """Flow outputs for one input row."""
+        line_inputs = {}
+        for name, spec in self.inputs.items():
+            if name in row:
+                line_inputs[name] = row[name]
+            elif "default" in (spec or {}):
+                line_inputs[name] = spec["default"]
+            else:
+                raise KeyError(f"missing flow input {name!r}")
+        results: Dict[str, Any] = {}
+        for node in self.nodes:
+            kwargs = {k: self._value(v, line_inputs, results) for k, v in (node.get("inputs") or {}).items()}
+            results[node["name"]] = self._run_node[node["name"]](kwargs)
+        return {name: line_inputs[key] if scope == "inputs" else results[scope] for name, (scope, key) in self.outputs.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for module in self._modules.values():
+            hook = getattr(module, "flow_stats", None)
+            if callable(hook):
+                merged.update(hook() or {})
+        return merged
+
+    def run(self, rows: List[dict], max_workers: int = 8) -> Iterator[Tuple[int, dict | None, str | None]]:
+        """Run all rows; yields ``(row_index, outputs, error)`` as lines finish (``error`` None on success)."""
+        with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="flow") as pool:
+            futures = {pool.submit(self.run_line, row): i for i, row in enumerate(rows)}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, f"{type(e).__name__}: {e}"
@@ -1,12 +1,20 @@
 # promptflow_runner: execute PromptFlow for one digest hour.
 # Input: data/digest_jsonls/<DIGEST_AT>.jsonl (Level 0 runtime input).
 # Output: data/pf_out/pfout_<DIGEST_AT>.jsonl (Level 0 runtime evidence, overwrite idempotent).
+# The flow runs in-process (flow_executor, PF_CONCURRENCY lines at a time) and rows
+# are streamed to pfout in input order as they finish; PF_EXECUTOR=cli runs it
+# through `pf run create` instead.
+# With PF_REUSE=1, groups whose headlines were already answered by the same flow
+# are filled from data/pf_reuse/<content_sha256>.json instead of calling PF.
+# The flow's fingerprint is recorded in data/pf_reuse/flow.json, which is what
+# stage 03 checks entries against when it sets the pf_reuse hint.
 from __future__ import annotations
 
 import os
 import sys
 import glob
 import json
+import hashlib
 import subprocess
 from pathlib import Path
 from typing import Iterable, List, Dict
@@ -15,12 +23,15 @@ import pandas as pd
 
 from . import ids, db
 from . import io as bio
+from .flow_executor import FlowExecutor
 
 # ---------- Paths / Config ----------
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
 PF_IN_DIR = DATA_DIR / "digest_jsonls"
 PF_OUT_DIR = DATA_DIR / "pf_out"
 QUAR_DIR = DATA_DIR / "quarantine"
+# content_sha256 -> prior PF output, written here and read by stage 03 to mark groups
+PF_REUSE_DIR = DATA_DIR / "pf_reuse"
 
 # Path where PromptFlow drops run artifacts; adjust if yours differs
 PF_RUNS_DIR = Path.home() / ".promptflow" / ".runs"
@@ -51,15 +62,8 @@ def quarantine_path(stage: str, run_id: str) -> Path:
     return QUAR_DIR / f"{stage}_{run_id}.jsonl"
 
 def atomic_overwrite_jsonl(path: Path, records: Iterable[dict]) -> None:
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.parent.mkdir(parents=True, exist_ok=True)
-    if tmp.exists():
-        tmp.unlink()
-    for rec in records:
-        bio.append_jsonl(tmp, rec)
-    if path.exists():
-        path.unlink()
-    tmp.rename(path)
+    with bio.JsonlWriter(path) as out:
+        out.write_many(records)
 
 # ---------- PF helpers ----------
 def _run_promptflow(flow_dir: Path, data_file: Path) -> int:
@@ -91,6 +95,176 @@ def _latest_pf_output_jsonl(runs_dir: Path) -> Path | None:
     latest = max(candidates, key=os.path.getmtime)
     return latest
 
+# ---------- Reuse helpers ----------
+# Flow outputs that only echo the group's inputs (or number the line); everything else came from the LLM
+PASSTHROUGH_COLS = ["id_digest", "digest_group_id", "window_type", "topic", "group_number", "digest_id_hour", "line_number"]
+FLOW_SUFFIXES = {".yaml", ".yml", ".jinja2", ".json", ".py"}
+
+def _flow_fingerprint(flow_dir: Path) -> str:
+    """sha256 over the flow definition (DAG, prompts, schemas, tool code)."""
+    h = hashlib.sha256()
+    for path in sorted(p for p in flow_dir.rglob("*") if p.is_file() and p.suffix in FLOW_SUFFIXES):
+        h.update(path.relative_to(flow_dir).as_posix().encode("utf-8") + b"\0")
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+def _reuse_path(content_sha: str) -> Path:
+    return PF_REUSE_DIR / f"{content_sha}.json"
+
+def _record_flow(flow_sha: str) -> None:
+    # The one place the current fingerprint lives; stage 03 reads it instead of hashing a flow dir
+    bio.atomic_write_json(PF_REUSE_DIR / "flow.json", {"schema": "pf_reuse_flow.v1", "flow_sha256": flow_sha})
+
+def _load_reuse_entry(content_sha: str, flow_sha: str) -> dict | None:
+    path = _reuse_path(content_sha)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    # An output produced by another version of the flow is not reused
+    return entry if entry.get("flow_sha256") == flow_sha else None
+
+def _reused_output(rec: dict, entry: dict, digest_id: str) -> dict:
+    out = {c: rec.get(c) for c in PASSTHROUGH_COLS if c in rec}
+    out.update(entry["outputs"])
+    out["digest_id_hour"] = digest_id
+    out["pf_reused_from"] = entry["digest_group_id"]
+    return out
+
+def _store_reuse_entries(df_pf: pd.DataFrame, df_run: pd.DataFrame, flow_sha: str) -> int:
+    """Record each complete PF output under its input's content_sha256; returns entries written."""
+    if "content_sha256" not in df_run.columns or "digest_group_id" not in df_pf.columns:
+        return 0
+    sha_by_group = dict(zip(df_run["digest_group_id"], df_run["content_sha256"]))
+    written = 0
+    for row in df_pf.to_dict(orient="records"):
+        content_sha = sha_by_group.get(row.get("digest_group_id"))
+        outputs = {k: v for k, v in row.items() if k not in PASSTHROUGH_COLS}
+        if not content_sha or not outputs or any(v is None or v != v for v in outputs.values()):
+            continue
+        entry = {
+            "schema": "pf_reuse.v1",
+            "content_sha256": content_sha,
+            "flow_sha256": flow_sha,
+            "digest_group_id": row["digest_group_id"],
+            "digest_id_hour": row.get("digest_id_hour"),
+            "outputs": outputs,
+        }
+        bio.atomic_write_json(_reuse_path(content_sha), entry)
+        written += 1
+    return written
+
+# Input columns carried onto output rows when the flow does not emit them
+CARRY_COLS = ["digest_id_hour", "digest_file", "article_id", "index_id", "title", "source", "seed_url", "published"]
+
+def _run_pf_batch(df_run: pd.DataFrame, tmp_in: Path, digest_id: str, run_id: str, stage_name: str) -> tuple[pd.DataFrame, int]:
+    """Run the flow over ``tmp_in`` (the rows of ``df_run``); returns (outputs, rc), rc != 0 already recorded."""
+    rc = _run_promptflow(PF_FLOW_DIR, tmp_in)
+    if rc != 0:
+        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_cli_failed", "returncode": rc})
+        try:
+            db.finish_run(run_id, stage=stage_name, ok=0, fail=len(df_run), meta={"digest_id": digest_id, "pf_rc": rc})
+        except Exception:
+            pass
+        print(f"[{stage_name}] PF CLI failed rc={rc}")
+        return pd.DataFrame(), rc
+
+    latest = _latest_pf_output_jsonl(PF_RUNS_DIR)
+    if latest is None or not latest.exists():
+        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_missing_output"})
+        try:
+            db.finish_run(run_id, stage=stage_name, ok=0, fail=len(df_run), meta={"digest_id": digest_id, "note": "no pf output"})
+        except Exception:
+            pass
+        print(f"[{stage_name}] PF run produced no output.jsonl")
+        return pd.DataFrame(), 1
+
+    # Load PF output
+    try:
+        df_pf = pd.read_json(latest, lines=True)
+    except Exception as e:
+        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_output_parse_error", "file": str(latest), "error": str(e)})
+        print(f"[{stage_name}] failed parsing PF output: {e}")
+        return pd.DataFrame(), 1
+
+    # Ensure carry-through keys are present; if PF didn’t propagate and counts match,
+    # align by position and enrich. If counts differ, we still write but record the delta.
+    missing = [c for c in CARRY_COLS if c not in df_pf.columns]
+    if missing and len(df_pf) == len(df_run):
+        # align by index
+        for c in CARRY_COLS:
+            if c not in df_pf.columns and c in df_run.columns:
+                df_pf[c] = df_run[c].values
+    # always set digest_id_hour even if not missing
+    df_pf["digest_id_hour"] = digest_id
+    return df_pf, 0
+
+def _run_inprocess_batch(df_run: pd.DataFrame, reused: Dict[int, dict], n_in: int, out_path: Path,
+                         digest_id: str, run_id: str, stage_name: str) -> tuple[pd.DataFrame, int, int, dict]:
+    """Run the flow over ``df_run`` in this process and write ``out_path``.
+
+    Returns (outputs, failed, rc, tool stats such as LLM cache hits).
+
+    Rows go to pfout as soon as every earlier input row is done, so the file
+    keeps input order (``reused`` rows, keyed by input position, included).
+    The file is published once all rows are in.  A failed line is quarantined
+    and left out, as PF does with a failed line; rc != 0 only when no line
+    succeeded, and is already recorded.
+    """
+    try:
+        executor = FlowExecutor(PF_FLOW_DIR)
+    except Exception as e:
+        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_flow_load_failed", "flow": str(PF_FLOW_DIR), "error": str(e)})
+        try:
+            db.finish_run(run_id, stage=stage_name, ok=0, fail=len(df_run), meta={"digest_id": digest_id, "note": "flow load failed"})
+        except Exception:
+            pass
+        print(f"[{stage_name}] failed loading flow {PF_FLOW_DIR}: {e}")
+        return pd.DataFrame(), len(df_run), 1, {}
+
+    rows = df_run.to_dict(orient="records")
+    carry = [c for c in CARRY_COLS if c in df_run.columns]
+    run_pos = [p for p in range(n_in) if p not in reused]
+    ready: Dict[int, dict | None] = dict(reused)
+    done: List[dict] = []
+    failed = 0
+    next_pos = 0
+    with bio.JsonlWriter(out_path, batch_size=1) as out:
+        for i, outputs, error in executor.run(rows, max_workers=int(_env_float("PF_CONCURRENCY", 8) or 8)):
+            if error is not None:
+                failed += 1
+                bio.append_jsonl(quarantine_path("V04", run_id), {
+                    "reason": "pf_line_failed",
+                    "line_number": i,
+                    "digest_group_id": rows[i].get("digest_group_id"),
+                    "error": error,
+                })
+                ready[run_pos[i]] = None
+            else:
+                # Same row shape as PF's output.jsonl, plus the carried columns
+                rec = {"line_number": i, **outputs}
+                for c in carry:
+                    rec.setdefault(c, rows[i][c])
+                rec["digest_id_hour"] = digest_id
+                done.append(rec)
+                ready[run_pos[i]] = rec
+            while next_pos in ready:
+                rec = ready.pop(next_pos)
+                if rec is not None:
+                    out.write(rec)
+                next_pos += 1
+        if not done:
+            out.abort()
+
+    if not done:
+        try:
+            db.finish_run(run_id, stage=stage_name, ok=0, fail=failed, meta={"digest_id": digest_id, "note": "all flow lines failed"})
+        except Exception:
+            pass
+        print(f"[{stage_name}] all {failed} flow lines failed")
+        return pd.DataFrame(), failed, 1, executor.stats()
+    return pd.DataFrame(done), failed, 0, executor.stats()
+
 # ---------- Core ----------
 def run() -> int:
     ensure_dirs()
@@ -184,9 +358,23 @@ def run() -> int:
     if limit is not None:
         df_in = df_in.head(int(limit))
 
+    # Groups stage 03 marked as seen before are answered from the reuse map
+    # (same headlines, same flow) instead of going back to the LLM
+    reuse = _env_bool("PF_REUSE", False) and not dry_run
+    flow_sha = _flow_fingerprint(PF_FLOW_DIR) if reuse else ""
+    if reuse:
+        _record_flow(flow_sha)
+    reused: Dict[int, dict] = {}
+    if reuse and "pf_reuse" in df_in.columns:
+        for pos, rec in enumerate(df_in.to_dict(orient="records")):
+            entry = _load_reuse_entry(rec.get("content_sha256") or "", flow_sha) if rec.get("pf_reuse") is True else None
+            if entry is not None:
+                reused[pos] = _reused_output(rec, entry, digest_id)
+    df_run = df_in.drop(index=df_in.index[list(reused)]).reset_index(drop=True)
+
     # Write a temp filtered input for PF
     tmp_in = pfin_path.parent / f".tmp_pfin_{digest_id}.jsonl"
-    atomic_overwrite_jsonl(tmp_in, df_in.to_dict(orient="records"))
+    atomic_overwrite_jsonl(tmp_in, df_run.to_dict(orient="records"))
 
     # ---- DRY_RUN mode: stub output, no PF call ----
     out_dir = (DATA_DIR / "_tmp" / "null" / "pf_out") if null_sink else PF_OUT_DIR
@@ -214,66 +402,55 @@ def run() -> int:
         return 0
 
     # ---- Real PF run ----
-    rc = _run_promptflow(PF_FLOW_DIR, tmp_in)
-    if rc != 0:
-        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_cli_failed", "returncode": rc})
-        try:
-            db.finish_run(run_id, stage=stage_name, ok=0, fail=len(df_in), meta={"digest_id": digest_id, "pf_rc": rc})
-        except Exception:
-            pass
-        print(f"[{stage_name}] PF CLI failed rc={rc}")
-        return rc
-
-    latest = _latest_pf_output_jsonl(PF_RUNS_DIR)
-    if latest is None or not latest.exists():
-        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_missing_output"})
-        try:
-            db.finish_run(run_id, stage=stage_name, ok=0, fail=len(df_in), meta={"digest_id": digest_id, "note": "no pf output"})
-        except Exception:
-            pass
-        print(f"[{stage_name}] PF run produced no output.jsonl")
-        return 1
-
-    # Load PF output
-    try:
-        df_pf = pd.read_json(latest, lines=True)
-    except Exception as e:
-        bio.append_jsonl(quarantine_path("V04", run_id), {"reason": "pf_output_parse_error", "file": str(latest), "error": str(e)})
-        print(f"[{stage_name}] failed parsing PF output: {e}")
-        return 1
-
-    # ---- Guardrails & carry-through enrichment ----
-    in_n = len(df_in)
-    out_n = len(df_pf)
-
-    # Ensure carry-through keys are present; if PF didn’t propagate and counts match,
-    # align by position and enrich. If counts differ, we still write but record the delta.
-    carry_cols = ["digest_id_hour", "digest_file", "article_id", "index_id", "title", "source", "seed_url", "published"]
-    missing = [c for c in carry_cols if c not in df_pf.columns]
-    if missing and out_n == in_n:
-        # align by index
-        for c in carry_cols:
-            if c not in df_pf.columns and c in df_in.columns:
-                df_pf[c] = df_in[c].values
-        # ensure digest_id_hour set at minimum
-        df_pf["digest_id_hour"] = digest_id
+    executor = os.getenv("PF_EXECUTOR", "inprocess").strip().lower()
+    failed = 0
+    flow_stats: dict = {}
+    if not df_run.empty and executor != "cli":
+        # Streams the canonical per-hour PF output itself, reused rows merged in place
+        df_pf, failed, rc, flow_stats = _run_inprocess_batch(df_run, reused, len(df_in), out_path, digest_id, run_id, stage_name)
+        if rc != 0:
+            return rc
     else:
-        # always set digest_id_hour even if not missing
-        df_pf["digest_id_hour"] = digest_id
+        if df_run.empty:
+            df_pf = pd.DataFrame()
+        else:
+            df_pf, rc = _run_pf_batch(df_run, tmp_in, digest_id, run_id, stage_name)
+            if rc != 0:
+                return rc
+
+        # ---- Merge reused outputs ----
+        records = df_pf.to_dict(orient="records") + list(reused.values())
+        if reused:
+            # Back to input order; reused groups keep their own passthrough ids
+            order = {gid: i for i, gid in enumerate(df_in["digest_group_id"])} if "digest_group_id" in df_in.columns else {}
+            records.sort(key=lambda r: order.get(r.get("digest_group_id"), len(order)))
+
+        # Idempotent overwrite of our canonical per-hour PF output
+        atomic_overwrite_jsonl(out_path, records)
 
-    # Idempotent overwrite of our canonical per-hour PF output
-    atomic_overwrite_jsonl(out_path, df_pf.to_dict(orient="records"))
+    in_n = len(df_in)
+    out_n = len(df_pf) + len(reused)
+    stored = _store_reuse_entries(df_pf, df_run, flow_sha) if reuse and not df_pf.empty else 0
 
     # Finish run with meta diagnostics
-    meta = {"digest_id": digest_id, "out": str(out_path), "in_rows": in_n, "out_rows": out_n}
+    meta = {"digest_id": digest_id, "out": str(out_path), "in_rows": in_n, "out_rows": out_n, "executor": executor}
+    if failed:
+        meta["failed_lines"] = failed
+    if flow_stats:
+        meta["flow_stats"] = flow_stats
+    if reuse:
+        meta.update({"reused": len(reused), "reuse_stored": stored})
     if in_n != out_n:
         meta["row_delta"] = int(out_n - in_n)
     try:
-        db.finish_run(run_id, stage=stage_name, ok=out_n, fail=0, meta=meta)
+        db.finish_run(run_id, stage=stage_name, ok=out_n, fail=failed, meta=meta)
     except Exception:
         pass
 
-    print(f"[{stage_name}] digest_id={digest_id} in={in_n} out={out_n} -> {out_path}")
+    print(f"[{stage_name}] digest_id={digest_id} in={in_n} out={out_n} reused={len(reused)} failed={failed} -> {out_path}")
+    if "llm_cache" in flow_stats:
+        cache = flow_stats["llm_cache"]
+        print(f"[{stage_name}] llm_cache hits={cache['hits']} misses={cache['misses']} evicted={cache['evicted']}")
     return 0
 
 
@@ -228,7 +228,7 @@ def make_draft_obj_from_brief(brief: dict, mapped_by_index: dict[str, dict]) ->
     }, None
 
 
-def _validate_and_package_draft(draft_obj: dict, run_id: str, source_reason: str) -> tuple[dict | None, str | None]:
+def _validate_and_package_draft(draft_obj: dict, quarantine: bio.JsonlWriter, source_reason: str) -> tuple[dict | None, str | None]:
     has_headline = bool(draft_obj.get("headline"))
     has_dek = bool(draft_obj.get("dek"))
     cits = draft_obj.get("citations") or []
@@ -241,7 +241,7 @@ def _validate_and_package_draft(draft_obj: dict, run_id: str, source_reason: str
             draft_model = ArticleDraftV1(**draft_obj)
             return json.loads(draft_model.model_dump_json()), None
         except Exception as e:
-            bio.append_jsonl(quarantine_path("V05", run_id), {
+            quarantine.write({
                 "reason": "pydantic_validation_error",
                 "error": str(e),
                 "source_reason": source_reason,
@@ -269,7 +269,7 @@ def _target_formats_from_brief(brief: dict | None) -> list[str]:
     return ["article"]
 
 
-def _write_draft_buses(draft_record: dict, target_formats: list[str], run_id: str, bus_root: Path | None = None) -> tuple[list[Path], str | None]:
+def _write_draft_buses(draft_record: dict, target_formats: list[str], quarantine: bio.JsonlWriter, bus_root: Path | None = None) -> tuple[list[Path], str | None]:
     article_dir = (bus_root / "buses" / "news_article_draft" / "v1") if bus_root else ARTICLE_DRAFT_BUS_DIR
     yt_dir = (bus_root / "buses" / "news_yt_script_draft" / "v1") if bus_root else YT_SCRIPT_DRAFT_BUS_DIR
     written: list[Path] = []
@@ -281,8 +281,7 @@ def _write_draft_buses(draft_record: dict, target_formats: list[str], run_id: st
             yt_record = yt_script_draft_from_stage05(draft_record)
             written.append(write_yt_script_draft(yt_record, bus_dir=yt_dir))
     except (DraftBusValidationError, OSError) as e:
-        bio.append_jsonl(
-            quarantine_path("V05", run_id),
+        quarantine.write(
             {
                 "reason": "draft_bus_write_failed",
                 "error": str(e),
@@ -363,179 +362,178 @@ def run() -> int:
             pass
         return 0
 
-    group_records: List[dict] = []
-    for pf in pf_files:
-        for rec in iter_jsonl_records(pf):
-            if rec.get("__bad__"):
-                bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "pf_bad_jsonl", "file": pf.name, **rec})
-                continue
-            group_records.append(rec)
-
-    if not group_records:
-        print(f"[{stage_name}] PF outputs empty after filtering")
-        try:
-            db.finish_run(run_id, ok=0, fail=0)
-        except Exception:
-            pass
-        return 0
-
-    df_groups = pd.DataFrame(group_records)
-    if sample is not None and 0 < sample < 1:
-        df_groups = df_groups.sample(frac=float(sample), random_state=17).reset_index(drop=True)
-    if limit is not None:
-        df_groups = df_groups.head(int(limit))
-
-    drafts_dir = (DATA_DIR / "_tmp" / "null" / "drafts" / digest_id) if null_sink else (DRAFTS_BASE / digest_id)
-    if write_draft_mirror:
-        drafts_dir.mkdir(parents=True, exist_ok=True)
-    bus_root = (DATA_DIR / "_tmp" / "null" / "storage") if null_sink else None
-
-    total_refs = 0
-    joined_refs = 0
-    ok_drafts = 0
-    bad_drafts = 0
-
-    briefs = load_piece_briefs_for_hour(digest_id)
-    use_briefs = len(briefs) > 0
-
-    if use_briefs:
-        for brief in briefs:
-            total_refs += 1
-            draft_obj, err = make_draft_obj_from_brief(brief, mapped_by_index)
-            if err or draft_obj is None:
-                bio.append_jsonl(quarantine_path("V05", run_id), {"reason": err or "brief_packaging_error", "brief_id": brief.get("brief_id")})
-                bad_drafts += 1
-                continue
-
-            draft_record, validation_err = _validate_and_package_draft(draft_obj, run_id, "brief")
-            if validation_err or draft_record is None:
-                bad_drafts += 1
-                continue
-
-            index_id = str(draft_record.get("index_id") or "").strip()
-            bus_paths, bus_err = _write_draft_buses(draft_record, _target_formats_from_brief(brief), run_id, bus_root)
-            if bus_err:
-                bad_drafts += 1
-                continue
-
-            out_path = drafts_dir / f"{index_id}.jsonl"
-            if write_draft_mirror:
-                atomic_write_one_jsonl(out_path, draft_record)
-            ok_drafts += 1
-            joined_refs += 1
-
-            if not dry_run:
-                payload = {"digest_id_hour": draft_record.get("digest_id_hour"), "index_id": index_id, "draft_path": str(out_path if write_draft_mirror else bus_paths[0])}
-                enqueued = False
-                for fn in ("push_work", "push_job", "enqueue_work", "enqueue_job"):
-                    try:
-                        getattr(db, fn)("generate", index_id, json.dumps(payload))
-                        enqueued = True
-                        break
-                    except Exception:
-                        continue
-                if not enqueued:
-                    bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "enqueue_not_available", "stage": "generate", "work_key": index_id, "payload": payload})
-    else:
-        if fallback_mode == "off":
-            msg = (
-                f"[{stage_name}] ERROR no news_piece_brief.v1 found for digest_id={digest_id}; "
-                "legacy editorial fallback is disabled (LEGACY_EDITORIAL_FALLBACK=off)"
-            )
-            print(msg)
-            bio.append_jsonl(
-                quarantine_path("V05", run_id),
-                {"reason": "fallback_disabled_no_piece_briefs", "digest_id": digest_id, "fallback_mode": fallback_mode},
-            )
+    with bio.JsonlWriter(quarantine_path("V05", run_id), append=True) as quarantine:
+        group_records: List[dict] = []
+        for pf in pf_files:
+            for rec in iter_jsonl_records(pf):
+                if rec.get("__bad__"):
+                    quarantine.write({"reason": "pf_bad_jsonl", "file": pf.name, **rec})
+                    continue
+                group_records.append(rec)
+
+        if not group_records:
+            print(f"[{stage_name}] PF outputs empty after filtering")
             try:
-                db.finish_run(run_id, ok=0, fail=1)
+                db.finish_run(run_id, ok=0, fail=0)
             except Exception:
                 pass
-            return 1
-
-        warning = (
-            f"[{stage_name}] WARNING EMERGENCY FALLBACK ACTIVATED for digest_id={digest_id}; "
-            "no news_piece_brief.v1 found, using legacy cluster packaging path"
-        )
-        print(warning)
-        bio.append_jsonl(
-            quarantine_path("V05", run_id),
-            {
-                "reason": "legacy_fallback_emergency_activated",
-                "digest_id": digest_id,
-                "fallback_mode": fallback_mode,
-            },
-        )
-        bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "missing_piece_briefs_fallback_legacy", "digest_id": digest_id})
-
-        for _, row in df_groups.iterrows():
-            digest_group_id = str(row.get("digest_group_id", "") or "").strip()
-            parsed = parse_digest_group_id(digest_group_id)
-            if not parsed:
-                bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "bad_digest_group_id", "value": digest_group_id})
-                bad_drafts += 1
-                continue
-
-            digest_ts, window_type, _, _ = parsed
-            digest_file = derive_digest_file(digest_ts, window_type)
-            clusters_obj = row.get("clustered_agenda_table", {})
-            if isinstance(clusters_obj, dict) and "clustered_agenda_table" in clusters_obj:
-                clusters = clusters_obj.get("clustered_agenda_table") or []
-            elif isinstance(clusters_obj, list):
-                clusters = clusters_obj
-            else:
-                clusters = []
-
-            for cl in clusters:
-                cl_topic = cl.get("topic") if isinstance(cl, dict) else None
-                a_ids = (cl.get("article_ids") or []) if isinstance(cl, dict) else []
-                titles = (cl.get("deduplicated_titles") or []) if isinstance(cl, dict) else []
-
-                n = min(len(a_ids), len(titles)) if titles else len(a_ids)
-                for i in range(n):
-                    article_id = str(a_ids[i])
-                    headline = titles[i] if i < len(titles) else None
-
-                    total_refs += 1
-                    key = f"{digest_file}::{article_id}"
-                    mapped = map_rows.get(key)
-                    if not mapped:
-                        bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "map_miss", "digest_file": digest_file, "article_id": article_id, "key": key})
-                        bad_drafts += 1
-                        continue
-
-                    index_id = str(mapped.get("index_id"))
-                    draft_obj = make_draft_obj(digest_ts, digest_file, article_id, index_id, cl_topic, mapped, headline)
-                    draft_record, validation_err = _validate_and_package_draft(draft_obj, run_id, "cluster")
-                    if validation_err or draft_record is None:
-                        bad_drafts += 1
-                        continue
-
-                    bus_paths, bus_err = _write_draft_buses(draft_record, ["article"], run_id, bus_root)
-                    if bus_err:
-                        bad_drafts += 1
-                        continue
-
-                    out_path = drafts_dir / f"{index_id}.jsonl"
-                    if write_draft_mirror:
-                        atomic_write_one_jsonl(out_path, draft_record)
-                    ok_drafts += 1
-                    joined_refs += 1
-
-                    if not dry_run:
-                        payload = {"digest_id_hour": digest_ts, "index_id": index_id, "draft_path": str(out_path if write_draft_mirror else bus_paths[0])}
-                        enqueued = False
-                        for fn in ("push_work", "push_job", "enqueue_work", "enqueue_job"):
-                            try:
-                                getattr(db, fn)("generate", index_id, json.dumps(payload))
-                                enqueued = True
-                                break
-                            except Exception:
-                                continue
-                        if not enqueued:
-                            bio.append_jsonl(quarantine_path("V05", run_id), {"reason": "enqueue_not_available", "stage": "generate", "work_key": index_id, "payload": payload})
-
-            _ = extract_seed_ideas(row)
+            return 0
+
+        df_groups = pd.DataFrame(group_records)
+        if sample is not None and 0 < sample < 1:
+            df_groups = df_groups.sample(frac=float(sample), random_state=17).reset_index(drop=True)
+        if limit is not None:
+            df_groups = df_groups.head(int(limit))
+
+        drafts_dir = (DATA_DIR / "_tmp" / "null" / "drafts" / digest_id) if null_sink else (DRAFTS_BASE / digest_id)
+        if write_draft_mirror:
+            drafts_dir.mkdir(parents=True, exist_ok=True)
+        bus_root = (DATA_DIR / "_tmp" / "null" / "storage") if null_sink else None
+
+        total_refs = 0
+        joined_refs = 0
+        ok_drafts = 0
+        bad_drafts = 0
+
+        briefs = load_piece_briefs_for_hour(digest_id)
+        use_briefs = len(briefs) > 0
+
+        if use_briefs:
+            for brief in briefs:
+                total_refs += 1
+                draft_obj, err = make_draft_obj_from_brief(brief, mapped_by_index)
+                if err or draft_obj is None:
+                    quarantine.write({"reason": err or "brief_packaging_error", "brief_id": brief.get("brief_id")})
+                    bad_drafts += 1
+                    continue
+
+                draft_record, validation_err = _validate_and_package_draft(draft_obj, quarantine, "brief")
+                if validation_err or draft_record is None:
+                    bad_drafts += 1
+                    continue
+
+                index_id = str(draft_record.get("index_id") or "").strip()
+                bus_paths, bus_err = _write_draft_buses(draft_record, _target_formats_from_brief(brief), quarantine, bus_root)
+                if bus_err:
+                    bad_drafts += 1
+                    continue
+
+                out_path = drafts_dir / f"{index_id}.jsonl"
+                if write_draft_mirror:
+                    atomic_write_one_jsonl(out_path, draft_record)
+                ok_drafts += 1
+                joined_refs += 1
+
+                if not dry_run:
+                    payload = {"digest_id_hour": draft_record.get("digest_id_hour"), "index_id": index_id, "draft_path": str(out_path if write_draft_mirror else bus_paths[0])}
+                    enqueued = False
+                    for fn in ("push_work", "push_job", "enqueue_work", "enqueue_job"):
+                        try:
+                            getattr(db, fn)("generate", index_id, json.dumps(payload))
+                            enqueued = True
+                            break
+                        except Exception:
+                            continue
+                    if not enqueued:
+                        quarantine.write({"reason": "enqueue_not_available", "stage": "generate", "work_key": index_id, "payload": payload})
+        else:
+            if fallback_mode == "off":
+                msg = (
+                    f"[{stage_name}] ERROR no news_piece_brief.v1 found for digest_id={digest_id}; "
+                    "legacy editorial fallback is disabled (LEGACY_EDITORIAL_FALLBACK=off)"
+                )
+                print(msg)
+                quarantine.write(
+                    {"reason": "fallback_disabled_no_piece_briefs", "digest_id": digest_id, "fallback_mode": fallback_mode},
+                )
+                try:
+                    db.finish_run(run_id, ok=0, fail=1)
+                except Exception:
+                    pass
+                return 1
+
+            warning = (
+                f"[{stage_name}] WARNING EMERGENCY FALLBACK ACTIVATED for digest_id={digest_id}; "
+                "no news_piece_brief.v1 found, using legacy cluster packaging path"
+            )
+            print(warning)
+            quarantine.write(
+                {
+                    "reason": "legacy_fallback_emergency_activated",
+                    "digest_id": digest_id,
+                    "fallback_mode": fallback_mode,
+                },
+            )
+            quarantine.write({"reason": "missing_piece_briefs_fallback_legacy", "digest_id": digest_id})
+
+            for _, row in df_groups.iterrows():
+                digest_group_id = str(row.get("digest_group_id", "") or "").strip()
+                parsed = parse_digest_group_id(digest_group_id)
+                if not parsed:
+                    quarantine.write({"reason": "bad_digest_group_id", "value": digest_group_id})
+                    bad_drafts += 1
+                    continue
+
+                digest_ts, window_type, _, _ = parsed
+                digest_file = derive_digest_file(digest_ts, window_type)
+                clusters_obj = row.get("clustered_agenda_table", {})
+                if isinstance(clusters_obj, dict) and "clustered_agenda_table" in clusters_obj:
+                    clusters = clusters_obj.get("clustered_agenda_table") or []
+                elif isinstance(clusters_obj, list):
+                    clusters = clusters_obj
+                else:
+                    clusters = []
+
+                for cl in clusters:
+                    cl_topic = cl.get("topic") if isinstance(cl, dict) else None
+                    a_ids = (cl.get("article_ids") or []) if isinstance(cl, dict) else []
+                    titles = (cl.get("deduplicated_titles") or []) if isinstance(cl, dict) else []
+
+                    n = min(len(a_ids), len(titles)) if titles else len(a_ids)
+                    for i in range(n):
+                        article_id = str(a_ids[i])
+                        headline = titles[i] if i < len(titles) else None
+
+                        total_refs += 1
+                        key = f"{digest_file}::{article_id}"
+                        mapped = map_rows.get(key)
+                        if not mapped:
+                            quarantine.write({"reason": "map_miss", "digest_file": digest_file, "article_id": article_id, "key": key})
+                            bad_drafts += 1
+                            continue
+
+                        index_id = str(mapped.get("index_id"))
+                        draft_obj = make_draft_obj(digest_ts, digest_file, article_id, index_id, cl_topic, mapped, headline)
+                        draft_record, validation_err = _validate_and_package_draft(draft_obj, quarantine, "cluster")
+                        if validation_err or draft_record is None:
+                            bad_drafts += 1
+                            continue
+
+                        bus_paths, bus_err = _write_draft_buses(draft_record, ["article"], quarantine, bus_root)
+                        if bus_err:
+                            bad_drafts += 1
+                            continue
+
+                        out_path = drafts_dir / f"{index_id}.jsonl"
+                        if write_draft_mirror:
+                            atomic_write_one_jsonl(out_path, draft_record)
+                        ok_drafts += 1
+                        joined_refs += 1
+
+                        if not dry_run:
+                            payload = {"digest_id_hour": digest_ts, "index_id": index_id, "draft_path": str(out_path if write_draft_mirror else bus_paths[0])}
+                            enqueued = False
+                            for fn in ("push_work", "push_job", "enqueue_work", "enqueue_job"):
+                                try:
+                                    getattr(db, fn)("generate", index_id, json.dumps(payload))
+                                    enqueued = True
+                                    break
+                                except Exception:
+                                    continue
+                            if not enqueued:
+                                quarantine.write({"reason": "enqueue_not_available", "stage": "generate", "work_key": index_id, "payload": payload})
+
+                _ = extract_seed_ideas(row)
 
     if total_refs > 0:
         join_ratio = joined_refs / total_refs
@@ -200,89 +200,90 @@ def run() -> int:
     ok_briefs = 0
     bad_briefs = 0
 
-    for pf in pf_files:
-        for row in iter_jsonl_records(pf):
-            if row.get("__bad__"):
-                bio.append_jsonl(quarantine_path("V06", run_id), {"reason": "pf_bad_jsonl", "file": pf.name, **row})
-                bad_briefs += 1
-                continue
-
-            digest_group_id = str(row.get("digest_group_id", "") or "").strip()
-            parsed = parse_digest_group_id(digest_group_id)
-            if not parsed:
-                bio.append_jsonl(quarantine_path("V06", run_id), {"reason": "bad_digest_group_id", "value": digest_group_id})
-                bad_briefs += 1
-                continue
-
-            digest_ts, window_type, topic_str, group_no = parsed
-            digest_file = derive_digest_file(digest_ts, window_type)
-
-            for ordinal, idea in enumerate(extract_seed_ideas(row), start=1):
-                source_ids = [str(v) for v in (idea.get("source_ids") or [])]
-                source_refs: list[dict] = []
-                index_ids: list[str] = []
-                for article_id in source_ids:
-                    map_key = f"{digest_file}::{article_id}"
-                    mapped = map_rows.get(map_key)
-                    if not mapped:
-                        continue
-                    index_id = str(mapped.get("index_id") or "").strip()
-                    if not index_id:
-                        continue
-                    index_ids.append(index_id)
-                    source_refs.append(
-                        {
-                            "index_id": index_id,
-                            "article_id": article_id,
-                            "title": str(mapped.get("Title") or "").strip(),
-                            "source": str(mapped.get("Source") or "").strip(),
-                            "url": str(mapped.get("Link") or "").strip(),
-                        }
-                    )
-
-                brief_id = _brief_id(digest_id, digest_group_id, idea, ordinal)
-                piece_brief = {
-                    "schema_name": "news_piece_brief.v1",
-                    "schema_status": "experimental_structured",
-                    "brief_id": brief_id,
-                    "digest_id_hour": digest_id,
-                    "digest_group_id": digest_group_id,
-                    "digest_file": digest_file,
-                    "topic": str(idea.get("topic") or topic_str or "All Topics").strip(),
-                    "working_title": str(idea.get("working_title") or idea.get("idea_title") or "").strip(),
-                    "angle": str(idea.get("angle") or idea.get("draft_editorial_angle") or "").strip(),
-                    "key_facts": [str(x).strip() for x in (idea.get("key_facts") or []) if str(x).strip()],
-                    "potential_controversies": [
-                        str(x).strip() for x in (idea.get("potential_controversies") or []) if str(x).strip()
-                    ],
-                    "relevant_quotes": [str(x).strip() for x in (idea.get("relevant_quotes") or []) if str(x).strip()],
-                    "source_index_ids": index_ids,
-                    "source_refs": source_refs,
-                    "meta": {
-                        "idea_id": str(idea.get("idea_id") or "").strip(),
-                        "group_no": group_no,
-                    },
-                }
-
-                if not piece_brief["working_title"]:
-                    bio.append_jsonl(quarantine_path("V06", run_id), {"reason": "missing_working_title", "brief_id": brief_id})
+    with bio.JsonlWriter(quarantine_path("V06", run_id), append=True) as quarantine:
+        for pf in pf_files:
+            for row in iter_jsonl_records(pf):
+                if row.get("__bad__"):
+                    quarantine.write({"reason": "pf_bad_jsonl", "file": pf.name, **row})
                     bad_briefs += 1
                     continue
 
-                valid, err = _validate_piece_brief(validator, piece_brief)
-                if not valid:
-                    bio.append_jsonl(quarantine_path("V06", run_id), {
-                        "reason": "schema_validation_error",
-                        "brief_id": brief_id,
-                        "error": err,
-                    })
+                digest_group_id = str(row.get("digest_group_id", "") or "").strip()
+                parsed = parse_digest_group_id(digest_group_id)
+                if not parsed:
+                    quarantine.write({"reason": "bad_digest_group_id", "value": digest_group_id})
                     bad_briefs += 1
                     continue
 
-                if not dry_run:
-                    out_path = BRIEFS_DIR / f"{brief_id}.jsonl"
-                    atomic_write_one_jsonl(out_path, piece_brief)
-                ok_briefs += 1
+                digest_ts, window_type, topic_str, group_no = parsed
+                digest_file = derive_digest_file(digest_ts, window_type)
+
+                for ordinal, idea in enumerate(extract_seed_ideas(row), start=1):
+                    source_ids = [str(v) for v in (idea.get("source_ids") or [])]
+                    source_refs: list[dict] = []
+                    index_ids: list[str] = []
+                    for article_id in source_ids:
+                        map_key = f"{digest_file}::{article_id}"
+                        mapped = map_rows.get(map_key)
+                        if not mapped:
+                            continue
+                        index_id = str(mapped.get("index_id") or "").strip()
+                        if not index_id:
+                            continue
+                        index_ids.append(index_id)
+                        source_refs.append(
+                            {
+                                "index_id": index_id,
+                                "article_id": article_id,
+                                "title": str(mapped.get("Title") or "").strip(),
+                                "source": str(mapped.get("Source") or "").strip(),
+                                "url": str(mapped.get("Link") or "").strip(),
+                            }
+                        )
+
+                    brief_id = _brief_id(digest_id, digest_group_id, idea, ordinal)
+                    piece_brief = {
+                        "schema_name": "news_piece_brief.v1",
+                        "schema_status": "experimental_structured",
+                        "brief_id": brief_id,
+                        "digest_id_hour": digest_id,
+                        "digest_group_id": digest_group_id,
+                        "digest_file": digest_file,
+                        "topic": str(idea.get("topic") or topic_str or "All Topics").strip(),
+                        "working_title": str(idea.get("working_title") or idea.get("idea_title") or "").strip(),
+                        "angle": str(idea.get("angle") or idea.get("draft_editorial_angle") or "").strip(),
+                        "key_facts": [str(x).strip() for x in (idea.get("key_facts") or []) if str(x).strip()],
+                        "potential_controversies": [
+                            str(x).strip() for x in (idea.get("potential_controversies") or []) if str(x).strip()
+                        ],
+                        "relevant_quotes": [str(x).strip() for x in (idea.get("relevant_quotes") or []) if str(x).strip()],
+                        "source_index_ids": index_ids,
+                        "source_refs": source_refs,
+                        "meta": {
+                            "idea_id": str(idea.get("idea_id") or "").strip(),
+                            "group_no": group_no,
+                        },
+                    }
+
+                    if not piece_brief["working_title"]:
+                        quarantine.write({"reason": "missing_working_title", "brief_id": brief_id})
+                        bad_briefs += 1
+                        continue
+
+                    valid, err = _validate_piece_brief(validator, piece_brief)
+                    if not valid:
+                        quarantine.write({
+                            "reason": "schema_validation_error",
+                            "brief_id": brief_id,
+                            "error": err,
+                        })
+                        bad_briefs += 1
+                        continue
+
+                    if not dry_run:
+                        out_path = BRIEFS_DIR / f"{brief_id}.jsonl"
+                        atomic_write_one_jsonl(out_path, piece_brief)
+                    ok_briefs += 1
 
     try:
         db.finish_run(run_id, ok=ok_briefs, fail=bad_briefs)
@@ -3,11 +3,14 @@ from pathlib import Path
 from pydantic import BaseModel
 import os, tempfile, json
 
+def _jsonl_line(obj: BaseModel | dict) -> str:
+    line = obj.model_dump_json() if isinstance(obj, BaseModel) else json.dumps(obj, ensure_ascii=False)
+    return line + "\n"
+
 def append_jsonl(path: Path, obj: BaseModel | dict):
     path.parent.mkdir(parents=True, exist_ok=True)
-    line = obj.model_dump_json() if isinstance(obj, BaseModel) else json.dumps(obj, ensure_ascii=False)
     with path.open("a", encoding="utf-8") as f:
-        f.write(line + "\n")
+        f.write(_jsonl_line(obj))
 
 def atomic_write_jsonl(path: Path, rows: list[str]):
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -16,3 +19,93 @@ def atomic_write_jsonl(path: Path, rows: list[str]):
             tmp.write(line.rstrip("\n") + "\n")
         temp_name = tmp.name
     os.replace(temp_name, path)
+
+
+class JsonlWriter:
+    """Buffered JSONL writer that keeps one handle open for a whole block.
+
+    By default the output is written to a temp file next to ``path`` and renamed
+    over it when the block exits cleanly (an exception leaves ``path`` untouched).
+    With ``append=True`` records are appended to ``path`` in place and the file is
+    only opened once the first batch is flushed, so quarantine-style writers cost
+    nothing when nothing goes wrong; buffered records are still flushed on error.
+    """
+
+    def __init__(self, path: Path, *, append: bool = False, fsync: bool = False, batch_size: int = 1000):
+        self.path = Path(path)
+        self.append = append
+        self.fsync = fsync
+        self.batch_size = max(1, int(batch_size))
+        self.count = 0
+        self._buf: list[str] = []
+        self._fh = None
+        self._temp_name: str | None = None
+        self._closed = False
+        if not append:
+            self._open()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.append:
+            self._fh = self.path.open("a", encoding="utf-8")
+        else:
+            self._fh = tempfile.NamedTemporaryFile(
+                "w", delete=False, dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp", encoding="utf-8"
+            )
+            self._temp_name = self._fh.name
+
+    def write(self, obj: BaseModel | dict) -> None:
+        self._buf.append(_jsonl_line(obj))
+        self.count += 1
+        if len(self._buf) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, objs) -> None:
+        for obj in objs:
+            self.write(obj)
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        if self._fh is None:
+            self._open()
+        self._fh.write("".join(self._buf))
+        self._buf.clear()
+
+    def close(self) -> None:
+        """Flush, fsync once if requested, and publish the temp file (non-append mode)."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self._fh is None:
+            return
+        if self.fsync:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        self._fh.close()
+        if self._temp_name:
+            os.replace(self._temp_name, self.path)
+
+    def abort(self) -> None:
+        """Drop an unpublished temp file; appended records are kept as evidence."""
+        if self.append:
+            self.close()
+            return
+        if self._closed:
+            return
+        self._closed = True
+        self._buf.clear()
+        if self._fh is not None:
+            self._fh.close()
+        if self._temp_name and os.path.exists(self._temp_name):
+            os.unlink(self._temp_name)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
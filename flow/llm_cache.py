@@ -0,0 +1,136 @@
+"""On-disk cache of LLM function-call results, keyed by the request content.
+
+The key is the sha256 of the canonical JSON of everything that shapes the
+answer (model, function schema, rendered messages, sampling parameters), so a
+rerun, a backfill or an overlapping window that sends the same request again
+is answered from disk without an API call.  Layout::
+
+    <root>/<key[:2]>/<key>.json   {"schema": "llm_cache.v1", "created_at": ..., "value": ...}
+
+Entries are written to a temp file and renamed into place, so concurrent
+writers (threads or processes) never leave a torn entry; within a process,
+concurrent lookups of the same key wait for the one request in flight instead
+of sending their own.  Entries older than ``ttl_s`` are misses, and once the
+cache grows past ``max_bytes`` the least recently used entries are dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+
+CACHE_SCHEMA = "llm_cache.v1"
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """sha256 of the request's canonical JSON (key order does not matter)."""
+    blob = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, root: Path, ttl_s: float | None = None, max_bytes: int | None = None):
+        self.root = Path(root)
+        self.ttl_s = ttl_s if ttl_s and ttl_s > 0 else None
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._size: int | None = None
+        self._counts = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """``(True, value)`` for a live entry, ``(False, None)`` otherwise."""
+        path = self.path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return False, None
+        if entry.get("schema") != CACHE_SCHEMA:
+            return False, None
+        if self.ttl_s is not None and time.time() - float(entry.get("created_at", 0)) > self.ttl_s:
+            self._count("expired")
+            path.unlink(missing_ok=True)
+            return False, None
+        try:
+            # mtime is the recency the size eviction goes by
+            os.utime(path)
+        except OSError:
+            pass
+        return True, entry["value"]
+
+    def put(self, key: str, value: Any) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"schema": CACHE_SCHEMA, "created_at": time.time(), "value": value}, ensure_ascii=False)
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=path.parent, suffix=".tmp", encoding="utf-8") as tmp:
+            tmp.write(data)
+            temp_name = tmp.name
+        os.replace(temp_name, path)
+        self._count("stores")
+        if self.max_bytes is not None:
+            self._grow(len(data.encode("utf-8")))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Cached value for ``key``, or ``compute()`` stored under it; returns ``(value, hit)``."""
+        with self._lock:
+            gate = self._inflight.setdefault(key, threading.Lock())
+        with gate:
+            hit, value = self.get(key)
+            if hit:
+                self._count("hits")
+                return value, True
+            self._count("misses")
+            value = compute()
+            self.put(key, value)
+            return value, False
+
+    def _entries(self) -> list[Tuple[float, int, Path]]:
+        out = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _grow(self, nbytes: int) -> None:
+        with self._lock:
+            if self._size is None:
+                # One scan per process; later puts keep the running total
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += nbytes
+            if self._size <= self.max_bytes:
+                return
+            # Evict down to 90% of the cap so the next few puts do not rescan
+            entries = sorted(self._entries())
+            size = sum(s for _, s, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            evicted = 0
+            for _, s, path in entries:
+                if size <= target:
+                    break
+                path.unlink(missing_ok=True)
+                size -= s
+                evicted += 1
+            self._size = size
+            self._counts["evicted"] += evicted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
@@ -0,0 +1,232 @@
+"""Client-side rate limiting, retry and adaptive concurrency for LLM calls.
+
+All flow lines of a process share one ``LLMThrottle``:
+
+* ``TokenBucket`` pairs for requests/min and tokens/min.  A call reserves one
+  request and its estimated tokens up front (the server counts ``max_tokens``
+  the same way) and sleeps off any debt outside the lock, so waiters are
+  served in arrival order without busy polling.
+* ``AIMDController`` caps calls in flight: +1 slot per window of successes,
+  halved on a throttle (at most once per cooldown, so one burst of 429s is a
+  single cut).
+* ``call_with_retry`` retries 408/409/429/5xx and connection errors with
+  full-jitter exponential backoff, or waits what ``Retry-After`` asks; a 429
+  also pauses the bucket for every worker, not just the one that hit it.
+
+Limits are per process.  Several processes against one key need their own
+share of the budget (e.g. ``LLM_RPM`` divided by the process count).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator
+
+
+class TokenBucket:
+    """``per_minute`` units per minute, bursting up to one minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(per_minute) / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1.0) -> float:
+        """Take ``n`` units now; returns how long the caller must wait before using them."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= n
+            return max(0.0, -self.tokens / self.rate)
+
+
+class AIMDController:
+    """Concurrency limit that grows by ``increase`` per window of successes and shrinks by ``decrease`` on throttling."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5, cooldown_s: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = float(min(max(int(initial), self.minimum), self.maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown_s = cooldown_s
+        self.in_flight = 0
+        self._clock = clock
+        self._last_cut = float("-inf")
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            before = int(self.limit)
+            # A full window (``limit`` successes) adds ``increase`` slots
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            if int(self.limit) > before:
+                self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            now = self._clock()
+            if now - self._last_cut >= self.cooldown_s:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_cut = now
+
+
+def retry_after_s(exc: BaseException) -> float | None:
+    """Seconds asked for by the ``Retry-After(-ms)`` header of an HTTP error, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    code = status_code(exc)
+    if code is None:
+        # No HTTP response at all: connection reset, timeout, DNS
+        return type(exc).__name__ in {"APIConnectionError", "APITimeoutError", "ConnectionError", "TimeoutError"}
+    return code in (408, 409, 429) or code >= 500
+
+
+def backoff_s(attempt: int, exc: BaseException, base_s: float, max_s: float, rng: Callable[[], float] = random.random) -> float:
+    """Delay before retry ``attempt`` (0-based): Retry-After plus up to 20% jitter, else full-jitter exponential."""
+    asked = retry_after_s(exc)
+    if asked is not None:
+        return min(max_s, asked * (1 + 0.2 * rng()))
+    return rng() * min(max_s, base_s * (2 ** attempt))
+
+
+def call_with_retry(fn: Callable[[], Any], attempts: int = 5, base_s: float = 1.0, max_s: float = 60.0,
+                    retryable: Callable[[BaseException], bool] = is_retryable,
+                    on_error: Callable[[BaseException, float], None] | None = None,
+                    sleep: Callable[[float], None] = time.sleep) -> Any:
+    """``fn()``, retried up to ``attempts`` times in total on retryable errors."""
+    for attempt in range(max(1, attempts)):
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= attempts - 1 or not retryable(exc):
+                raise
+            delay = backoff_s(attempt, exc, base_s, max_s)
+            if on_error is not None:
+                on_error(exc, delay)
+            sleep(delay)
+
+
+class LLMThrottle:
+    """Rate limits, adaptive concurrency and retries around one LLM call."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, concurrency: int = 0, min_concurrency: int = 1,
+                 max_concurrency: int = 64, attempts: int = 5, base_s: float = 1.0, max_s: float = 60.0,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        self.requests = TokenBucket(rpm, clock) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, clock) if tpm > 0 else None
+        self.aimd = AIMDController(concurrency, min_concurrency, max_concurrency, clock=clock) if concurrency > 0 else None
+        self.attempts = attempts
+        self.base_s = base_s
+        self.max_s = max_s
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._resume_at = float("-inf")
+        self._counts: Dict[str, float] = {"calls": 0, "attempts": 0, "retries": 0, "throttled": 0, "failed": 0, "waited_s": 0.0}
+
+    def _count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def _wait_turn(self, tokens: float) -> None:
+        with self._lock:
+            paused = self._resume_at - self._clock()
+        wait = max(0.0, paused)
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens > 0:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            self._count("waited_s", wait)
+            self._sleep(wait)
+
+    def _on_error(self, exc: BaseException, delay: float) -> None:
+        self._count("retries")
+        if status_code(exc) == 429:
+            self._count("throttled")
+            if self.aimd is not None:
+                self.aimd.on_throttle()
+            # Everyone backs off, not only the worker that was told to
+            with self._lock:
+                self._resume_at = max(self._resume_at, self._clock() + delay)
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0,
+             retryable: Callable[[BaseException], bool] = is_retryable) -> Any:
+        """``fn()`` once a slot and budget are free; retried on transient errors."""
+        self._count("calls")
+
+        def attempt() -> Any:
+            self._wait_turn(tokens)
+            self._count("attempts")
+            if self.aimd is None:
+                return fn()
+            with self.aimd.slot():
+                result = fn()
+            self.aimd.on_success()
+            return result
+
+        try:
+            return call_with_retry(attempt, self.attempts, self.base_s, self.max_s, retryable, self._on_error, self._sleep)
+        except Exception:
+            self._count("failed")
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counts)
+        out["waited_s"] = round(out["waited_s"], 3)
+        if self.aimd is not None:
+            out["concurrency_limit"] = round(self.aimd.limit, 2)
+        return out
@@ -1,9 +1,16 @@
 import os
+import threading
 from openai.version import VERSION as OPENAI_VERSION
 from pathlib import Path
 import json
 from dotenv import load_dotenv
-from promptflow.core import tool
+from llm_cache import LLMCache, request_key
+from llm_limits import LLMThrottle
+try:
+    from promptflow.core import tool
+except ImportError:  # run in-process by stage 04 without promptflow installed
+    def tool(func):
+        return func
 
 # The inputs section will change based on the arguments of the tool function, after you save the code
 # Adding type to arguments and return value will help the system show the types properly
@@ -14,39 +21,145 @@ def to_bool(value) -> bool:
     return str(value).lower() == "true"
 
 
+# Response cache (LLM_CACHE=1): identical requests are answered from disk.
+# LLM_CACHE_DIR defaults to <repo>/data/llm_cache; LLM_CACHE_TTL_S=0 and
+# LLM_CACHE_MAX_MB=0 mean no expiry and no size cap.
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if os.getenv("LLM_CACHE", "0").strip().lower() not in ("1", "true"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            root = os.getenv("LLM_CACHE_DIR") or Path(__file__).resolve().parent.parent / "data" / "llm_cache"
+            _cache = LLMCache(
+                Path(root),
+                ttl_s=float(os.getenv("LLM_CACHE_TTL_S", "0")),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024),
+            )
+        return _cache
+
+
+# Shared by every call in the process: LLM_RPM / LLM_TPM token buckets (0 = no
+# limit), LLM_RETRIES attempts with jittered backoff honouring Retry-After, and
+# an AIMD cap on calls in flight starting at LLM_CONCURRENCY (0 = no cap) that
+# halves on 429s and grows back by one per window of successes.
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_throttle():
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = LLMThrottle(
+                rpm=float(os.getenv("LLM_RPM", "0")),
+                tpm=float(os.getenv("LLM_TPM", "0")),
+                concurrency=int(os.getenv("LLM_CONCURRENCY", "8")),
+                max_concurrency=int(os.getenv("LLM_CONCURRENCY_MAX", "64")),
+                attempts=int(os.getenv("LLM_RETRIES", "5")),
+                base_s=float(os.getenv("LLM_BACKOFF_BASE_S", "1")),
+                max_s=float(os.getenv("LLM_BACKOFF_MAX_S", "60")),
+            )
+        return _throttle
+
+
+def estimate_tokens(request: dict) -> int:
+    """Tokens a request counts against TPM: ~4 chars per prompt token plus the completion allowance."""
+    chars = sum(len(str(m.get("content") or "")) for m in request["messages"])
+    chars += len(json.dumps(request.get("functions") or []))
+    return chars // 4 + int(request.get("max_tokens") or 0) * int(request.get("n") or 1)
+
+
+def flow_stats() -> dict:
+    """Counters for the runner's run record (stage 04 collects these from tool modules)."""
+    stats = {"llm_cache": _cache.stats()} if _cache is not None else {}
+    if _throttle is not None:
+        stats["llm_limits"] = _throttle.stats()
+    return stats
+
+
+# One client per connection config for the whole process.  The OpenAI client is
+# thread-safe and keeps its HTTP connections alive, so concurrent flow lines
+# share one pool instead of opening a connection (and TLS session) per call.
+# LLM_TIMEOUT_S / LLM_CONNECT_TIMEOUT_S bound each request.  The SDK's own
+# retries are off: get_throttle() retries (LLM_RETRIES) and also backs off the
+# other workers, which the SDK cannot do.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
 def get_client():
     if OPENAI_VERSION.startswith("0."):
         raise Exception(
             "Please upgrade your OpenAI package to version >= 1.0.0 or using the command: pip install --upgrade openai."
         )
+    if "OPENAI_API_KEY" not in os.environ or "AZURE_OPENAI_API_BASE" not in os.environ:
+        # load environment variables from .env file
+        load_dotenv()
+
+    if "OPENAI_API_KEY" not in os.environ:
+        raise Exception("Please specify environment variables: OPENAI_API_KEY")
+
     api_key = os.environ["OPENAI_API_KEY"]
     conn = dict(
-        api_key=os.environ["OPENAI_API_KEY"],
+        api_key=api_key,
+        timeout=float(os.getenv("LLM_TIMEOUT_S", "120")),
+        connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT_S", "10")),
     )
     if api_key.startswith("sk-"):
-        from openai import OpenAI as Client
+        conn.update(base_url=os.environ.get("OPENAI_BASE_URL"))
     else:
-        from openai import AzureOpenAI as Client
         conn.update(
             azure_endpoint=os.environ.get("AZURE_OPENAI_API_BASE", "azure"),
             api_version=os.environ.get("OPENAI_API_VERSION", "2023-07-01-preview"),
         )
 
-    if "OPENAI_API_KEY" not in os.environ or "AZURE_OPENAI_API_BASE" not in os.environ:
-        # load environment variables from .env file
-        load_dotenv()
+    key = tuple(sorted(conn.items()))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build_client(**conn)
+        return client
+
+
+def _build_client(api_key, timeout, connect_timeout, base_url=None, **azure):
+    from openai import Timeout
+
+    options = dict(api_key=api_key, timeout=Timeout(timeout, connect=connect_timeout), max_retries=0)
+    if azure:
+        from openai import AzureOpenAI as Client
+        options.update(azure)
+    else:
+        from openai import OpenAI as Client
+        options.update(base_url=base_url)
+    return Client(**options)
 
-    if "OPENAI_API_KEY" not in os.environ:
-        raise Exception("Please specify environment variables: OPENAI_API_KEY")
 
-    return Client(**conn)
+_heap_lock = threading.Lock()
 
 
+# Parsed schemas by resolved path, reloaded when the file's mtime changes
+_schemas = {}
+_schemas_lock = threading.Lock()
+
 
 def load_schema(file_path: str):
     # Load JSON schema from the specified file path
-    with open(file_path, 'r') as schema_file:
-        return json.load(schema_file)
+    path = str(Path(file_path).resolve())
+    mtime = os.stat(path).st_mtime_ns
+    with _schemas_lock:
+        cached = _schemas.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with open(path, 'r') as schema_file:
+        schema = json.load(schema_file)
+    with _schemas_lock:
+        _schemas[path] = (mtime, schema)
+    return schema
 
 
 # Load schema once (relative to this file’s location)
@@ -96,12 +209,7 @@ def run_llm_schema_tool(
         raise ValueError(f"Schema does not match expected name '{function_name}': got {schema}")
 
 
-    client = get_client()
-
-    print("FUNCTION NAME:", function_name)
-    print("FUNCTIONS AVAILABLE:", [schema.get("name")])
-
-    response = client.chat.completions.create(
+    request = dict(
         messages=[
             {"role": "system", "content": ""},
             {"role": "user", "content": prompt}
@@ -117,23 +225,41 @@ def run_llm_schema_tool(
         presence_penalty=float(presence_penalty),
         frequency_penalty=float(frequency_penalty),
         logit_bias=logit_bias or {},
-        user=user,
     )
 
-    raw_args = response.choices[0].message.function_call.arguments
+    def call() -> dict:
+        client = get_client()
+        response = get_throttle().call(
+            lambda: client.chat.completions.create(**request, user=user),
+            tokens=estimate_tokens(request),
+        )
 
-    try:
-        parsed = json.loads(raw_args)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Function call output is not valid JSON:\n{raw_args}") from e
+        raw_args = response.choices[0].message.function_call.arguments
+
+        try:
+            return json.loads(raw_args)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Function call output is not valid JSON:\n{raw_args}") from e
+
+    cache = get_cache()
+    if cache is None:
+        parsed = call()
+    else:
+        # `user` is only an abuse-monitoring tag; it does not change the answer
+        parsed, hit = cache.get_or_compute(request_key(request), call)
+        if hit:
+            return parsed
 
     # ✅ OPTIONAL: append result to a heap-style file for long-term collection
-    heap_path = Path("/home/matias/dev/my-agents/Cities/gpt_chats/flows/gpt_chats2/outputs_heap.jsonl")
-    heap_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(heap_path, "a") as f:
-        json.dump(parsed, f, ensure_ascii=False)
-        f.write("\n")
+    # (off unless LLM_OUTPUTS_HEAP names the file)
+    heap_env = os.getenv("LLM_OUTPUTS_HEAP", "")
+    if heap_env:
+        heap_path = Path(heap_env)
+        heap_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(parsed, ensure_ascii=False) + "\n"
+        # One write per line, one writer at a time: flow lines run on threads
+        with _heap_lock, open(heap_path, "a", encoding="utf-8") as f:
+            f.write(line)
 
     return parsed
 
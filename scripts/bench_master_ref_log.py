@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark the stage 02 hourly master_ref write on the delta log (MASTER_REF_LOG=1).
+
+For each table size, seeds a log with a synthetic master_ref and replays
+``--hours`` digest hours the way stage 02 does (compact when the pending
+segments reach ``--compact-ratio`` of the base, then append the hour's
+segment).  Reports the typical and the amortized cost per hour next to one
+full-table rewrite (``export_csv``), and checks that the folded log still
+holds every index_id it was given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from apps.news_acquire.src.news_acquire.master_ref_log import MasterRefLog
+from scripts.bench_master_ref_merge import synthetic_tables
+
+
+def _hour(log: MasterRefLog, digest_id: str, hour_stats: pd.DataFrame, compact_ratio: float) -> float:
+    started = time.perf_counter()
+    if log.pending_ratio() >= compact_ratio:
+        log.compact()
+    log.append_delta(digest_id, hour_stats)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="30000,300000", help="comma-separated master_ref row counts")
+    parser.add_argument("--hour-rows", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=96)
+    parser.add_argument("--compact-ratio", type=float, default=0.25)
+    args = parser.parse_args()
+
+    for rows in (int(s) for s in args.sizes.split(",") if s.strip()):
+        master_prev, template = synthetic_tables(rows, args.hour_rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            seed_csv = Path(tmp) / "master_ref.csv"
+            master_prev.to_csv(seed_csv, index=False)
+            log = MasterRefLog(Path(tmp) / "master_ref")
+            log.seed(seed_csv)
+            expected = set(master_prev["index_id"])
+
+            hour_s = []
+            for h in range(args.hours):
+                # Same known articles every hour, a fresh batch of new ones
+                hour_stats = template.assign(index_id=template["index_id"].str.replace("^n", f"n{h:03d}", regex=True))
+                hour_stats["first_seen"] = hour_stats["last_seen"] = pd.Timestamp("2026-01-01", tz="UTC") + pd.Timedelta(hours=h)
+                digest_id = (pd.Timestamp("2026-01-01") + pd.Timedelta(hours=h)).strftime("%Y%m%dT%H")
+                hour_s.append(_hour(log, digest_id, hour_stats, args.compact_ratio))
+                expected.update(hour_stats["index_id"])
+
+            started = time.perf_counter()
+            log.export_csv(Path(tmp) / "export.csv")
+            export_s = time.perf_counter() - started
+            exported = pd.read_csv(Path(tmp) / "export.csv", dtype=str, keep_default_na=False)
+            assert exported["index_id"].tolist() == sorted(expected), "log lost or invented index_ids"
+
+        print(
+            f"[bench-master-ref-log] rows={rows} hour_rows={args.hour_rows} hours={args.hours} "
+            f"median_hour_s={statistics.median(hour_s):.3f} amortized_hour_s={sum(hour_s) / len(hour_s):.3f} "
+            f"max_hour_s={max(hour_s):.3f} full_export_s={export_s:.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
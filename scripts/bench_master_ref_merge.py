@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Benchmark the stage 02 master_ref DataFrame merge (MASTER_REF_LOG=0 path).
+
+Compares the column-wise ``merge_master_ref`` against the former row-wise
+``apply(_coalesce, axis=1)`` merge on synthetic tables, and checks that both
+produce the same frame.  Also times the whole hour on disk (load + merge +
+write of master_ref.csv) against the former per-row topics/meta JSON
+parse/serialize, and checks that both write the same bytes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from apps.news_acquire.src.news_acquire import stage02_master_index_update as stage02
+from apps.news_acquire.src.news_acquire.stage02_master_index_update import _json_cell, merge_master_ref
+
+
+def _merge_rowwise(master_prev: pd.DataFrame, hour_stats: pd.DataFrame) -> pd.DataFrame:
+    """The pre-vectorization merge, kept here as the reference."""
+    merged = pd.merge(master_prev, hour_stats, on="index_id", how="outer", suffixes=("_prev", "_new"))
+
+    def _coalesce(src_prev, src_new):
+        return src_new if pd.notna(src_new) and src_new != "" else src_prev
+
+    merged["source"] = merged.apply(lambda r: _coalesce(r.get("source_prev"), r.get("source_new")), axis=1)
+    merged["link"] = merged.apply(lambda r: _coalesce(r.get("link_prev"), r.get("link_new")), axis=1)
+    merged["first_seen"] = merged[["first_seen_prev", "first_seen_new"]].min(axis=1)
+    merged["last_seen"] = merged[["last_seen_prev", "last_seen_new"]].max(axis=1)
+    if "topics_prev" in merged.columns:
+        merged["topics"] = merged["topics_prev"]
+    else:
+        merged["topics"] = [[] for _ in range(len(merged))]
+    if "meta_prev" in merged.columns:
+        merged["meta"] = merged["meta_prev"]
+    else:
+        merged["meta"] = [{} for _ in range(len(merged))]
+    return merged[["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"]].copy()
+
+
+def synthetic_tables(rows: int, hour_rows: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2025-01-01", tz="UTC")
+    offsets = pd.to_timedelta(rng.integers(0, 24 * 365, rows), unit="h")
+    master_prev = pd.DataFrame(
+        {
+            "index_id": [f"{i:010x}" for i in range(rows)],
+            "source": rng.choice(["Infobae", "Clarín", "La Nación", ""], rows),
+            "link": [f"https://example.test/{i}" for i in range(rows)],
+            "first_seen": base + offsets,
+            "last_seen": base + offsets + pd.Timedelta(hours=2),
+            "topics": "[]",
+            "meta": "{}",
+        }
+    )
+    # Half of the hour updates known articles, half is new
+    known = rng.choice(rows, hour_rows // 2, replace=False)
+    ids = [f"{i:010x}" for i in known] + [f"n{i:09x}" for i in range(hour_rows - len(known))]
+    seen = base + pd.Timedelta(days=366)
+    hour_stats = pd.DataFrame(
+        {
+            "index_id": ids,
+            "source": rng.choice(["Infobae", ""], len(ids)),
+            "link": [f"https://example.test/h/{i}" for i in range(len(ids))],
+            "first_seen": seen,
+            "last_seen": seen,
+        }
+    )
+    return master_prev, hour_stats
+
+
+def _as_written(df: pd.DataFrame) -> pd.DataFrame:
+    # write_master_ref_csv normalizes topics/meta to list/dict before writing
+    df = df.copy()
+    df["topics"] = df["topics"].apply(_json_cell, kind=list)
+    df["meta"] = df["meta"].apply(_json_cell, kind=dict)
+    return df
+
+
+def _load_rowwise(path: Path) -> pd.DataFrame:
+    """The former load: every topics/meta cell parsed to list/dict."""
+    df = pd.read_csv(path)
+    for col in ("first_seen", "last_seen"):
+        df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    df["topics"] = df["topics"].apply(_json_cell, kind=list)
+    df["meta"] = df["meta"].apply(_json_cell, kind=dict)
+    return df
+
+
+def _write_rowwise(df: pd.DataFrame, path: Path) -> None:
+    """The former write: every topics/meta cell serialized again."""
+    df = df.drop_duplicates(subset=["index_id"], keep="last").sort_values("index_id")
+    df["topics"] = df["topics"].apply(lambda v: json.dumps(_json_cell(v, list), ensure_ascii=False))
+    df["meta"] = df["meta"].apply(lambda v: json.dumps(_json_cell(v, dict), ensure_ascii=False, sort_keys=True))
+    df.to_csv(path, index=False)
+
+
+def _hour_on_disk(tmp: Path, master_prev: pd.DataFrame, hour_stats: pd.DataFrame, rowwise: bool) -> tuple[float, float, float, bytes]:
+    """Seconds to load, merge and write one hour against master_ref.csv, plus the bytes written."""
+    path = tmp / "master_ref.csv"
+    stage02.DATA_DIR, stage02.MASTER_REF_CSV = tmp, path
+    master_prev.to_csv(path, index=False)
+    load_s, prev = _timed(_load_rowwise, path) if rowwise else _timed(stage02.load_master_ref_csv)
+    merge_s, merged = _timed(merge_master_ref, prev, hour_stats)
+    if rowwise:
+        write_s, _ = _timed(_write_rowwise, merged, path)
+    else:
+        write_s, _ = _timed(stage02.write_master_ref_csv, merged, False)
+    return load_s, merge_s, write_s, path.read_bytes()
+
+
+def _timed(fn, *args) -> tuple[float, pd.DataFrame]:
+    started = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - started, out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100000,1000000", help="comma-separated master_ref row counts")
+    parser.add_argument("--hour-rows", type=int, default=5000)
+    parser.add_argument("--skip-rowwise", action="store_true", help="only time the column-wise merge")
+    args = parser.parse_args()
+
+    for rows in (int(s) for s in args.sizes.split(",") if s.strip()):
+        master_prev, hour_stats = synthetic_tables(rows, args.hour_rows)
+        vec_s, vec = _timed(merge_master_ref, master_prev, hour_stats)
+        line = f"[bench-master-ref-merge] rows={rows} hour_rows={args.hour_rows} columnwise_s={vec_s:.3f}"
+        if not args.skip_rowwise:
+            row_s, ref = _timed(_merge_rowwise, master_prev, hour_stats)
+            pd.testing.assert_frame_equal(_as_written(vec), _as_written(ref))
+            line += f" rowwise_s={row_s:.3f} speedup={row_s / vec_s:.1f}x"
+        print(line)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            load_s, merge_s, write_s, written = _hour_on_disk(Path(tmp), master_prev, hour_stats, rowwise=False)
+            line = (
+                f"[bench-master-ref-merge] rows={rows} hour_rows={args.hour_rows} "
+                f"load_s={load_s:.3f} merge_s={merge_s:.3f} write_s={write_s:.3f} total_s={load_s + merge_s + write_s:.3f}"
+            )
+            if not args.skip_rowwise:
+                ref = _hour_on_disk(Path(tmp), master_prev, hour_stats, rowwise=True)
+                assert written == ref[3], "master_ref.csv differs from the per-row JSON path"
+                line += f" rowwise_total_s={sum(ref[:3]):.3f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark db.upsert_master_ref (COPY + set-based merge) against per-row executemany.
+
+Needs a local Postgres reachable through PG_DSN.  Everything runs in a scratch
+schema (dropped at the end) created from sql/002_master_ref.sql; each size is
+timed on a table where half of the batch already exists, so both the insert
+and the conflict branches are exercised.  Both paths must leave identical
+tables.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from apps.news_acquire.src.news_acquire import db
+
+SCHEMA = "bench_master_ref"
+
+# The former per-row statement, kept here as the reference
+ROWWISE_SQL = """
+insert into master_ref (index_id, source, link, first_seen, last_seen, topics, meta)
+values (%(index_id)s, %(source)s, %(link)s, %(first_seen)s, %(last_seen)s, %(topics)s, %(meta)s::jsonb)
+on conflict (index_id) do update set
+  last_seen = excluded.last_seen,
+  topics    = (select array(select distinct unnest(master_ref.topics || excluded.topics))),
+  meta      = master_ref.meta || excluded.meta;
+"""
+
+
+def synthetic_rows(n: int, offset: int = 0) -> list[dict]:
+    base = datetime(2025, 1, 14, tzinfo=timezone.utc)
+    return [
+        {
+            "index_id": f"{i:010x}",
+            "source": "Infobae",
+            "link": f"https://example.test/{i}",
+            "first_seen": base + timedelta(minutes=i % 600),
+            "last_seen": base + timedelta(minutes=i % 600 + offset),
+            "topics": ["economia"] if i % 2 else ["economia", "politica"],
+            "meta": {"last_digest_id": f"20250114T{offset % 24:02d}"},
+        }
+        for i in range(n)
+    ]
+
+
+def _rowwise(rows: list[dict]) -> None:
+    with db.get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(ROWWISE_SQL, [{**r, "meta": json.dumps(r["meta"])} for r in rows])
+        conn.commit()
+
+
+def _reset(existing: list[dict]) -> None:
+    with db.get_conn() as conn:
+        conn.execute("truncate master_ref")
+        conn.commit()
+    db.upsert_master_ref(existing)
+
+
+def _snapshot() -> list[tuple]:
+    with db.get_conn() as conn:
+        return conn.execute(
+            "select index_id, source, link, first_seen, last_seen, "
+            "array(select unnest(topics) order by 1), meta from master_ref order by index_id"
+        ).fetchall()
+
+
+def _timed(fn, rows: list[dict]) -> float:
+    started = time.perf_counter()
+    fn(rows)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated batch sizes")
+    args = parser.parse_args()
+
+    with db.get_conn() as conn:
+        conn.execute(f"drop schema if exists {SCHEMA} cascade")
+        conn.execute(f"create schema {SCHEMA}")
+        conn.execute(f"set search_path to {SCHEMA}")
+        conn.execute((REPO_ROOT / "sql" / "002_master_ref.sql").read_text(encoding="utf-8"))
+        conn.commit()
+    # Every connection opened by db.get_conn() from here on uses the scratch schema
+    os.environ["PGOPTIONS"] = f"{os.getenv('PGOPTIONS', '')} -c search_path={SCHEMA}".strip()
+    try:
+        for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+            existing = synthetic_rows(n // 2)
+            batch = synthetic_rows(n, offset=60)
+            _reset(existing)
+            row_s = _timed(_rowwise, batch)
+            expected = _snapshot()
+            _reset(existing)
+            bulk_s = _timed(db.upsert_master_ref, batch)
+            assert _snapshot() == expected, "bulk upsert diverged from the per-row upsert"
+            print(f"[bench-master-ref-upsert] rows={n} rowwise_s={row_s:.3f} copy_merge_s={bulk_s:.3f} speedup={row_s / bulk_s:.1f}x")
+    finally:
+        with db.get_conn() as conn:
+            conn.execute(f"drop schema if exists {SCHEMA} cascade")
+            conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
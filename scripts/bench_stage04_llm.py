@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark stage 04 end to end against the local mock OpenAI server.
+
+Runs the real path — stage04_promptflow_run.run() with the in-process
+executor, the flow's prompts and llm_wrapper (limits, retries, client reuse) —
+with OPENAI_BASE_URL pointed at scripts/mock_openai_server.py.  Each
+concurrency level processes a fresh synthetic hour of ``--groups`` digest
+groups in a scratch DATA_DIR and must produce one pfout row per group.
+
+    python scripts/bench_stage04_llm.py --groups 200 --concurrency 1,8,32 \\
+        --latency lognormal:0.4,0.5 --rate-429 0.05
+
+No API key, Postgres or network is needed (run records are skipped when the
+database is unreachable).  ``--json PATH`` writes the results for tracking.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from mock_openai_server import MockOpenAIServer
+
+TOPICS = ["Economia", "Politica", "Deportes", "Tecnologia"]
+
+
+def synthetic_groups(digest_id: str, n: int, per_group: int = 25) -> list[dict]:
+    groups = []
+    for g in range(n):
+        topic = TOPICS[g % len(TOPICS)]
+        lines = [f"- **ID {g * per_group + i + 1}** — Titular sintético {g}-{i} sobre {topic.lower()} — _Fuente {i % 7}_" for i in range(per_group)]
+        groups.append({
+            "id_digest": f"{digest_id}_{g:03d}",
+            "digest_group_id": f"{digest_id}::1h_window::{topic}::{g + 1:02d}",
+            "window_type": "1h_window",
+            "topic": topic,
+            "group_number": f"{g + 1:02d}",
+            "content": f"# {topic}\n\n" + "\n".join(lines),
+        })
+    return groups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated PF_CONCURRENCY levels")
+    parser.add_argument("--latency", default="lognormal:0.3,0.5")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=100)
+    parser.add_argument("--rpm", type=float, default=0, help="LLM_RPM for the client-side limiter")
+    parser.add_argument("--json", type=Path, default=None, help="write results here")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch DATA_DIR for inspection")
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="bench_stage04_"))
+    server = MockOpenAIServer(latency=args.latency, rate_429=args.rate_429, rate_500=args.rate_500,
+                              retry_after_ms=args.retry_after_ms).start()
+    os.environ.update({
+        "DATA_DIR": str(scratch),
+        "PF_FLOW_DIR": str(REPO_ROOT / "flow"),
+        "PF_EXECUTOR": "inprocess",
+        "OPENAI_API_KEY": "sk-mock",
+        "AZURE_OPENAI_API_BASE": "unused",
+        "OPENAI_BASE_URL": server.base_url,
+        "LLM_OUTPUTS_HEAP": "",
+        "LLM_CACHE": "0",
+        "LLM_RPM": str(args.rpm),
+        "LLM_BACKOFF_BASE_S": "0.2",
+        "PG_DSN": os.getenv("BENCH_PG_DSN", "host=127.0.0.1 port=1 connect_timeout=1"),
+    })
+    # Imported after DATA_DIR is set: the stage resolves its paths at import
+    stage04 = importlib.import_module("apps.news_editorial.src.news_editorial.stage04_promptflow_run")
+
+    def prepare(digest_id: str, groups: int, level: int) -> None:
+        path = scratch / "digest_jsonls" / f"{digest_id}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(json.dumps(g, ensure_ascii=False) + "\n" for g in synthetic_groups(digest_id, groups)), encoding="utf-8")
+        os.environ.update({"DIGEST_AT": digest_id, "PF_CONCURRENCY": str(level), "LLM_CONCURRENCY": str(level)})
+
+    results = []
+    try:
+        # Untimed warm-up: the first run pays the openai import and the first connections
+        prepare("20241231T23", min(4, args.groups), 2)
+        stage04.run()
+        for hour, level in enumerate(int(s) for s in args.concurrency.split(",") if s.strip()):
+            digest_id = f"20250101T{hour:02d}"
+            prepare(digest_id, args.groups, level)
+
+            before = server.stats()["requests"]
+            started = time.perf_counter()
+            rc = stage04.run()
+            wall_s = time.perf_counter() - started
+            out = scratch / "pf_out" / f"pfout_{digest_id}.jsonl"
+            rows = sum(1 for _ in out.open(encoding="utf-8")) if out.exists() else 0
+            requests = server.stats()["requests"] - before
+            result = {
+                "groups": args.groups, "concurrency": level, "rc": rc, "rows": rows,
+                "wall_s": round(wall_s, 3), "groups_per_s": round(rows / wall_s, 2) if wall_s else None,
+                "requests": requests, "requests_per_group": round(requests / max(rows, 1), 2),
+            }
+            results.append(result)
+            print("[bench-stage04-llm] " + " ".join(f"{k}={v}" for k, v in result.items()), flush=True)
+            assert rc == 0 and rows == args.groups, f"stage 04 wrote {rows} rows for {args.groups} groups (rc={rc})"
+    finally:
+        server.stop()
+        if args.keep:
+            print(f"[bench-stage04-llm] scratch kept at {scratch}", flush=True)
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    summary = {"latency": args.latency, "rate_429": args.rate_429, "rate_500": args.rate_500, "server": server.stats(), "runs": results}
+    print(f"[bench-stage04-llm] server {json.dumps(summary['server'])}", flush=True)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
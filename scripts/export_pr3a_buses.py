@@ -5,11 +5,18 @@ import argparse
 import ast
 import csv
 import json
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from apps.news_acquire.src.news_acquire.master_ref_log import MasterRefLog
+from apps.news_acquire.src.news_acquire.tables import read_table_rows, table_path, table_paths
+
 try:
     from jsonschema import Draft202012Validator  # type: ignore
 except Exception:  # pragma: no cover - runtime fallback when dependency is absent
@@ -187,8 +194,14 @@ def _validate_rows(rows: list[dict[str, Any]], schema_path: Path) -> None:
 
 
 def _select_ref_source(data_dir: Path) -> tuple[str | None, list[dict[str, str]]]:
+    master_log = MasterRefLog(data_dir / "master_ref")
     master_ref = data_dir / "master_ref.csv"
     master_index = data_dir / "master_index.csv"
+    if not master_log.is_empty():
+        # stage02 delta log: base snapshot folded with the hourly segments
+        rows = master_log.read().to_dict("records")
+        if rows:
+            return str(master_log.root), rows
     if master_ref.exists() and master_ref.stat().st_size > 0:
         rows = _read_csv(master_ref)
         if rows:
@@ -205,8 +218,8 @@ def _latest_digest_map_by_index(data_dir: Path) -> dict[str, dict[str, str]]:
     digest_map_dir = data_dir / "digest_map"
     if not digest_map_dir.exists():
         return out
-    for csv_file in sorted(digest_map_dir.glob("*.csv")):
-        for row in _read_csv(csv_file):
+    for map_file in table_paths(digest_map_dir, "*"):
+        for row in read_table_rows(map_file):
             idx = str(row.get("index_id") or "").strip()
             if idx:
                 out[idx] = row
@@ -342,11 +355,11 @@ def _digest_rows_from_digest_jsonl(digest_jsonl: Path) -> list[dict[str, Any]]:
 
 
 def _digest_rows_from_digest_map(data_dir: Path, digest_at: str) -> list[dict[str, Any]]:
-    digest_map = data_dir / "digest_map" / f"{digest_at}.csv"
+    digest_map = table_path(data_dir / "digest_map" / digest_at)
     if not digest_map.exists() or digest_map.stat().st_size == 0:
         return []
     grouped: dict[tuple[str, str], list[dict[str, str]]] = {}
-    for row in _read_csv(digest_map):
+    for row in read_table_rows(digest_map):
         w = str(row.get("window_type") or "A").strip() or "A"
         topic = str(row.get("Topic") or "All Topics").strip() or "All Topics"
         grouped.setdefault((w, topic), []).append(row)
@@ -396,7 +409,7 @@ def export_news_digest_group(
         from_map = _digest_rows_from_digest_map(data_dir, digest_at)
         if from_map:
             out_rows = from_map
-            source = str(data_dir / "digest_map" / f"{digest_at}.csv")
+            source = str(table_path(data_dir / "digest_map" / digest_at))
 
     if not out_rows:
         return ExportResult(
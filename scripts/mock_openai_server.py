@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Local OpenAI-compatible chat-completions server for offline LLM-lane load tests.
+
+Implements the subset flow/llm_wrapper.py uses: ``POST /v1/chat/completions``
+(and the Azure ``/openai/deployments/<name>/chat/completions`` form) with a
+forced ``function_call``.  The answer is a canned instance of the requested
+function's JSON schema, so it validates and flows through stages 04-05 like a
+real one; integer ids are drawn from the ``ID <n>`` markers in the prompt.
+
+Latency and failures are configurable:
+
+    --latency fixed:0.2 | uniform:0.1,0.6 | exp:0.4 | lognormal:0.5,0.6
+              (lognormal: median seconds, sigma)
+    --rate-429 0.05 --retry-after-ms 200    throttled answers with Retry-After-ms
+    --rate-500 0.01                         server errors
+
+Outcomes are drawn from a seeded generator, so a run is reproducible for a
+given request order.  ``server.stats()`` reports request counts by status,
+peak concurrency and latency percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+_ID_RE = re.compile(r"\bID (\d+)")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler for a ``kind:args`` latency spec (seconds)."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"unknown latency spec {spec!r}")
+
+
+def canned_arguments(schema: Dict[str, Any], ids: List[int], rng: random.Random, name: str = "value") -> Any:
+    """An instance of ``schema`` (the subset our function schemas use); integers come from ``ids``."""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        props = schema.get("properties") or {}
+        return {key: canned_arguments(sub, ids, rng, key) for key, sub in props.items()}
+    if kind == "array":
+        count = max(int(schema.get("minItems", 0)), min(3, int(schema.get("maxItems", 3))))
+        return [canned_arguments(schema.get("items") or {}, ids, rng, name) for _ in range(count)]
+    if kind == "integer":
+        return rng.choice(ids) if ids else rng.randint(1, 1000)
+    if kind == "number":
+        return round(rng.uniform(0, 100), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return f"{name} {rng.randint(1, 99):02d}"
+
+
+def _completion(body: Dict[str, Any], arguments: Dict[str, Any], prompt_chars: int) -> Dict[str, Any]:
+    name = body["function_call"]["name"]
+    text = json.dumps(arguments, ensure_ascii=False)
+    message = {"role": "assistant", "content": None, "function_call": {"name": name, "arguments": text}}
+    prompt_tokens = prompt_chars // 4 + 1
+    completion_tokens = len(text) // 4 + 1
+    return {
+        "id": f"chatcmpl-mock-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": "function_call"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 rate_429: float = 0.0, rate_500: float = 0.0, retry_after_ms: int = 200, seed: int = 17):
+        super().__init__((host, port), _Handler)
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.retry_after_ms = retry_after_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def draw(self) -> tuple[str, float, random.Random]:
+        """(outcome, latency, per-request rng) under the lock, so the sequence is seeded."""
+        with self.lock:
+            roll = self.rng.random()
+            outcome = "429" if roll < self.rate_429 else "500" if roll < self.rate_429 + self.rate_500 else "200"
+            return outcome, max(0.0, self.sample_latency(self.rng)), random.Random(self.rng.getrandbits(64))
+
+    def record(self, status: int, latency: float) -> None:
+        with self.lock:
+            self.counts[str(status)] = self.counts.get(str(status), 0) + 1
+            if status == 200:
+                self.latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lat = sorted(self.latencies)
+            out: Dict[str, Any] = {
+                "requests": sum(self.counts.values()),
+                "by_status": dict(sorted(self.counts.items())),
+                "peak_in_flight": self.peak_in_flight,
+            }
+        if lat:
+            out.update({"p50_s": round(lat[len(lat) // 2], 4), "p95_s": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 4)})
+        return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockOpenAIServer
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    # Headers and body go out in separate writes; without this, Nagle plus the
+    # client's delayed ACK add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] | None = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        body_raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.split("?", 1)[0].endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"no route {self.path}", "type": "invalid_request_error"}})
+            return
+        try:
+            body = json.loads(body_raw)
+            name = body["function_call"]["name"]
+            schema = next(f for f in body["functions"] if f.get("name") == name)
+        except (ValueError, KeyError, TypeError, StopIteration):
+            self._send(400, {"error": {"message": "expected functions + function_call", "type": "invalid_request_error"}})
+            self.server.record(400, 0.0)
+            return
+
+        srv = self.server
+        outcome, latency, rng = srv.draw()
+        with srv.lock:
+            srv.in_flight += 1
+            srv.peak_in_flight = max(srv.peak_in_flight, srv.in_flight)
+        try:
+            time.sleep(latency)
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+        if outcome == "429":
+            srv.record(429, latency)
+            self._send(429, {"error": {"message": "Rate limit reached (mock)", "type": "requests"}},
+                       {"retry-after-ms": str(srv.retry_after_ms)})
+            return
+        if outcome == "500":
+            srv.record(500, latency)
+            self._send(500, {"error": {"message": "Internal error (mock)", "type": "server_error"}})
+            return
+        prompt = "\n".join(str(m.get("content") or "") for m in body.get("messages") or [])
+        ids = [int(v) for v in _ID_RE.findall(prompt)]
+        arguments = canned_arguments(schema.get("parameters") or {}, ids, rng)
+        srv.record(200, latency)
+        self._send(200, _completion(body, arguments, len(prompt)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:0.5,0.6")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.rate_429, args.rate_500, args.retry_after_ms, args.seed)
+    print(f"[mock-openai] serving on {server.base_url} (OPENAI_BASE_URL), any sk- key works", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[mock-openai] {json.dumps(server.stats())}", flush=True)
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,8 +10,14 @@ from __future__ import annotations
 import argparse
 import json
 import shutil
+import sys
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from apps.news_acquire.src.news_acquire.master_ref_log import MasterRefLog
+
 
 def copy_if_present(source: Path, destination: Path) -> None:
     if source.exists():
@@ -33,7 +39,14 @@ def promote_current_compaction(state_root: Path, repo_root: Path) -> None:
     manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
     if manifest.get("generation") != pointer.get("generation"):
         raise ValueError("compactor pointer/generation mismatch")
-    copy_if_present(generation / "master_ref.csv", repo_root / "data" / "master_ref.csv")
+    local_log = MasterRefLog(repo_root / "data" / "master_ref")
+    if not local_log.is_empty() and (generation / "master_ref.csv").exists():
+        # Local hours newer than the generation stay pending on top of it
+        lane_status = json.loads((generation / "lane_status.json").read_text(encoding="utf-8"))
+        local_log.replace_base(generation / "master_ref.csv", folded_through=lane_status.get("last_digest_at"))
+        local_log.export_csv(repo_root / "data" / "master_ref.csv")
+    else:
+        copy_if_present(generation / "master_ref.csv", repo_root / "data" / "master_ref.csv")
     copy_if_present(
         generation / "news_recent_refs.jsonl",
         repo_root / "storage" / "indexes" / "news_recent_refs_latest.jsonl",
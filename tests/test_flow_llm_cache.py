@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location("flow_llm_cache", Path(__file__).resolve().parents[1] / "flow" / "llm_cache.py")
+llm_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_cache)
+
+
+def _request(prompt: str, temperature: float = 0.4) -> dict:
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": prompt}],
+        "functions": [{"name": "parsed_message", "parameters": {"type": "object"}}],
+        "temperature": temperature,
+    }
+
+
+def test_identical_requests_hit_and_any_change_misses(tmp_path: Path) -> None:
+    cache = llm_cache.LLMCache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"answer": len(calls)}
+
+    key = llm_cache.request_key(_request("a"))
+    assert key == llm_cache.request_key(dict(reversed(list(_request("a").items()))))
+    assert cache.get_or_compute(key, compute) == ({"answer": 1}, False)
+    assert cache.get_or_compute(key, compute) == ({"answer": 1}, True)
+    # A new process reads the same entry
+    assert llm_cache.LLMCache(tmp_path).get(key) == (True, {"answer": 1})
+
+    assert llm_cache.request_key(_request("a", temperature=0.0)) != key
+    assert cache.get_or_compute(llm_cache.request_key(_request("b")), compute) == ({"answer": 2}, False)
+    assert cache.stats() == {"hits": 1, "misses": 2, "stores": 2, "expired": 0, "evicted": 0}
+
+
+def test_expired_entries_miss_and_size_cap_evicts_least_recent(tmp_path: Path) -> None:
+    cache = llm_cache.LLMCache(tmp_path, ttl_s=60)
+    cache.put("aa11", {"v": 1})
+    entry = cache.path("aa11")
+    stale = {**json.loads(entry.read_text(encoding="utf-8")), "created_at": time.time() - 120}
+    entry.write_text(json.dumps(stale), encoding="utf-8")
+    assert cache.get("aa11") == (False, None)
+    assert not entry.exists()
+
+    one = len(json.dumps({"schema": "llm_cache.v1", "created_at": time.time(), "value": {"v": "x" * 100}}))
+    capped = llm_cache.LLMCache(tmp_path / "capped", max_bytes=int(one * 3.5))
+    for i, key in enumerate(["k1", "k2", "k3"]):
+        capped.put(key, {"v": "x" * 100})
+        past = time.time() - 100 + i
+        os.utime(capped.path(key), (past, past))
+    assert capped.get("k1")[0]  # k1 becomes the most recently used
+    capped.put("k4", {"v": "x" * 100})
+    assert [capped.get(k)[0] for k in ["k1", "k2", "k3", "k4"]] == [True, False, True, True]
+    assert capped.stats()["evicted"] == 1
+
+
+def test_concurrent_lookups_of_one_key_compute_once(tmp_path: Path) -> None:
+    cache = llm_cache.LLMCache(tmp_path)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"ok": True}
+
+    def worker():
+        results.append(cache.get_or_compute("same", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False] + [True] * 7
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import importlib.util
+import threading
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location("flow_llm_limits", Path(__file__).resolve().parents[1] / "flow" / "llm_limits.py")
+llm_limits = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_limits)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}, "status_code": status_code})()
+
+
+def test_token_buckets_hold_calls_to_the_configured_rate() -> None:
+    clock = FakeClock()
+    throttle = llm_limits.LLMThrottle(rpm=60, tpm=600, sleep=clock.sleep, clock=clock)
+    for _ in range(120):
+        throttle.call(lambda: None, tokens=5)
+    # 60 requests of burst, then one per second
+    assert clock.now == pytest.approx(60.0)
+
+    clock.now += 120  # refill
+    throttle.call(lambda: None, tokens=600)
+    throttle.call(lambda: None, tokens=300)
+    # The token bucket is the binding one now: 300 tokens at 10/s
+    assert clock.now == pytest.approx(210.0)
+
+
+def test_retry_honours_retry_after_and_backs_off_everyone() -> None:
+    clock = FakeClock()
+    throttle = llm_limits.LLMThrottle(concurrency=8, attempts=4, sleep=clock.sleep, clock=clock)
+    outcomes = [HTTPError(429, {"retry-after": "2"}), HTTPError(503), "ok"]
+
+    def flaky():
+        out = outcomes.pop(0)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    assert throttle.call(flaky) == "ok"
+    assert 2.0 <= clock.now <= 2.4 + 2.0  # Retry-After (+20% jitter) then at most base*2 of jitter
+    stats = throttle.stats()
+    assert (stats["attempts"], stats["retries"], stats["throttled"], stats["failed"]) == (3, 2, 1, 0)
+    assert stats["concurrency_limit"] == pytest.approx(4.0 + 1 / 4)
+
+    with pytest.raises(HTTPError):
+        throttle.call(lambda: (_ for _ in ()).throw(HTTPError(400)))
+    assert throttle.stats()["failed"] == 1
+
+
+def test_retry_after_header_forms() -> None:
+    assert llm_limits.retry_after_s(HTTPError(429, {"retry-after-ms": "250", "retry-after": "9"})) == 0.25
+    assert llm_limits.retry_after_s(HTTPError(429, {"retry-after": "3"})) == 3.0
+    assert llm_limits.retry_after_s(HTTPError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert llm_limits.retry_after_s(HTTPError(500)) is None
+    assert not llm_limits.is_retryable(HTTPError(400))
+    assert llm_limits.is_retryable(type("APITimeoutError", (Exception,), {})())
+
+
+def test_aimd_caps_calls_in_flight() -> None:
+    aimd = llm_limits.AIMDController(initial=4, minimum=1, maximum=8, cooldown_s=0)
+    aimd.on_throttle()
+    assert aimd.limit == 2
+    peak = []
+    active = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def worker():
+        with aimd.slot():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            release.wait(1)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+    assert max(peak) <= 2
+
+    # +1 slot per window of `limit` successes: 2 -> 2.5 -> 2.9 -> 3.24
+    for _ in range(3):
+        aimd.on_success()
+    assert int(aimd.limit) == 3
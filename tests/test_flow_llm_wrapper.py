@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+FLOW_DIR = Path(__file__).resolve().parents[1] / "flow"
+
+
+@pytest.fixture
+def llm_wrapper(monkeypatch):
+    pytest.importorskip("openai")
+    pytest.importorskip("dotenv")
+    monkeypatch.syspath_prepend(str(FLOW_DIR))
+    spec = importlib.util.spec_from_file_location("flow_llm_wrapper", FLOW_DIR / "llm_wrapper.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("AZURE_OPENAI_API_BASE", "unused")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")
+    monkeypatch.setenv("LLM_OUTPUTS_HEAP", "")
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+    return module
+
+
+class FakeChatServer(ThreadingHTTPServer):
+    """Chat-completions endpoint that answers 429 to the first ``throttle`` requests."""
+
+    daemon_threads = True
+
+    def __init__(self, throttle: int):
+        super().__init__(("127.0.0.1", 0), FakeChatHandler)
+        self.throttle = throttle
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            throttled = self.server.requests <= self.server.throttle
+        if throttled:
+            payload, status, headers = {"error": {"message": "Rate limit reached", "type": "requests"}}, 429, {"retry-after-ms": "50"}
+        else:
+            name = body["function_call"]["name"]
+            message = {"role": "assistant", "content": None, "function_call": {"name": name, "arguments": json.dumps({"echo": body["messages"][-1]["content"]})}}
+            payload = {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": message, "finish_reason": "function_call"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+            status, headers = 200, {}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def test_schema_is_parsed_once_per_file_version(llm_wrapper, tmp_path: Path) -> None:
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps({"name": "parsed_message", "v": 1}), encoding="utf-8")
+    first = llm_wrapper.load_schema(str(path))
+    assert llm_wrapper.load_schema(str(path)) is first
+
+    path.write_text(json.dumps({"name": "parsed_message", "v": 2}), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert llm_wrapper.load_schema(str(path))["v"] == 2
+
+
+def test_threads_share_one_client_per_connection_config(llm_wrapper, monkeypatch) -> None:
+    monkeypatch.setenv("LLM_TIMEOUT_S", "30")
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(llm_wrapper.get_client())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 1
+    assert clients[0].timeout.read == 30
+    assert clients[0].timeout.connect == 10
+    assert clients[0].max_retries == 0
+
+    monkeypatch.setenv("LLM_TIMEOUT_S", "5")
+    other = llm_wrapper.get_client()
+    assert other is not clients[0]
+    assert other.timeout.read == 5
+
+
+def test_injected_429s_are_retried_without_failing_lines(llm_wrapper, monkeypatch, tmp_path: Path) -> None:
+    server = FakeChatServer(throttle=4)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("LLM_CONCURRENCY", "4")
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps({"name": "parsed_message", "parameters": {"type": "object"}}), encoding="utf-8")
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(
+                lambda i: llm_wrapper.run_llm_schema_tool(prompt=f"group {i}", deployment_name="gpt-4o-mini", schema_path=str(schema)),
+                range(6),
+            ))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert results == [{"echo": f"group {i}"} for i in range(6)]
+    assert server.requests == 6 + 4
+    stats = llm_wrapper.flow_stats()["llm_limits"]
+    assert (stats["calls"], stats["throttled"], stats["failed"]) == (6, 4, 0)
+    # Halved once for the burst (4 -> 2), then grown back by the 6 successes; ~5.3 without the cut
+    assert stats["concurrency_limit"] < 5
+
+
+def test_heap_appends_whole_lines_across_threads(llm_wrapper, monkeypatch, tmp_path: Path) -> None:
+    server = FakeChatServer(throttle=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("LLM_OUTPUTS_HEAP", str(tmp_path / "heap" / "outputs.jsonl"))
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps({"name": "parsed_message", "parameters": {"type": "object"}}), encoding="utf-8")
+    heap = tmp_path / "heap" / "outputs.jsonl"
+
+    def run(i: int) -> dict:
+        return llm_wrapper.run_llm_schema_tool(prompt=f"group {i} " + "x" * 4096, deployment_name="gpt-4o-mini", schema_path=str(schema))
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(run, range(32)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    lines = heap.read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["echo"].split(" ")[1] for line in lines) == sorted(str(i) for i in range(32))
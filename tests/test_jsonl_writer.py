@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from apps.news_acquire.src.news_acquire import io as acquire_io
+from apps.news_editorial.src.news_editorial import io as editorial_io
+from apps.news_enrich.src.news_enrich import io as enrich_io
+
+
+@pytest.fixture(params=[acquire_io, editorial_io, enrich_io], ids=["acquire", "editorial", "enrich"])
+def bio(request):
+    return request.param
+
+
+def _read(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_replace_mode_publishes_atomically_on_clean_exit(tmp_path: Path, bio) -> None:
+    out = tmp_path / "nested" / "out.jsonl"
+    out.parent.mkdir()
+    out.write_text('{"old": true}\n', encoding="utf-8")
+
+    with bio.JsonlWriter(out, batch_size=2, fsync=True) as writer:
+        writer.write_many({"n": n, "s": "ñ"} for n in range(5))
+        assert _read(out) == [{"old": True}]
+
+    assert _read(out) == [{"n": n, "s": "ñ"} for n in range(5)]
+    assert writer.count == 5
+    assert [p.name for p in out.parent.iterdir()] == ["out.jsonl"]
+
+
+def test_replace_mode_leaves_target_untouched_on_error(tmp_path: Path, bio) -> None:
+    out = tmp_path / "out.jsonl"
+    out.write_text('{"old": true}\n', encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with bio.JsonlWriter(out) as writer:
+            writer.write({"new": True})
+            raise RuntimeError("boom")
+
+    assert _read(out) == [{"old": True}]
+    assert [p.name for p in tmp_path.iterdir()] == ["out.jsonl"]
+
+
+def test_append_mode_is_lazy_and_keeps_records_on_error(tmp_path: Path, bio) -> None:
+    quarantine = tmp_path / "q" / "V01_run.jsonl"
+
+    with bio.JsonlWriter(quarantine, append=True):
+        pass
+    assert not quarantine.exists()
+
+    bio.append_jsonl(quarantine, {"n": 0})
+    with pytest.raises(RuntimeError):
+        with bio.JsonlWriter(quarantine, append=True) as writer:
+            writer.write({"n": 1})
+            raise RuntimeError("boom")
+
+    assert _read(quarantine) == [{"n": 0}, {"n": 1}]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import random
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+from jsonschema import validate
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from mock_openai_server import MockOpenAIServer, canned_arguments
+
+
+def _post(url: str, body: dict) -> tuple[int, dict, dict]:
+    req = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, dict(resp.headers), json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+@pytest.mark.parametrize("schema_file", ["01_parse_and_cluster_articles.json", "02_generate_agenda_and_ideas.json"])
+def test_canned_arguments_match_the_flow_schemas(schema_file: str) -> None:
+    schema = json.loads((ROOT / "flow" / schema_file).read_text(encoding="utf-8"))["parameters"]
+    args = canned_arguments(schema, [101, 102], random.Random(1))
+    validate(args, schema)
+    ints = [v for item in next(iter(args.values())) for v in item.values() if isinstance(v, list) and v and isinstance(v[0], int)]
+    assert ints and all(i in (101, 102) for ids in ints for i in ids)
+
+
+def test_server_answers_function_calls_and_injects_errors() -> None:
+    server = MockOpenAIServer(rate_429=0.5, retry_after_ms=75, seed=3).start()
+    schema = json.loads((ROOT / "flow" / "02_generate_agenda_and_ideas.json").read_text(encoding="utf-8"))
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": "- **ID 7** — Titular"}],
+        "functions": [schema],
+        "function_call": {"name": "parsed_message"},
+    }
+    try:
+        answers = [_post(f"{server.base_url}/chat/completions", body) for _ in range(20)]
+        bad = _post(f"{server.base_url}/chat/completions", {"model": "x", "messages": []})
+    finally:
+        server.stop()
+
+    ok = [payload for status, _, payload in answers if status == 200]
+    throttled = [headers for status, headers, _ in answers if status == 429]
+    assert ok and throttled and len(ok) + len(throttled) == 20
+    assert all(h.get("retry-after-ms") == "75" for h in throttled)
+    call = ok[0]["choices"][0]["message"]["function_call"]
+    assert call["name"] == "parsed_message"
+    validate(json.loads(call["arguments"]), schema["parameters"])
+    assert bad[0] == 400
+    assert server.stats()["by_status"] == {"200": len(ok), "400": 1, "429": len(throttled)}
+
+
+def test_benchmark_drives_stage04_through_the_mock(tmp_path: Path) -> None:
+    for module in ("openai", "dotenv", "jinja2"):
+        pytest.importorskip(module)
+    out = tmp_path / "bench.json"
+    proc = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "bench_stage04_llm.py"), "--groups", "6", "--concurrency", "1,4",
+         "--latency", "fixed:0", "--rate-429", "0.2", "--json", str(out)],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    summary = json.loads(out.read_text(encoding="utf-8"))
+    assert [(r["concurrency"], r["rows"], r["rc"]) for r in summary["runs"]] == [(1, 6, 0), (4, 6, 0)]
+    assert summary["server"]["by_status"].get("429", 0) > 0
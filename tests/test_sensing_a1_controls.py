@@ -126,14 +126,103 @@ def test_enqueue_can_run_without_artifact_writes(tmp_path: Path, monkeypatch) ->
             ]
         ),
     )
-    monkeypatch.setattr(stage01.db, "push_work", lambda *args: queued.append(args))
+    monkeypatch.setattr(
+        stage01.db, "push_work_many", lambda stage, items: queued.append((stage, list(items))) or (1, 0)
+    )
 
     assert stage01.run() == 0
     assert len(queued) == 1
     assert queued[0][0] == "scrape"
+    assert [key for key, _payload in queued[0][1]] == [stage01.ids.stable_index_id("headline", "source", "https://example.test/article")]
     assert not data_dir.exists()
 
 
+def test_push_work_many_uses_one_statement_and_reports_skips(monkeypatch) -> None:
+    from apps.news_acquire.src.news_acquire import db
+
+    calls: list[tuple] = []
+
+    class FakeConn:
+        rowcount = 1
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def cursor(self):
+            return self
+
+        def execute(self, sql, params):
+            calls.append((sql, params))
+
+    monkeypatch.setattr(db, "get_conn", lambda: FakeConn())
+
+    inserted, skipped = db.push_work_many("scrape", [("a", {"n": 1}), ("b", {"n": 2}), ("a", {"n": 3})])
+
+    assert (inserted, skipped) == (1, 2)
+    assert len(calls) == 1
+    assert calls[0][1][1] == ["a", "b"]
+    assert calls[0][1][2] == ['{"n": 1}', '{"n": 2}']
+    assert db.push_work_many("scrape", []) == (0, 0)
+
+
+def test_upsert_master_ref_copies_folded_rows_then_merges_once(monkeypatch) -> None:
+    from apps.news_acquire.src.news_acquire import db
+
+    statements: list[str] = []
+    copied: list[tuple] = []
+
+    class FakeCopy:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def write_row(self, row):
+            copied.append(row)
+
+    class FakeConn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def cursor(self):
+            return self
+
+        def execute(self, sql, params=None):
+            statements.append(sql)
+
+        def copy(self, sql):
+            statements.append(sql)
+            return FakeCopy()
+
+        def commit(self):
+            pass
+
+    monkeypatch.setattr(db, "get_conn", lambda: FakeConn())
+    row = {"source": "s", "link": "l", "first_seen": 1, "last_seen": 2, "topics": ["a"], "meta": {"k": 1}}
+
+    written = db.upsert_master_ref(
+        [
+            {**row, "index_id": "x"},
+            {**row, "index_id": "y"},
+            {**row, "index_id": "x", "source": "other", "last_seen": 5, "topics": ["b", "a"], "meta": {"k": 2, "j": 3}},
+        ]
+    )
+
+    assert written == 2
+    assert len(statements) == 3
+    assert statements[1].startswith("copy master_ref_stage")
+    assert "on conflict (index_id)" in statements[2]
+    assert copied == [("x", "s", "l", 1, 5, ["a", "b"], '{"k": 2, "j": 3}'), ("y", "s", "l", 1, 2, ["a"], '{"k": 1}')]
+    assert db.upsert_master_ref([]) == 0
+
+
 def test_enabled_db_bookkeeping_error_is_not_suppressed(monkeypatch) -> None:
     monkeypatch.setenv("DIGEST_AT", "20250101T00")
     monkeypatch.setenv("ACQUIRE_NETWORK", "0")
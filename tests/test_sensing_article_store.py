@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from apps.news_acquire.src.news_acquire.article_store import ArticleStore
+
+
+ANCHOR = datetime(2025, 1, 14, 12, tzinfo=timezone.utc)
+
+
+def _articles(*rows: tuple[str, datetime]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "uid": [f"u{i}" for i, _ in rows],
+            "Topic": ["economia"] * len(rows),
+            "Title": [f"title {i}" for i, _ in rows],
+            "Link": [f"https://example.test/{i}" for i, _ in rows],
+            "Published": pd.to_datetime([ts for _, ts in rows], utc=True),
+            "Source": ["Infobae"] * len(rows),
+            "index_id": [f"id{i}" for i, _ in rows],
+        }
+    )
+
+
+def test_append_partitions_by_hour_and_is_idempotent(tmp_path) -> None:
+    store = ArticleStore(tmp_path / "articles")
+    df = _articles(("a", ANCHOR - timedelta(minutes=30)), ("b", ANCHOR - timedelta(hours=30)))
+
+    assert store.append(df) == 2
+    assert store.append(df) == 0
+    assert store.partition_path(ANCHOR - timedelta(minutes=30)) == tmp_path / "articles/2025/01/14/11.csv"
+    assert sorted(p.name for p in (tmp_path / "articles").rglob("*.csv")) == ["06.csv", "11.csv"]
+
+
+def test_read_range_is_half_open_and_typed(tmp_path) -> None:
+    store = ArticleStore(tmp_path / "articles")
+    store.append(
+        _articles(
+            ("late", ANCHOR - timedelta(minutes=1)),
+            ("edge", ANCHOR - timedelta(hours=2)),
+            ("out", ANCHOR),
+        )
+    )
+
+    df = store.read_range(ANCHOR - timedelta(hours=2), ANCHOR)
+
+    assert df["index_id"].tolist() == ["idedge", "idlate"]
+    assert str(df["Published"].dtype) == "datetime64[ns, UTC]"
+    assert df.loc[0, "Published"] == pd.Timestamp(ANCHOR - timedelta(hours=2))
+
+
+def test_prune_drops_days_before_cutoff(tmp_path) -> None:
+    store = ArticleStore(tmp_path / "articles")
+    store.append(_articles(("old", ANCHOR - timedelta(days=50)), ("new", ANCHOR - timedelta(days=1))))
+
+    assert store.prune(ANCHOR - timedelta(days=46)) == 1
+    assert store.read_range(ANCHOR - timedelta(days=60), ANCHOR)["index_id"].tolist() == ["idnew"]
+
+
+def test_topics_persist_and_widen_when_an_article_returns_under_another_topic(tmp_path) -> None:
+    store = ArticleStore(tmp_path / "articles")
+    # A partition written before the store kept topics
+    legacy = store.partition_path(ANCHOR - timedelta(hours=3))
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(
+        "index_id,uid,Topic,Title,Link,Published,Source\n"
+        "idold,uold,economia,title old,https://example.test/old,2025-01-14T09:10:00+00:00,Infobae\n",
+        encoding="utf-8",
+    )
+    first = _articles(("a", ANCHOR - timedelta(minutes=30))).assign(topics='["economia"]')
+    store.append(first)
+    again = first.assign(Topic="politica", topics='["politica", "deportes"]')
+
+    assert store.append(again) == 0
+    df = store.read_range(ANCHOR - timedelta(hours=4), ANCHOR).set_index("index_id")
+    assert df.loc["ida", "Topic"] == "economia"
+    assert df.loc["ida", "topics"] == '["economia", "deportes", "politica"]'
+    assert df.loc["idold", "topics"] == '["economia"]'
@@ -4,10 +4,12 @@ import csv
 import json
 from pathlib import Path
 
+import pandas as pd
 import pytest
 
 from apps.news_acquire.src.news_acquire.compactor import plan_compaction, publish_compaction
-from apps.news_acquire.src.news_acquire.run_bundle import StageResult, finalize_bundle
+from apps.news_acquire.src.news_acquire.master_ref_log import MasterRefLog
+from apps.news_acquire.src.news_acquire.run_bundle import StageResult, _link_tree_contents, finalize_bundle
 from scripts.promote_sensing_bundle_local import promote_current_compaction
 
 
@@ -225,3 +227,55 @@ def test_legacy_mirror_can_only_copy_compactor_selected_generation(tmp_path: Pat
     assert json.loads(
         (legacy / "storage" / "indexes" / "news_recent_refs_latest.jsonl").read_text()
     )["index_id"] == "selected"
+
+
+def test_log_bundle_delta_is_folded_onto_its_base_and_promotion_keeps_base_rows(tmp_path: Path) -> None:
+    local_log = MasterRefLog(tmp_path / "legacy" / "data" / "master_ref")
+    seed = tmp_path / "seed.csv"
+    seed.write_text(
+        "index_id,source,link,first_seen,last_seen,topics,meta\n"
+        'a,Clarín,https://x/a,2026-07-28 23:00:00+00:00,2026-07-28 23:00:00+00:00,"[""Economía""]",{}\n'
+        "b,Infobae,https://x/b,2026-07-28 23:00:00+00:00,2026-07-28 23:00:00+00:00,[],{}\n",
+        encoding="utf-8",
+    )
+    assert local_log.seed(seed)
+
+    digest = "20260729T00"
+    work = tmp_path / "fixtures" / "log"
+    _link_tree_contents(local_log.root, work / "input_snapshot" / "master_ref")
+    (work / "input_snapshot" / "master_ref_state.json").write_text(json.dumps(local_log.state()) + "\n")
+    deltas = work / "data" / "master_ref" / "deltas"
+    deltas.mkdir(parents=True)
+    (deltas / f"{digest}.csv").write_text(
+        "index_id,source,link,first_seen,last_seen,topics,meta\n"
+        "a,,https://x/a2,2026-07-29 00:10:00+00:00,2026-07-29 00:10:00+00:00,[],{}\n"
+        "c,Perfil,https://x/c,2026-07-29 00:10:00+00:00,2026-07-29 00:10:00+00:00,[],{}\n",
+        encoding="utf-8",
+    )
+    indexes = work / "storage" / "indexes"
+    indexes.mkdir(parents=True)
+    (indexes / "news_recent_refs_latest.jsonl").write_text('{"index_id": "c"}\n', encoding="utf-8")
+    (indexes / "news_recent_groups_latest.jsonl").write_text('{"topic": "c"}\n', encoding="utf-8")
+    feed = work / "feed.yaml"
+    feed.write_text("schema_version: sensing_feeds.v1\nfeeds: []\n", encoding="utf-8")
+    stage = StageResult("fixture", ["fixture"], 0, "2026-07-29T00:00:00Z", "2026-07-29T00:00:01Z", "", "")
+    bundle = finalize_bundle(
+        run_root=tmp_path, run_id=f"sensing:{digest}:attempt:1:log", digest_at=digest, attempt=1,
+        work_root=work, feed_config=feed, stage_results=[stage], started_at="2026-07-29T00:00:00Z",
+        source_commit="fixture",
+    )
+    # A local hour the generation does not cover yet
+    local_log.append_delta("20260729T01", pd.DataFrame(
+        {"index_id": ["d"], "source": ["Ámbito"], "link": ["https://x/d"],
+         "first_seen": [pd.Timestamp("2026-07-29T01:00:00Z")], "last_seen": [pd.Timestamp("2026-07-29T01:00:00Z")]}
+    ))
+
+    generation = publish_compaction(tmp_path, tmp_path / "state", paths=[bundle])
+    master = {item["index_id"]: item for item in read_master(generation)}
+    assert sorted(master) == ["a", "b", "c"]
+    assert (master["a"]["source"], master["a"]["link"], master["a"]["topics"]) == ("Clarín", "https://x/a2", '["Economía"]')
+    assert (master["a"]["first_seen"], master["a"]["last_seen"]) == ("2026-07-28 23:00:00+00:00", "2026-07-29 00:10:00+00:00")
+
+    promote_current_compaction(tmp_path / "state", tmp_path / "legacy")
+    assert local_log.read()["index_id"].tolist() == ["a", "b", "c", "d"]
+    assert [item["index_id"] for item in read_master(tmp_path / "legacy" / "data")] == ["a", "b", "c", "d"]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+import types
+
+import requests
+
+from apps.news_acquire.src.news_acquire import feed_fetch
+from apps.news_acquire.src.news_acquire.feed_cache import FeedCache
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: bytes, delay: float = 0.0, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.headers = {"content-type": "application/rss+xml", **(headers or {})}
+        self._body = body
+        self._delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def iter_content(self, _size):
+        time.sleep(self._delay)
+        yield self._body
+
+
+class FakeSession:
+    def __init__(self, routes: dict[str, object]) -> None:
+        self.routes = routes
+        self.active = 0
+        self.peak = 0
+        self.sent_headers: list[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout, stream, headers=None):
+        self.sent_headers.append(dict(headers or {}))
+        route = self.routes[url]
+        if callable(route):
+            route = route(headers or {})
+        if isinstance(route, Exception):
+            raise route
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.05)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return route
+
+
+def _fake_parse(body, response_headers=None):
+    titles = body.decode("utf-8").split(",") if body else []
+    return types.SimpleNamespace(entries=[types.SimpleNamespace(title=t) for t in titles])
+
+
+def test_results_follow_feed_order_and_record_outcomes(monkeypatch) -> None:
+    monkeypatch.setattr(feed_fetch, "feedparser", types.SimpleNamespace(parse=_fake_parse))
+    feeds = {
+        "slow": "https://feeds.test/slow",
+        "fast": "https://feeds.test/fast",
+        "gone": "https://feeds.test/gone",
+        "down": "https://feeds.test/down",
+    }
+    session = FakeSession(
+        {
+            feeds["slow"]: FakeResponse(200, b"a,b", delay=0.1),
+            feeds["fast"]: FakeResponse(200, b"c"),
+            feeds["gone"]: FakeResponse(404, b""),
+            feeds["down"]: requests.ConnectionError("refused"),
+        }
+    )
+
+    results = feed_fetch.fetch_feeds(feeds, max_workers=4, timeout=5, session=session)
+
+    assert [r.topic for r in results] == ["slow", "fast", "gone", "down"]
+    assert [len(r.entries) for r in results] == [2, 1, 0, 0]
+    assert [r.outcome.status for r in results] == ["ok", "ok", "http_error", "error"]
+    assert results[2].outcome.http_status == 404
+    assert session.peak > 1
+
+
+def test_slow_body_is_cut_at_the_feed_deadline(monkeypatch) -> None:
+    monkeypatch.setattr(feed_fetch, "feedparser", types.SimpleNamespace(parse=_fake_parse))
+    feeds = {"stuck": "https://feeds.test/stuck"}
+    session = FakeSession({feeds["stuck"]: FakeResponse(200, b"late", delay=0.2)})
+
+    [result] = feed_fetch.fetch_feeds(feeds, timeout=0.1, session=session)
+
+    assert result.entries == []
+    assert result.outcome.status == "timeout"
+
+
+def test_wall_time_is_bounded_by_the_slowest_feed(monkeypatch) -> None:
+    monkeypatch.setattr(feed_fetch, "feedparser", types.SimpleNamespace(parse=_fake_parse))
+    feeds = {f"t{i}": f"https://feeds.test/{i}" for i in range(8)}
+    session = FakeSession({url: FakeResponse(200, b"x", delay=0.1) for url in feeds.values()})
+
+    started = time.monotonic()
+    feed_fetch.fetch_feeds(feeds, max_workers=8, timeout=5, session=session)
+
+    assert time.monotonic() - started < 0.8
+
+
+def test_conditional_get_reuses_cached_entries_on_304(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(feed_fetch, "feedparser", types.SimpleNamespace(parse=_fake_parse))
+    feeds = {"topic": "https://feeds.test/topic"}
+    cache = FeedCache(tmp_path / "feed_cache")
+
+    def origin(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304, b"")
+        return FakeResponse(200, b"a,b", headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+    session = FakeSession({feeds["topic"]: origin})
+
+    [first] = feed_fetch.fetch_feeds(feeds, session=session, cache=cache)
+    [second] = feed_fetch.fetch_feeds(feeds, session=session, cache=cache)
+
+    assert first.outcome.cache == "miss"
+    assert second.outcome.cache == "hit"
+    assert second.outcome.http_status == 304
+    assert second.entries == first.entries
+    assert [e["title"] for e in second.entries] == ["a", "b"]
+    assert session.sent_headers[1]["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_response_without_validators_is_not_cached(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(feed_fetch, "feedparser", types.SimpleNamespace(parse=_fake_parse))
+    feeds = {"topic": "https://feeds.test/topic"}
+    cache = FeedCache(tmp_path / "feed_cache")
+    session = FakeSession({feeds["topic"]: lambda _h: FakeResponse(200, b"a")})
+
+    feed_fetch.fetch_feeds(feeds, session=session, cache=cache)
+    [again] = feed_fetch.fetch_feeds(feeds, session=session, cache=cache)
+
+    assert again.outcome.cache == "miss"
+    assert session.sent_headers[1] == {}
+    assert cache.load(feeds["topic"]) is None
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import numpy as np
+
+from apps.news_acquire.src.news_acquire.headline_clusters import cluster_labels, minhash_signatures, normalize_titles
+
+
+TITLES = [
+    "Milei anunció un nuevo paquete de medidas económicas",
+    "El dólar blue cerró en alza",
+    "Milei anuncio un nuevo paquete de medidas economicas - Infobae",
+    "River venció a Boca en el Monumental",
+    "El dólar blue cerró en alza, hoy",
+    "",
+    "Milei anunció nuevo paquete de medidas económicas",
+    "",
+]
+
+
+def test_near_duplicates_share_a_label_numbered_by_first_appearance() -> None:
+    assert normalize_titles(["  Dólar BLUE: cerró  en alza! "]) == ["dolar blue cerro en alza"]
+    assert cluster_labels(TITLES).tolist() == [0, 1, 0, 2, 1, 3, 0, 4]
+
+
+def test_clustering_is_reproducible() -> None:
+    sig = minhash_signatures(normalize_titles(TITLES))
+    assert sig.shape == (len(TITLES), 64)
+    np.testing.assert_array_equal(sig, minhash_signatures(normalize_titles(TITLES)))
+    assert cluster_labels(TITLES, threshold=0.99).tolist() == list(range(len(TITLES)))
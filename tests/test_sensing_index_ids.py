@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from apps.news_acquire.src.news_acquire import ids
+
+
+def test_batch_index_ids_match_scalar_ids() -> None:
+    titles = ["Dólar hoy", "  Dólar   hoy ", "Ｆｕｌｌ ｗｉｄｔｈ", "Inflación\tde enero", "", "Dólar hoy"]
+    sources = ["Infobae", "Infobae", "La Nación", " Ámbito  Financiero", "N/A", "Clarín"]
+    urls = ["https://Ex.com/a ", "https://ex.com/a", "https://ex.com/b", "", "https://ex.com/c", "https://Ex.com/a "]
+
+    expected = [ids.stable_index_id(t, s, u) for t, s, u in zip(titles, sources, urls)]
+
+    assert ids.stable_index_ids(titles, sources, urls) == expected
+
+
+def test_batch_index_ids_reuse_the_shared_memo() -> None:
+    memo: dict = {}
+    first = ids.stable_index_ids(["a", "b"], ["s", "s"], ["u1", "u2"], memo=memo)
+    memo[("a", "s", "u1")] = "SENTINEL00"
+
+    again = ids.stable_index_ids(["a"], ["s"], ["u1"], memo=memo)
+
+    assert first == [ids.stable_index_id("a", "s", "u1"), ids.stable_index_id("b", "s", "u2")]
+    assert again == ["SENTINEL00"]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pandas as pd
+
+from apps.news_acquire.src.news_acquire.master_ref_log import MASTER_COLUMNS, MasterRefLog
+
+
+def _stats(*rows: tuple[str, str, str, str, str]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["index_id", "source", "link", "first_seen", "last_seen"])
+    for col in ("first_seen", "last_seen"):
+        df[col] = pd.to_datetime(df[col], utc=True)
+    return df
+
+
+HOURS = {
+    "20250114T10": _stats(("b", "Infobae", "https://x/b", "2025-01-14T10:00:00Z", "2025-01-14T10:30:00Z")),
+    "20250114T11": _stats(
+        ("b", "", "https://x/b2", "2025-01-14T09:00:00Z", "2025-01-14T10:10:00Z"),
+        ("a", "Clarín", "https://x/a", "2025-01-14T11:00:00Z", "2025-01-14T11:00:00Z"),
+    ),
+    "20250114T12": _stats(("a", "La Nación", "", "2025-01-14T11:30:00Z", "2025-01-14T12:15:00Z")),
+}
+
+
+def test_read_folds_deltas_like_the_full_merge_and_compaction_keeps_the_result(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+    monkeypatch.setattr(stage02, "MASTER_REF_CSV", tmp_path / "merged.csv")
+    log = MasterRefLog(tmp_path / "master_ref")
+    for digest_id, stats in HOURS.items():
+        log.append_delta(digest_id, stats)
+        stage02.write_master_ref_csv(stage02.merge_master_ref(stage02.load_master_ref_csv(), stats), null_sink=False)
+    log.export_csv(tmp_path / "log.csv")
+
+    assert (tmp_path / "log.csv").read_text() == (tmp_path / "merged.csv").read_text()
+    before = log.read()
+    assert list(before.columns) == MASTER_COLUMNS
+    assert before.set_index("index_id").loc["b", "source"] == "Infobae"
+
+    assert log.compact() == 3
+    assert log.delta_paths() == []
+    assert json.loads(log.base_meta_path.read_text())["folded"] == list(HOURS)
+    pd.testing.assert_frame_equal(log.read(), before)
+
+
+def test_each_hour_writes_only_its_own_segment(tmp_path: Path) -> None:
+    log = MasterRefLog(tmp_path / "master_ref")
+    for digest_id, stats in HOURS.items():
+        log.append_delta(digest_id, stats)
+    log.compact()
+    base_bytes = log.base_path.read_bytes()
+    assert log.pending_ratio() == 0.0
+
+    segment = log.append_delta("20250114T13", _stats(("c", "Perfil", "https://x/c", "2025-01-14T13:00:00Z", "2025-01-14T13:00:00Z")))
+
+    assert log.base_path.read_bytes() == base_bytes
+    assert len(segment.read_text().splitlines()) == 2
+    assert log.read()["index_id"].tolist() == ["a", "b", "c"]
+    assert list(log.state()["deltas"]) == ["20250114T13"]
+    assert log.pending_ratio() == segment.stat().st_size / len(base_bytes)
+
+
+def test_seed_and_replace_base_from_full_csv(tmp_path: Path) -> None:
+    csv_path = tmp_path / "master_ref.csv"
+    csv_path.write_text(
+        "index_id,source,link,first_seen,last_seen,topics,meta\n"
+        "a,Clarín,https://x/a,2025-01-14 11:00:00+00:00,2025-01-14 11:00:00+00:00,[],{}\n",
+        encoding="utf-8",
+    )
+    log = MasterRefLog(tmp_path / "master_ref")
+
+    assert log.seed(csv_path)
+    assert not log.seed(csv_path)
+    log.append_delta("20250114T12", HOURS["20250114T12"])
+    assert log.read().loc[0, "last_seen"] == "2025-01-14 12:15:00+00:00"
+
+    log.append_delta("20250114T13", _stats(("c", "Perfil", "https://x/c", "2025-01-14T13:00:00Z", "2025-01-14T13:00:00Z")))
+    log.replace_base(csv_path, folded_through="20250114T12")
+    assert [p.stem for p in log.delta_paths()] == ["20250114T13"]
+    assert log.read()["index_id"].tolist() == ["a", "c"]
+    assert log.read().loc[0, "last_seen"] == "2025-01-14 11:00:00+00:00"
+
+    log.replace_base(csv_path)
+    assert log.delta_paths() == []
+    assert log.read()["index_id"].tolist() == ["a"]
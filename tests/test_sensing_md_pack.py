@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+from apps.news_acquire.src.news_acquire.md_pack import pack_paths, read_group_markdown
+
+DIGEST_MAP = (
+    "digest_file,window_type,article_id,Title,Source,Link,Published,Topic\n"
+    + "".join(f"d,1h_window,{i},Título {i},s,l,2025-01-14 09:{i:02d}:00+00:00,{'Economía' if i % 2 else 'Política'}\n" for i in range(1, 9))
+)
+
+
+def _run_stage03(tmp_path: Path, monkeypatch, pack: bool) -> list[dict]:
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage03 = importlib.import_module("apps.news_acquire.src.news_acquire.stage03_headlines_digests")
+    for name, path in {
+        "DATA_DIR": tmp_path,
+        "DIGEST_MAP_DIR": tmp_path / "digest_map",
+        "OUT_JSONL_DIR": tmp_path / "digest_jsonls",
+        "OUT_MD_DIR": tmp_path / "output_digests",
+        "QUAR_DIR": tmp_path / "quarantine",
+    }.items():
+        monkeypatch.setattr(stage03, name, path)
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    monkeypatch.setenv("DB_RUN_BOOKKEEPING", "0")
+    monkeypatch.setenv("WRITE_ARTIFACTS", "1")
+    monkeypatch.setenv("MD_MIRROR_PACK", "1" if pack else "0")
+    monkeypatch.setenv("GROUP_MAX_ROWS", "2")
+    monkeypatch.setenv("GROUP_MIN_ROWS", "1")
+    (tmp_path / "digest_map").mkdir(parents=True)
+    (tmp_path / "digest_map" / "20250114T10.csv").write_text(DIGEST_MAP, encoding="utf-8")
+    assert stage03.run() == 0
+    return [json.loads(line) for line in (tmp_path / "digest_jsonls" / "20250114T10.jsonl").read_text().splitlines()]
+
+
+def test_packed_mirror_is_two_files_and_reads_back_every_group(tmp_path: Path, monkeypatch) -> None:
+    loose_records = _run_stage03(tmp_path / "loose", monkeypatch, pack=False)
+    records = _run_stage03(tmp_path / "packed", monkeypatch, pack=True)
+    md_dir = tmp_path / "packed" / "output_digests"
+
+    assert records == loose_records
+    assert len(records) == 4
+    assert sorted(p.relative_to(md_dir).as_posix() for p in md_dir.rglob("*") if p.is_file()) == [
+        "packed/20250114T10.index.json",
+        "packed/20250114T10.md",
+    ]
+    index = json.loads(pack_paths(md_dir, "20250114T10")[1].read_text())["groups"]
+    for rec in records:
+        assert read_group_markdown(md_dir, rec["digest_group_id"]) == rec["content"]
+        loose_file = tmp_path / "loose" / "output_digests" / index[rec["digest_group_id"]]["file"]
+        assert loose_file.read_text(encoding="utf-8") == rec["content"]
+
+
+def test_reader_falls_back_to_loose_files(tmp_path: Path, monkeypatch) -> None:
+    records = _run_stage03(tmp_path, monkeypatch, pack=False)
+    md_dir = tmp_path / "output_digests"
+
+    assert read_group_markdown(md_dir, records[0]["digest_group_id"]) == records[0]["content"]
+    assert read_group_markdown(md_dir, "20250114T10::1h_window::Nada::01") is None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import shutil
 from pathlib import Path
 
 import pytest
@@ -100,3 +101,52 @@ def test_same_digest_attempts_never_overwrite_each_other(tmp_path: Path) -> None
     assert one.exists() and two.exists()
     with pytest.raises(FileExistsError, match="immutable run bundle already exists"):
         finalize_bundle(run_id=one.name, work_root=work2, feed_config=feed2, **kwargs)
+
+
+def test_delta_log_workspace_bundles_only_the_hour_segment(tmp_path: Path) -> None:
+    work, feed = fixture_workspace(tmp_path)
+    (work / "data" / "master_ref.csv").unlink()
+    deltas = work / "data" / "master_ref" / "deltas"
+    deltas.mkdir(parents=True)
+    (deltas / "20260728T23.csv").write_text("index_id\nold\n")
+    (deltas / "20260729T00.csv").write_text("index_id\nabc\n")
+    (work / "input_snapshot").mkdir()
+    (work / "input_snapshot" / "master_ref_state.json").write_text('{"base_sha256": null, "deltas": {}}\n')
+
+    bundle = finalize_bundle(
+        run_root=tmp_path / "run-root",
+        run_id="sensing:20260729T00:attempt:1:log",
+        digest_at="20260729T00",
+        attempt=1,
+        work_root=work,
+        feed_config=feed,
+        stage_results=[result("s01"), result("s02")],
+        started_at="2026-07-29T00:00:00Z",
+        source_commit="abc123",
+    )
+
+    manifest = json.loads((bundle / "manifest.json").read_text())
+    assert (bundle / "candidates" / "master_ref_delta.csv").read_text() == "index_id\nabc\n"
+    assert not (bundle / "candidates" / "master_ref.csv").exists()
+    assert manifest["input_state_digest"] == sha256_file(bundle / "inputs" / "master_ref_state.json")
+
+
+def test_log_bundle_never_carries_the_full_master_ref(tmp_path: Path) -> None:
+    work, feed = fixture_workspace(tmp_path)
+    (work / "input_snapshot").mkdir()
+    shutil.copy2(work / "data" / "master_ref.csv", work / "input_snapshot" / "master_ref.csv")
+    deltas = work / "data" / "master_ref" / "deltas"
+    deltas.mkdir(parents=True)
+    (deltas / "20260729T00.csv").write_text("index_id\nnew\n")
+    # e.g. exported by a compaction in the workspace
+    (work / "data" / "master_ref.csv").write_text("index_id\nabc\nnew\n")
+
+    bundle = finalize_bundle(
+        run_root=tmp_path / "run-root", run_id="sensing:20260729T00:attempt:1:log", digest_at="20260729T00",
+        attempt=1, work_root=work, feed_config=feed, stage_results=[result("s02")],
+        started_at="2026-07-29T00:00:00Z", source_commit="abc123",
+    )
+
+    assert (bundle / "inputs" / "master_ref.csv").read_text() == "index_id\nabc\n"
+    assert (bundle / "candidates" / "master_ref_delta.csv").read_text() == "index_id\nnew\n"
+    assert not (bundle / "candidates" / "master_ref.csv").exists()
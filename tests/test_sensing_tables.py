@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from apps.news_acquire.src.news_acquire import tables
+
+pytest.importorskip("pyarrow")
+
+
+def _digest_map() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "digest_file": ["1h_window_20250114T1000"] * 2,
+            "article_id": ["1", "2"],
+            "index_id": ["0123456789", "ABCDEFGHIJ"],
+            "Title": ["Dólar hoy", "Reservas"],
+            "Source": ["Infobae", ""],
+            "Link": ["https://x/a", "https://x/b"],
+            "Published": pd.to_datetime(["2025-01-14T10:05:00Z", "2025-01-14T10:40:30Z"], utc=True),
+            "window_type": ["1h_window"] * 2,
+            "topics": ['["economia"]', '["economia", "politica"]'],
+        }
+    )
+
+
+def test_parquet_keeps_the_declared_types(tmp_path: Path) -> None:
+    path = tables.write_table(_digest_map(), tmp_path / "20250114T10", tables.DIGEST_MAP_SCHEMA, ("parquet",))
+
+    df = tables.read_table(path)
+
+    assert path.suffix == ".parquet"
+    assert str(df["Published"].dtype) == "datetime64[ns, UTC]"
+    assert df["article_id"].tolist() == [1, 2]
+    # Leading zeros survive; CSV inference would have read this id as an integer
+    assert df["index_id"].tolist() == ["0123456789", "ABCDEFGHIJ"]
+
+
+def test_readers_prefer_parquet_and_rows_match_the_csv_form(tmp_path: Path) -> None:
+    tables.write_table(_digest_map(), tmp_path / "20250114T10", tables.DIGEST_MAP_SCHEMA, ("csv", "parquet"))
+    tables.write_table(_digest_map(), tmp_path / "20250114T11", tables.DIGEST_MAP_SCHEMA, ("csv",))
+
+    paths = tables.table_paths(tmp_path, "*")
+
+    assert [p.name for p in paths] == ["20250114T10.parquet", "20250114T11.csv"]
+    csv_rows = tables.read_table_rows(tmp_path / "20250114T10.csv")
+    assert tables.read_table_rows(paths[0]) == csv_rows
+    assert csv_rows[1]["Published"] == "2025-01-14 10:40:30+00:00"
+
+
+def test_unknown_format_falls_back_to_csv(monkeypatch) -> None:
+    monkeypatch.setenv("ARTIFACT_FORMAT", "both")
+    assert tables.artifact_formats() == ("csv", "parquet")
+    monkeypatch.setenv("ARTIFACT_FORMAT", "xlsx")
+    assert tables.artifact_formats() == ("csv",)
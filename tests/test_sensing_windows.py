@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import sys
+import types
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.modules.setdefault("psycopg", types.SimpleNamespace(connect=lambda *_a, **_k: None))
+sys.modules.setdefault("feedparser", types.SimpleNamespace(parse=lambda *_a, **_k: None))
+
+from apps.news_acquire.src.news_acquire import stage01_digests as stage01
+from apps.news_acquire.src.news_acquire.feed_fetch import FeedOutcome, FeedResult
+
+
+def test_window_bounds_match_boolean_masks_for_every_slice() -> None:
+    anchor = datetime(2025, 1, 14, 12, tzinfo=timezone.utc)
+    published = pd.Series(
+        pd.date_range(end=anchor, periods=24 * 20, freq="h", tz="UTC").repeat(2)
+    )
+
+    for label, start, end in stage01.compute_slices(anchor):
+        lo, hi = stage01.window_bounds(published, start, end)
+        mask = (published >= start) & (published < end)
+        assert list(range(lo, hi)) == list(published.index[mask]), label
+
+
+def test_validation_reasons_are_positional() -> None:
+    df = pd.DataFrame(
+        {
+            "Title": ["ok", "", "ok"],
+            "Source": ["s", "s", ""],
+            "Link": ["l", "l", "l"],
+            "Published": pd.to_datetime(["2025-01-01"] * 3, utc=True),
+        }
+    )
+
+    assert list(stage01.validation_reasons(df)) == [None, "missing_title", "missing_source"]
+
+
+def _point_stage01_at(monkeypatch, data_dir) -> None:
+    monkeypatch.setattr(stage01, "DATA_DIR", data_dir)
+    monkeypatch.setattr(stage01, "SLICE_DIR", data_dir / "rss_slices")
+    monkeypatch.setattr(stage01, "RSS_DUMPS_DIR", data_dir / "rss_slices" / "rss_dumps")
+    monkeypatch.setattr(stage01, "JSONL_DIR", data_dir / "slices" / "jsonl")
+    monkeypatch.setattr(stage01, "QUAR_DIR", data_dir / "quarantine")
+    monkeypatch.setattr(stage01, "FEED_CACHE_DIR", data_dir / "feed_cache")
+    monkeypatch.setattr(stage01, "ARTICLE_STORE_DIR", data_dir / "articles")
+    monkeypatch.setattr(stage01, "load_feed_config", lambda: {"topic": "https://example.test/rss"})
+    monkeypatch.setenv("ACQUIRE_NETWORK", "1")
+    monkeypatch.setenv("ENQUEUE_SCRAPE", "0")
+    monkeypatch.setenv("DB_RUN_BOOKKEEPING", "0")
+
+
+def _fetch(title: str, published: str):
+    row = {
+        "uid": title,
+        "Topic": "topic",
+        "Title": title,
+        "Link": f"https://example.test/{title}",
+        "Published": pd.Timestamp(published),
+        "Source": "source",
+    }
+    return lambda *_a, **_k: pd.DataFrame([row])
+
+
+def test_long_windows_are_assembled_from_stored_history(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+
+    # 09:30 is only returned by the 10:00 fetch; the 16:00 fetch no longer has it
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    monkeypatch.setattr(stage01, "fetch_rss_now", _fetch("early", "2025-01-14T09:30:00Z"))
+    assert stage01.run() == 0
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    monkeypatch.setattr(stage01, "fetch_rss_now", _fetch("now", "2025-01-14T16:10:00Z"))
+    assert stage01.run() == 0
+
+    dumps = data_dir / "rss_slices" / "rss_dumps"
+    assert pd.read_csv(dumps / "4h_window_20250114T1600.csv")["Title"].tolist() == ["early"]
+    assert pd.read_csv(dumps / "1h_window_20250114T1600.csv")["Title"].tolist() == ["now"]
+
+
+def test_stored_history_keeps_every_topic_of_an_article(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+    early = pd.concat([_fetch("early", "2025-01-14T09:30:00Z")().assign(Topic=t) for t in ("politica", "economia")])
+
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    monkeypatch.setattr(stage01, "fetch_rss_now", lambda *_a, **_k: early)
+    assert stage01.run() == 0
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    monkeypatch.setattr(stage01, "fetch_rss_now", _fetch("now", "2025-01-14T16:10:00Z"))
+    assert stage01.run() == 0
+
+    out = pd.read_csv(data_dir / "rss_slices" / "rss_dumps" / "4h_window_20250114T1600.csv")
+    assert [json.loads(v) for v in out["topics"]] == [["politica", "economia"]]
+
+
+def test_every_feed_failing_finishes_with_no_rows(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    failed = FeedOutcome("topic", "https://example.test/rss", "timeout", None, 0, 0, 5000, "timed out")
+    monkeypatch.setattr(stage01, "fetch_feeds", lambda feeds, **_k: [FeedResult(t, [], failed) for t in feeds])
+
+    assert stage01.run() == 0
+    outcomes = (data_dir / "rss_slices" / "feed_outcomes" / "20250114T16.jsonl").read_text().splitlines()
+    assert [json.loads(line)["status"] for line in outcomes] == ["timeout"]
+
+
+def test_article_store_can_be_disabled(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+    monkeypatch.setenv("ARTICLE_STORE", "0")
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    monkeypatch.setattr(stage01, "fetch_rss_now", _fetch("now", "2025-01-14T16:10:00Z"))
+
+    assert stage01.run() == 0
+    assert not (data_dir / "articles").exists()
+
+
+def test_validation_reasons_match_row_validator_on_edge_values() -> None:
+    df = pd.DataFrame(
+        {
+            "Title": ["t", None, float("nan"), "t", "t", "t"],
+            "Source": ["s", "s", "s", "  ", "s", "s"],
+            "Link": ["l", "l", "l", "l", 0, "l"],
+            "Published": pd.to_datetime(["2025-01-01", "2025-01-01", "2025-01-01", "2025-01-01", "2025-01-01", None], utc=True),
+        }
+    )
+
+    expected = [stage01.validate_row_v01(r)[1] for _, r in df.iterrows()]
+
+    assert list(stage01.validation_reasons(df)) == expected
+
+
+def test_near_duplicate_headlines_collapse_into_the_earliest_row(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+    monkeypatch.setenv("NEAR_DUP_COLLAPSE", "1")
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    rows = [
+        ("Milei anunció un nuevo paquete de medidas económicas", "Infobae", "economia", "16:05"),
+        ("Milei anunció nuevo paquete de medidas económicas", "Clarín", "economia", "16:20"),
+        ("Milei anunció un nuevo paquete de medidas económicas", "Perfil", "politica", "16:30"),
+        ("River venció a Boca en el Monumental", "Olé", "economia", "16:40"),
+    ]
+    fetched = pd.DataFrame(
+        [
+            {"uid": str(i), "Topic": topic, "Title": title, "Link": f"https://example.test/{i}",
+             "Published": pd.Timestamp(f"2025-01-14T{hhmm}:00Z"), "Source": source}
+            for i, (title, source, topic, hhmm) in enumerate(rows)
+        ]
+    )
+    monkeypatch.setattr(stage01, "fetch_rss_now", lambda *_a, **_k: fetched)
+
+    assert stage01.run() == 0
+
+    out = pd.read_csv(data_dir / "rss_slices" / "rss_dumps" / "1h_window_20250114T1600.csv")
+    assert out["Source"].tolist() == ["Infobae", "Perfil", "Olé"]
+    assert out["article_id"].tolist() == [1, 2, 3]
+    assert json.loads(out.loc[0, "aliases"]) == [stage01.assign_index_ids(fetched.iloc[[1]].copy())["index_id"].iat[0]]
+    assert out.loc[1, "aliases"] == "[]"
+    stats = [json.loads(line) for line in (data_dir / "rss_slices" / "near_dup" / "20250114T16.jsonl").read_text().splitlines()]
+    assert stats == [{"digest_id": "20250114T16", "window_type": "1h_window", "threshold": 0.7, "rows_in": 4, "rows_out": 3, "collapsed": 1}]
+
+
+def test_an_article_from_several_topic_feeds_is_one_row_with_all_topics(tmp_path, monkeypatch) -> None:
+    data_dir = tmp_path / "data"
+    _point_stage01_at(monkeypatch, data_dir)
+    monkeypatch.setenv("DIGEST_AT", "20250114T16")
+    fetched = pd.DataFrame(
+        [
+            {"uid": "u", "Topic": topic, "Title": "Reservas del BCRA", "Link": "https://example.test/a",
+             "Published": pd.Timestamp(f"2025-01-14T16:{mm}:00Z"), "Source": "Infobae"}
+            for topic, mm in (("politica", "20"), ("economia", "05"), ("finanzas", "30"))
+        ]
+        + [{"uid": "v", "Topic": "economia", "Title": "Otra", "Link": "https://example.test/b",
+            "Published": pd.Timestamp("2025-01-14T16:40:00Z"), "Source": "Clarín"}]
+    )
+    monkeypatch.setattr(stage01, "fetch_rss_now", lambda *_a, **_k: fetched)
+
+    assert stage01.run() == 0
+
+    out = pd.read_csv(data_dir / "rss_slices" / "rss_dumps" / "1h_window_20250114T1600.csv")
+    assert out["Title"].tolist() == ["Reservas del BCRA", "Otra"]
+    assert out["Topic"].tolist() == ["economia", "economia"]
+    assert [json.loads(v) for v in out["topics"]] == [["economia", "finanzas", "politica"], ["economia"]]
+    mirror = [json.loads(line) for line in (data_dir / "slices" / "jsonl" / "20250114T16.jsonl").read_text().splitlines()]
+    assert mirror[0]["topics"] == ["economia", "finanzas", "politica"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import importlib
+import json
 import sys
 import types
 from pathlib import Path
@@ -23,3 +24,161 @@ def test_load_master_ref_csv_tolerates_empty_file(tmp_path: Path, monkeypatch):
     assert isinstance(df, pd.DataFrame)
     assert list(df.columns) == ["index_id", "source", "link", "first_seen", "last_seen", "topics", "meta"]
     assert df.empty
+
+
+def test_validate_input_df_quarantines_one_block_with_check_detail(tmp_path: Path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+    monkeypatch.setattr(stage02, "QUAR_DIR", tmp_path)
+
+    df = pd.DataFrame(
+        {
+            "digest_file": ["1h_window_20250101T0000", "1h_window_20250101T0000", ""],
+            "window_type": ["1h_window"] * 3,
+            "article_id": [1, 2, 3],
+            "Title": ["ok", " ", "ok"],
+            "Source": ["s", "s", "s"],
+            "Link": ["l", "l", "l"],
+            "Published": ["2025-01-01T00:10:00Z", "2025-01-01T00:20:00Z", "not a date"],
+            "index_id": ["a", "b", "c"],
+        }
+    )
+    breakdown: dict[str, int] = {}
+
+    good, n_bad = stage02.validate_input_df(df, "run", breakdown=breakdown)
+
+    assert good["index_id"].tolist() == ["a"]
+    assert n_bad == 2
+    assert breakdown == {"missing_title": 1, "bad_published": 1}
+    records = [json.loads(line) for line in (tmp_path / "V02_run.jsonl").read_text().splitlines()]
+    assert [(r["reason"], r["detail"]) for r in records] == [("bad_row", "missing_title"), ("bad_row", "bad_published")]
+    assert records[0]["row"]["Published"] == "2025-01-01T00:20:00+00:00"
+    assert records[1]["row"]["Published"] == "NaT"
+
+
+def test_merge_master_ref_coalesces_column_wise(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+
+    ts = lambda s: pd.Timestamp(s, tz="UTC")  # noqa: E731
+    prev = pd.DataFrame(
+        {
+            "index_id": ["a", "b", "c"],
+            "source": ["Infobae", "Clarín", "Ámbito"],
+            "link": ["la", "lb", "lc"],
+            "first_seen": [ts("2025-01-01 10:00"), ts("2025-01-01 10:00"), ts("2025-01-01 10:00")],
+            "last_seen": [ts("2025-01-01 11:00"), ts("2025-01-01 11:00"), ts("2025-01-01 11:00")],
+            "topics": ["[]", "[]", "[]"],
+            "meta": ["{}", "{}", "{}"],
+        }
+    )
+    hour = pd.DataFrame(
+        {
+            "index_id": ["a", "b", "d"],
+            "source": ["", None, "Perfil"],
+            "link": ["la2", "", "ld"],
+            "first_seen": [ts("2025-01-01 09:00"), ts("2025-01-01 12:00"), ts("2025-01-01 12:00")],
+            "last_seen": [ts("2025-01-01 09:30"), ts("2025-01-01 12:00"), ts("2025-01-01 12:00")],
+        }
+    )
+
+    out = stage02.merge_master_ref(prev, hour).set_index("index_id")
+
+    assert out["source"].to_dict() == {"a": "Infobae", "b": "Clarín", "c": "Ámbito", "d": "Perfil"}
+    assert out["link"].to_dict() == {"a": "la2", "b": "lb", "c": "lc", "d": "ld"}
+    assert out.loc["a", "first_seen"] == ts("2025-01-01 09:00")
+    assert out.loc["a", "last_seen"] == ts("2025-01-01 11:00")
+    assert out.loc["b", "last_seen"] == ts("2025-01-01 12:00")
+    assert out.loc["c", "topics"] == "[]"
+
+
+def test_master_ref_csv_topics_and_meta_survive_a_merge(tmp_path: Path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+
+    master = tmp_path / "master_ref.csv"
+    master.write_text(
+        "index_id,source,link,first_seen,last_seen,topics,meta\n"
+        'a,Infobae,la,2025-01-01T10:00:00Z,2025-01-01T11:00:00Z,"[""Economía"", ""Política""]","{""pinned"": true}"\n'
+        "c,Clarín,lc,2025-01-01T10:00:00Z,2025-01-01T11:00:00Z,not json,\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(stage02, "MASTER_REF_CSV", master)
+    monkeypatch.setattr(stage02, "DATA_DIR", tmp_path)
+
+    prev = stage02.load_master_ref_csv()
+    assert prev["topics"].tolist() == ['["Economía", "Política"]', "[]"]
+    assert prev["meta"].tolist() == ['{"pinned": true}', "{}"]
+
+    ts = lambda s: pd.Timestamp(s, tz="UTC")  # noqa: E731
+    hour = pd.DataFrame(
+        {"index_id": ["a", "b"], "source": ["Infobae", "Perfil"], "link": ["la", "lb"],
+         "first_seen": [ts("2025-01-01 12:00")] * 2, "last_seen": [ts("2025-01-01 12:00")] * 2}
+    )
+    stage02.write_master_ref_csv(stage02.merge_master_ref(prev, hour), null_sink=False)
+
+    out = stage02.load_master_ref_csv().set_index("index_id")
+    assert json.loads(out.loc["a", "topics"]) == ["Economía", "Política"]
+    assert json.loads(out.loc["a", "meta"]) == {"pinned": True}
+    assert out.loc["b", "topics"] == "[]" and out.loc["b", "meta"] == "{}"
+
+
+def test_seen_text_matches_to_csv(tmp_path: Path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+
+    whole = pd.Series(pd.to_datetime(["2025-01-01 10:00:00", None, "2025-01-02 23:59:59"], utc=True))
+    fractional = pd.Series([pd.Timestamp("2025-01-01 10:00:00.5", tz="UTC"), pd.Timestamp("2025-01-01 10:00:00", tz="UTC")])
+    for values in (whole, fractional):
+        expected = values.to_frame("seen").to_csv(index=False)
+        assert stage02._seen_text(values).to_frame("seen").to_csv(index=False) == expected
+    assert stage02._seen_text(fractional) is fractional
+
+
+def test_default_hourly_run_only_appends_a_delta(tmp_path: Path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage02 = importlib.import_module("apps.news_acquire.src.news_acquire.stage02_master_index_update")
+    for name, path in {
+        "DATA_DIR": tmp_path,
+        "RSS_DUMPS_DIR": tmp_path / "rss_slices" / "rss_dumps",
+        "MASTER_REF_CSV": tmp_path / "master_ref.csv",
+        "MASTER_REF_LOG_DIR": tmp_path / "master_ref",
+        "DIGEST_MAP_DIR": tmp_path / "digest_map",
+        "QUAR_DIR": tmp_path / "quarantine",
+    }.items():
+        monkeypatch.setattr(stage02, name, path)
+    for key in ("MASTER_REF_LOG", "MASTER_REF_CSV_EXPORT", "NULL_SINK", "ARTIFACT_FORMAT"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("DB_RUN_BOOKKEEPING", "0")
+    monkeypatch.setenv("WRITE_ARTIFACTS", "1")
+    monkeypatch.setenv("MASTER_REF_COMPACT_RATIO", "1.5")
+    master = tmp_path / "master_ref.csv"
+    master.write_text(
+        "index_id,source,link,first_seen,last_seen,topics,meta\n"
+        "a,Clarín,https://x/a,2025-01-14 08:00:00+00:00,2025-01-14 08:00:00+00:00,[],{}\n",
+        encoding="utf-8",
+    )
+
+    def run_hour(hour: str, index_id: str) -> None:
+        dumps = tmp_path / "rss_slices" / "rss_dumps"
+        dumps.mkdir(parents=True, exist_ok=True)
+        (dumps / f"1h_window_20250114T{hour}00.csv").write_text(
+            "digest_file,window_type,article_id,Title,Source,Link,Published,index_id\n"
+            f"1h_window_20250114T{hour}00,1h_window,1,t,Perfil,https://x/{index_id},2025-01-14T{hour}:10:00Z,{index_id}\n",
+            encoding="utf-8",
+        )
+        monkeypatch.setenv("DIGEST_AT", f"20250114T{hour}")
+        assert stage02.run() == 0
+
+    log = stage02.MasterRefLog(tmp_path / "master_ref")
+    run_hour("10", "b")
+    seen = (log.base_path.stat().st_mtime_ns, master.stat().st_mtime_ns, master.read_bytes())
+    run_hour("11", "c")
+
+    assert (log.base_path.stat().st_mtime_ns, master.stat().st_mtime_ns, master.read_bytes()) == seen
+    assert [p.stem for p in log.delta_paths()] == ["20250114T10", "20250114T11"]
+
+    # Folding the base refreshes the CSV seam
+    run_hour("12", "d")
+    assert [p.stem for p in log.delta_paths()] == ["20250114T12"]
+    assert pd.read_csv(master)["index_id"].tolist() == ["a", "b", "c", "d"]
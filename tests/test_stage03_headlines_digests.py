@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _stage03(monkeypatch):
+    # stage03 transitively imports db.py which imports psycopg; stub it for unit test isolation.
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    return importlib.import_module("apps.news_acquire.src.news_acquire.stage03_headlines_digests")
+
+
+def _rowwise_markdown(window_type: str, topic: str, group_no: str, rows: pd.DataFrame) -> str:
+    # The former iterrows renderer, kept as the reference
+    lines = [f"# {topic} — {window_type} (Grupo {group_no})", ""]
+    for _, r in rows.iterrows():
+        title = str(r.get("Title") or "").strip()
+        src = str(r.get("Source") or "").strip()
+        pub = r.get("Published")
+        pub_s = pd.to_datetime(pub, utc=True).strftime("%Y-%m-%d %H:%M UTC") if pd.notna(pub) else ""
+        line = f"- **ID {r.get('article_id')}** — {title} — _{src}_"
+        if pub_s:
+            line += f" — _{pub_s}_"
+        lines.append(line)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def test_column_wise_rendering_matches_the_row_renderer(monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    rows = pd.DataFrame(
+        {
+            "article_id": [1, 2, 3, 4],
+            "Title": ["  Dólar hoy ", np.nan, "", "Milei — x"],
+            "Source": ["Infobae", " ", None, "Clarín"],
+            "Published": pd.to_datetime(
+                ["2025-01-14T10:05:59Z", "2025-01-14T10:05:01Z", None, "2025-01-14T23:59:00Z"], utc=True
+            ),
+        }
+    )
+
+    content = stage03._render_markdown("4h_window", "Economía", "01", stage03._render_lines(rows))
+
+    assert content == _rowwise_markdown("4h_window", "Economía", "01", rows)
+
+
+def test_invalid_groups_are_quarantined_one_by_one(tmp_path: Path, monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    for name, path in {
+        "DATA_DIR": tmp_path,
+        "DIGEST_MAP_DIR": tmp_path / "digest_map",
+        "OUT_JSONL_DIR": tmp_path / "digest_jsonls",
+        "OUT_MD_DIR": tmp_path / "output_digests",
+        "QUAR_DIR": tmp_path / "quarantine",
+    }.items():
+        monkeypatch.setattr(stage03, name, path)
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    monkeypatch.setenv("DB_RUN_BOOKKEEPING", "0")
+    monkeypatch.setenv("WRITE_ARTIFACTS", "1")
+    (tmp_path / "digest_map").mkdir()
+    # A numeric window_type reads back as int and fails the str contract
+    (tmp_path / "digest_map" / "20250114T10.csv").write_text(
+        "digest_file,window_type,article_id,Title,Source,Link,Published,Topic\n"
+        "d,4,1,t1,s,l,2025-01-14 09:00:00+00:00,A\n"
+        "d,4,2,t2,s,l,2025-01-14 09:30:00+00:00,B\n",
+        encoding="utf-8",
+    )
+
+    assert stage03.run() == 0
+
+    records = [json.loads(line) for line in next((tmp_path / "quarantine").glob("V03_*.jsonl")).read_text().splitlines()]
+    assert [r["record"]["id_digest"] for r in records] == ["20250114T10_000", "20250114T10_000"]
+    assert not (tmp_path / "digest_jsonls" / "20250114T10.jsonl").exists()
+    assert not list((tmp_path / "output_digests").glob("*.md"))
+
+
+def test_token_packing_keeps_order_and_fits_the_budget(monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    tokens = [30, 12, 45, 8, 20, 33, 5, 27, 60, 14, 9, 41]
+    df_topic = pd.DataFrame({"md_line": [f"line {i}" for i in range(len(tokens))], "md_tokens": tokens})
+
+    parts = stage03._pack_topic_group(df_topic, 100)
+
+    assert [line for p in parts for line in p["md_line"]] == df_topic["md_line"].tolist()
+    assert all(p["md_tokens"].sum() <= 100 for p in parts)
+    assert len(parts) == 4
+    assert [len(p) for p in parts] == [len(p) for p in stage03._pack_topic_group(df_topic, 100)]
+
+
+def test_token_packing_isolates_oversized_rows(monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    df_topic = pd.DataFrame({"md_line": list("abcde"), "md_tokens": [10, 500, 10, 10, 480]})
+
+    parts = stage03._pack_topic_group(df_topic, 100)
+
+    assert [p["md_line"].tolist() for p in parts] == [["a"], ["b"], ["c", "d"], ["e"]]
+    assert stage03._estimate_tokens(pd.Series(["", "abcd", "abcde"])).tolist() == [1, 2, 3]
+
+
+def test_groups_with_the_same_headlines_share_a_content_hash(tmp_path: Path, monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    for name, path in {
+        "DATA_DIR": tmp_path,
+        "DIGEST_MAP_DIR": tmp_path / "digest_map",
+        "OUT_JSONL_DIR": tmp_path / "digest_jsonls",
+        "OUT_MD_DIR": tmp_path / "output_digests",
+        "QUAR_DIR": tmp_path / "quarantine",
+        "PF_REUSE_DIR": tmp_path / "pf_reuse",
+    }.items():
+        monkeypatch.setattr(stage03, name, path)
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    monkeypatch.setenv("DB_RUN_BOOKKEEPING", "0")
+    monkeypatch.setenv("WRITE_ARTIFACTS", "1")
+    (tmp_path / "digest_map").mkdir()
+    (tmp_path / "digest_map" / "20250114T10.csv").write_text(
+        "digest_file,window_type,article_id,Title,Source,Link,Published,Topic\n"
+        "d,1h_window,1,t1,s,l,2025-01-14 09:00:00+00:00,A\n"
+        "d,4h_window,1,t1,s,l,2025-01-14 09:00:00+00:00,A\n"
+        "d,4h_window,2,t2,s,l,2025-01-14 09:30:00+00:00,B\n",
+        encoding="utf-8",
+    )
+    def content_sha(article_id: int, title: str, published: str) -> str:
+        return stage03._content_sha256(stage03._render_lines(pd.DataFrame(
+            {"article_id": [article_id], "Title": [title], "Source": ["s"], "Published": [published]}
+        )))
+
+    (tmp_path / "pf_reuse").mkdir()
+    flow_sha = "f" * 64
+    (tmp_path / "pf_reuse" / "flow.json").write_text(json.dumps({"flow_sha256": flow_sha}), encoding="utf-8")
+    seen = content_sha(2, "t2", "2025-01-14 09:30:00+00:00")
+    (tmp_path / "pf_reuse" / f"{seen}.json").write_text(json.dumps({"flow_sha256": flow_sha}), encoding="utf-8")
+    # An output of an older flow version does not count as reusable
+    stale = content_sha(1, "t1", "2025-01-14 09:00:00+00:00")
+    (tmp_path / "pf_reuse" / f"{stale}.json").write_text(json.dumps({"flow_sha256": "old"}), encoding="utf-8")
+
+    assert stage03.run() == 0
+
+    records = [json.loads(line) for line in (tmp_path / "digest_jsonls" / "20250114T10.jsonl").read_text().splitlines()]
+    assert records[0]["content"] != records[1]["content"]
+    assert records[0]["content_sha256"] == records[1]["content_sha256"] == stale
+    assert [r["pf_reuse"] for r in records] == [False, False, True]
+
+
+def test_preclustered_groups_fold_near_duplicates_into_one_line(monkeypatch) -> None:
+    stage03 = _stage03(monkeypatch)
+    chunk = pd.DataFrame(
+        {
+            "article_id": [7, 8, 9],
+            "md_line": ["- **ID 7** — a", "- **ID 8** — b", "- **ID 9** — a'"],
+            "cluster": [4, 2, 4],
+        }
+    )
+
+    lines, clusters = stage03._cluster_lines(chunk)
+
+    assert lines == ["- **ID 7** — a — _también: ID 9_", "- **ID 8** — b"]
+    assert clusters == [
+        {"cluster_id": "c01", "representative_id": 7, "article_ids": [7, 9]},
+        {"cluster_id": "c02", "representative_id": 8, "article_ids": [8]},
+    ]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+
+def _stage04(monkeypatch, tmp_path: Path):
+    # stage04 imports db.py which imports psycopg; stub it for unit test isolation.
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace())
+    stage04 = importlib.import_module("apps.news_editorial.src.news_editorial.stage04_promptflow_run")
+    for name, path in {
+        "DATA_DIR": tmp_path,
+        "PF_OUT_DIR": tmp_path / "pf_out",
+        "PF_IN_DIR": tmp_path / "digest_jsonls",
+        "QUAR_DIR": tmp_path / "quarantine",
+        "PF_REUSE_DIR": tmp_path / "pf_reuse",
+        "PF_FLOW_DIR": tmp_path / "flow",
+    }.items():
+        monkeypatch.setattr(stage04, name, path)
+    (tmp_path / "flow").mkdir()
+    (tmp_path / "flow" / "flow.dag.yaml").write_text("inputs: {}\n", encoding="utf-8")
+    monkeypatch.setenv("PF_REUSE", "1")
+    monkeypatch.setenv("PF_EXECUTOR", "cli")
+    return stage04
+
+
+def _group(digest_id: str, window: str, sha: str, reuse: bool) -> dict:
+    return {
+        "id_digest": f"{digest_id}_000",
+        "digest_group_id": f"{digest_id}::{window}::Economia::01",
+        "window_type": window,
+        "topic": "Economia",
+        "group_number": "01",
+        "content": "# Economia\n\n- **ID 1** — x",
+        "content_sha256": sha,
+        "pf_reuse": reuse,
+    }
+
+
+def _write_input(tmp_path: Path, digest_id: str, groups: list[dict]) -> None:
+    path = tmp_path / "digest_jsonls" / f"{digest_id}.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(g) + "\n" for g in groups), encoding="utf-8")
+
+
+def test_reused_groups_skip_the_flow_and_keep_their_own_ids(tmp_path: Path, monkeypatch) -> None:
+    stage04 = _stage04(monkeypatch, tmp_path)
+    sent: list[list[str]] = []
+
+    def fake_batch(df_run, tmp_in, digest_id, run_id, stage_name):
+        sent.append(df_run["digest_group_id"].tolist())
+        df = df_run[["id_digest", "digest_group_id", "window_type", "topic", "group_number"]].copy()
+        df["clustered_agenda_table"] = [{"groups": [gid]} for gid in df["digest_group_id"]]
+        df["seed_ideas"] = [{"seed_ideas": []}] * len(df)
+        df["digest_id_hour"] = digest_id
+        return df, 0
+
+    monkeypatch.setattr(stage04, "_run_pf_batch", fake_batch)
+
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+    _write_input(tmp_path, "20250114T10", [_group("20250114T10", "1h_window", "aa", False)])
+    assert stage04.run() == 0
+    assert (tmp_path / "pf_reuse" / "aa.json").exists()
+    # The fingerprint stage 03 checks entries against
+    recorded = json.loads((tmp_path / "pf_reuse" / "flow.json").read_text(encoding="utf-8"))
+    assert recorded["flow_sha256"] == stage04._flow_fingerprint(tmp_path / "flow")
+
+    monkeypatch.setenv("DIGEST_AT", "20250114T11")
+    groups = [_group("20250114T11", "4h_window", "aa", True), _group("20250114T11", "8h_window", "bb", False)]
+    _write_input(tmp_path, "20250114T11", groups)
+    assert stage04.run() == 0
+
+    assert sent == [["20250114T10::1h_window::Economia::01"], ["20250114T11::8h_window::Economia::01"]]
+    out = [json.loads(line) for line in (tmp_path / "pf_out" / "pfout_20250114T11.jsonl").read_text().splitlines()]
+    assert [r["digest_group_id"] for r in out] == [g["digest_group_id"] for g in groups]
+    assert out[0]["window_type"] == "4h_window"
+    assert out[0]["digest_id_hour"] == "20250114T11"
+    assert out[0]["clustered_agenda_table"] == {"groups": ["20250114T10::1h_window::Economia::01"]}
+    assert out[0]["pf_reused_from"] == "20250114T10::1h_window::Economia::01"
+
+
+def test_outputs_from_another_flow_version_are_not_reused(tmp_path: Path, monkeypatch) -> None:
+    stage04 = _stage04(monkeypatch, tmp_path)
+    df_pf = pd.DataFrame([{"digest_group_id": "g1", "clustered_agenda_table": {"a": 1}, "seed_ideas": {"b": 2}}])
+    df_run = pd.DataFrame([{"digest_group_id": "g1", "content_sha256": "cc"}])
+
+    assert stage04._store_reuse_entries(df_pf, df_run, stage04._flow_fingerprint(tmp_path / "flow")) == 1
+    assert stage04._load_reuse_entry("cc", stage04._flow_fingerprint(tmp_path / "flow")) is not None
+
+    (tmp_path / "flow" / "prompt.jinja2").write_text("changed", encoding="utf-8")
+    assert stage04._load_reuse_entry("cc", stage04._flow_fingerprint(tmp_path / "flow")) is None
+
+
+FLOW_DAG = """
+inputs:
+  digest_group_id:
+    type: string
+  content:
+    type: string
+outputs:
+  digest_group_id:
+    reference: ${inputs.digest_group_id}
+  seed_ideas:
+    reference: ${ideas.output}
+nodes:
+  - name: ideas
+    type: python
+    source:
+      type: code
+      path: tool.py
+    inputs:
+      prompt: ${prompt.output}
+      schema_path: ./schema.json
+  - name: prompt
+    type: prompt
+    source:
+      type: jinja2
+      path: prompt.jinja2
+    inputs:
+      content: ${inputs.content}
+"""
+
+FLOW_TOOL = """
+import time
+from pathlib import Path
+
+
+def tool(func):
+    return func
+
+
+@tool
+def echo(prompt: str, schema_path: str) -> dict:
+    if "boom" in prompt:
+        raise ValueError("bad group")
+    # Later lines finish first
+    time.sleep(0.05 * (3 - int(prompt.split()[-1])))
+    return {"prompt": prompt.strip(), "schema": Path(schema_path).name}
+"""
+
+
+def test_inprocess_executor_streams_rows_in_input_order(tmp_path: Path, monkeypatch) -> None:
+    pytest.importorskip("jinja2")
+    stage04 = _stage04(monkeypatch, tmp_path)
+    monkeypatch.setenv("PF_EXECUTOR", "inprocess")
+    monkeypatch.setenv("PF_REUSE", "0")
+    flow = tmp_path / "flow"
+    (flow / "flow.dag.yaml").write_text(FLOW_DAG, encoding="utf-8")
+    (flow / "tool.py").write_text(FLOW_TOOL, encoding="utf-8")
+    (flow / "prompt.jinja2").write_text("Group {{ content }}\n", encoding="utf-8")
+    groups = [
+        {"digest_group_id": f"20250114T10::1h_window::Economia::0{i}", "content": c}
+        for i, c in enumerate(["1", "boom", "2", "3"], start=1)
+    ]
+    _write_input(tmp_path, "20250114T10", groups)
+    monkeypatch.setenv("DIGEST_AT", "20250114T10")
+
+    assert stage04.run() == 0
+
+    out = [json.loads(line) for line in (tmp_path / "pf_out" / "pfout_20250114T10.jsonl").read_text().splitlines()]
+    assert [r["line_number"] for r in out] == [0, 2, 3]
+    assert out[0] == {
+        "line_number": 0,
+        "digest_group_id": "20250114T10::1h_window::Economia::01",
+        "seed_ideas": {"prompt": "Group 1", "schema": "schema.json"},
+        "digest_id_hour": "20250114T10",
+    }
+    quarantined = [json.loads(line) for line in next((tmp_path / "quarantine").glob("V04_*.jsonl")).read_text().splitlines()]
+    assert [(q["reason"], q["digest_group_id"]) for q in quarantined] == [("pf_line_failed", "20250114T10::1h_window::Economia::02")]